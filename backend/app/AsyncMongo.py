@@ -0,0 +1,884 @@
+# Description: Asynchronous controller for all MongoDB operations, awaited by the API routes
+
+import asyncio
+import weakref
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from pymongo import AsyncMongoClient  # type: ignore
+from bson.objectid import ObjectId  # type: ignore
+from pymongo.errors import BulkWriteError  # type: ignore
+
+from app.Pools import Pool, PoolSummary
+from app.Cache import pool_cache, pool_key, ALL_POOLS_KEY, ALL_RAW_POOLS_KEY
+from app.Metrics import mongo_command_metrics
+from app.Timing import mongo_command_timing
+from app.SlowOperations import slow_operation_log
+from app.Mongo import (
+    MONGO_DATABASE,
+    MONGO_COLLECTION,
+    MONGO_LOG_COLLECTION,
+    MONGO_LOG_BUCKET_COLLECTION,
+    LOG_COLLECTION_INDEXES,
+    LOGBOOK_INDEXES,
+    POOL_INDEXES,
+    LOG_BUCKET_INDEXES,
+    LOG_PROJECTION,
+    BUCKET_PROJECTION,
+    STREAM_BATCH_SIZE,
+    IMPORT_BATCH_SIZE,
+    DUE_WINDOW_DAYS,
+    TOTAL_LOGBOOK_PIPELINE,
+    TOTAL_BUCKET_LOGS_PIPELINE,
+    POOLS_FINGERPRINT_PIPELINE,
+    REVISION_INCREMENT,
+    EMPTY_LOG_SUMMARY,
+    mongo_uri,
+    logs_in_collection,
+    logs_in_buckets,
+    logs_embedded,
+    pool_projection,
+    log_to_document,
+    log_id_values,
+    log_update_fields,
+    changes_reading,
+    summary_append_update,
+    summary_append_operations,
+    summary_reset_update,
+    logbook_update_pipeline,
+    logbook_delete_pipeline,
+    log_summary_pipeline,
+    parse_pools_fingerprint,
+    bulk_log_operations,
+    record_bulk_write_errors,
+    export_pipeline,
+    pool_update_document,
+    pool_import_document,
+    duplicate_insert_indexes,
+    imported_log_documents,
+    imported_bucket_operations,
+    bucket_append_operations,
+    bucket_range_query,
+    bucket_logs,
+    bucket_log,
+    select_logs,
+    bucket_update_pipeline,
+    bucket_delete_pipeline,
+    logbook_entry_query,
+    log_date_filter,
+    stored_log,
+    log_from_bson,
+    logbook_range_pipeline,
+    pool_summary_pipeline,
+    pools_per_type_pipeline,
+    volume_distribution_pipeline,
+    parse_volume_distribution,
+    logs_per_month_pipeline,
+    log_series_pipeline,
+    compliance_pipeline,
+    non_compliant_pools_pipeline,
+    parse_non_compliant_pools,
+    due_pools_pipeline,
+    pool_page_query,
+    pool_page_pipeline,
+    split_page,
+    parse_pool_summary,
+    parse_pool_data,
+    raw_pool_data,
+    pool_to_bson,
+    parse_mongo_info,
+    parse_mongo_health,
+    parse_mongo_uptime,
+    parse_mongo_storage_stats,
+    parse_mongo_connection_stats,
+    parse_mongo_full_health,
+    failed_mongo_full_health,
+)
+
+# AsyncMongoClient binds itself to the event loop it is first used on, so one
+# client is kept per running loop (a single one under uvicorn).
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncMongoClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_client() -> AsyncMongoClient:
+    """
+    Returns the MongoDB client bound to the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = AsyncMongoClient(
+            mongo_uri,
+            uuidRepresentation="standard",
+            event_listeners=[
+                mongo_command_metrics,
+                mongo_command_timing,
+                slow_operation_log,
+            ],
+        )
+        _clients[loop] = client
+    return client
+
+
+def get_pools_collection():
+    """
+    Returns the pools collection for the running event loop.
+    """
+    return get_client()[MONGO_DATABASE][MONGO_COLLECTION]
+
+
+def get_logs_collection():
+    """
+    Returns the log collection for the running event loop.
+    """
+    return get_client()[MONGO_DATABASE][MONGO_LOG_COLLECTION]
+
+
+def get_buckets_collection():
+    """
+    Returns the log bucket collection for the running event loop.
+    """
+    return get_client()[MONGO_DATABASE][MONGO_LOG_BUCKET_COLLECTION]
+
+
+def get_log_source_collection():
+    """
+    Returns the collection `log_source_stages()` runs on, for the running event
+    loop.
+    """
+    if logs_in_collection():
+        return get_logs_collection()
+    return get_buckets_collection() if logs_in_buckets() else get_pools_collection()
+
+
+async def close_client():
+    """
+    Closes the MongoDB client bound to the running event loop, if any.
+    """
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+# MONGO OPERATIONS
+
+
+async def ensure_indexes():
+    """
+    Creates the pool indexes, and the ones required by the configured log
+    storage.
+    """
+    await get_pools_collection().create_indexes(POOL_INDEXES)
+    if logs_in_collection():
+        await get_logs_collection().create_indexes(LOG_COLLECTION_INDEXES)
+    elif logs_in_buckets():
+        await get_buckets_collection().create_indexes(LOG_BUCKET_INDEXES)
+    else:
+        await get_pools_collection().create_indexes(LOGBOOK_INDEXES)
+
+
+async def create_pool(pool: Pool):
+    """
+    Inserts a new pool into the database.
+    """
+    pool_data = pool_to_bson(pool)
+    pool_data["revision"] = 1
+    logbook = [] if logs_embedded() else pool_data.pop("logbook", [])
+    result = await get_pools_collection().insert_one(pool_data)
+    if logbook and logs_in_buckets():
+        await get_buckets_collection().bulk_write(
+            bucket_append_operations(result.inserted_id, logbook)
+        )
+    elif logbook:
+        await get_logs_collection().insert_many(
+            [log_to_document(result.inserted_id, log) for log in logbook]
+        )
+    pool_cache.invalidate_pool(str(result.inserted_id))
+    return str(result.inserted_id)
+
+
+async def read_all_pools() -> List[Pool]:
+    """
+    Retrieves all pools from the database, through the pool cache.
+    """
+    found, pools, generation = pool_cache.get(ALL_POOLS_KEY)
+    if found:
+        return pools
+    results = get_pools_collection().find({}, pool_projection())
+    pools = [parse_pool_data(pool) async for pool in results]
+    pool_cache.put(ALL_POOLS_KEY, pools, generation)
+    return pools
+
+
+async def read_all_raw_pools() -> List[dict]:
+    """
+    Retrieves all pools from the database in their response form, without
+    building the models, through the pool cache.
+    """
+    found, pools, generation = pool_cache.get(ALL_RAW_POOLS_KEY)
+    if found:
+        return pools
+    results = get_pools_collection().find({}, pool_projection())
+    pools = [raw_pool_data(pool) async for pool in results]
+    pool_cache.put(ALL_RAW_POOLS_KEY, pools, generation)
+    return pools
+
+
+async def read_pool_summaries() -> List[PoolSummary]:
+    """
+    Retrieves all pools from the database as summaries, without their logbook.
+    """
+    results = await get_pools_collection().aggregate(pool_summary_pipeline())
+    return [parse_pool_summary(pool) async for pool in results]
+
+
+async def read_due_pools(
+    window: str, days: int = DUE_WINDOW_DAYS, limit: Optional[int] = None
+) -> List[PoolSummary]:
+    """
+    Retrieves the summaries of the pools whose next maintenance falls in a
+    window, soonest first.
+    """
+    results = await get_pools_collection().aggregate(
+        due_pools_pipeline(window, days, limit)
+    )
+    return [parse_pool_summary(pool) async for pool in results]
+
+
+async def read_pools_page(
+    limit: int, cursor: Optional[str] = None, summary: bool = False
+) -> Tuple[List[Union[Pool, PoolSummary]], Optional[str]]:
+    """
+    Retrieves one page of pools ordered by ID, starting after the given cursor.
+    Returns the pools and the cursor of the next page, None on the last page.
+    """
+    if summary:
+        results = await get_pools_collection().aggregate(
+            pool_page_pipeline(limit, cursor)
+        )
+    else:
+        results = (
+            get_pools_collection()
+            .find(pool_page_query(cursor), pool_projection())
+            .sort("_id", 1)
+            .limit(limit + 1)
+        )
+    documents, next_cursor = split_page(await results.to_list(), limit)
+    parse = parse_pool_summary if summary else parse_pool_data
+    return [parse(pool) for pool in documents], next_cursor
+
+
+async def iter_pools(summary: bool = False) -> AsyncIterator[Union[Pool, PoolSummary]]:
+    """
+    Yields every pool as soon as it is decoded, fetching them in small batches.
+    """
+    if summary:
+        results = await get_pools_collection().aggregate(
+            pool_summary_pipeline(), batchSize=STREAM_BATCH_SIZE
+        )
+        async for pool in results:
+            yield parse_pool_summary(pool)
+    else:
+        results = get_pools_collection().find(
+            {}, pool_projection(), batch_size=STREAM_BATCH_SIZE
+        )
+        async for pool in results:
+            yield parse_pool_data(pool)
+
+
+async def iter_export_pools() -> AsyncIterator[Pool]:
+    """
+    Yields every pool with its logbook straight from a cursor, fetching them in
+    small batches.
+    """
+    results = await get_pools_collection().aggregate(
+        export_pipeline(), batchSize=STREAM_BATCH_SIZE
+    )
+    async for pool in results:
+        yield parse_pool_data(pool)
+
+
+async def insert_pool_batch(pools: List[Pool]) -> Tuple[int, int]:
+    """
+    Inserts a batch of imported pools with a single unordered insert_many,
+    skipping the pools that already exist.
+    Returns the number of imported and skipped pools.
+    """
+    documents = [pool_import_document(pool) for pool in pools]
+    logbooks = (
+        [] if logs_embedded() else [document.pop("logbook") for document in documents]
+    )
+    skipped: Set[int] = set()
+    try:
+        await get_pools_collection().insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        skipped = duplicate_insert_indexes(e.details)
+    if logs_in_buckets():
+        operations = imported_bucket_operations(documents, logbooks, skipped)
+        if operations:
+            await get_buckets_collection().bulk_write(operations)
+    else:
+        logs = imported_log_documents(documents, logbooks, skipped)
+        if logs:
+            await get_logs_collection().insert_many(logs, ordered=False)
+    pool_cache.invalidate_all()
+    return len(documents) - len(skipped), len(skipped)
+
+
+async def import_pools(
+    pools: AsyncIterable[Pool],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[int, int]:
+    """
+    Imports a stream of pools, `batch_size` at a time, so that memory stays
+    bounded whatever the stream length. `progress` is called after each batch
+    with the number of pools imported and skipped so far.
+    Returns the number of imported and skipped pools.
+    """
+    imported = skipped = 0
+    batch: List[Pool] = []
+    async for pool in pools:
+        batch.append(pool)
+        if len(batch) == batch_size:
+            batch_imported, batch_skipped = await insert_pool_batch(batch)
+            imported, skipped = imported + batch_imported, skipped + batch_skipped
+            batch = []
+            if progress:
+                progress(imported, skipped)
+    if batch:
+        batch_imported, batch_skipped = await insert_pool_batch(batch)
+        imported, skipped = imported + batch_imported, skipped + batch_skipped
+        if progress:
+            progress(imported, skipped)
+    return imported, skipped
+
+
+async def retrieve_pool(pool_id: str) -> Optional[Pool]:
+    """
+    Retrieves a specific pool by ID, through the pool cache.
+    """
+    found, pool, generation = pool_cache.get(pool_key(pool_id))
+    if found:
+        return pool
+    pool_data = await get_pools_collection().find_one(
+        {"_id": ObjectId(pool_id)}, pool_projection()
+    )
+    if pool_data:
+        pool = parse_pool_data(pool_data)
+        pool_cache.put(pool_key(pool_id), pool, generation)
+        return pool
+    return None
+
+
+async def retrieve_raw_pool(pool_id: str) -> Optional[dict]:
+    """
+    Retrieves a specific pool by ID in its response form, without building the
+    models, through the pool cache.
+    """
+    found, pool, generation = pool_cache.get(pool_key(pool_id, raw=True))
+    if found:
+        return pool
+    pool_data = await get_pools_collection().find_one(
+        {"_id": ObjectId(pool_id)}, pool_projection()
+    )
+    if pool_data:
+        pool = raw_pool_data(pool_data)
+        pool_cache.put(pool_key(pool_id, raw=True), pool, generation)
+        return pool
+    return None
+
+
+async def update_pool(pool_id: str, updated_data: dict):
+    """
+    Updates a pool's data by ID and increments its revision.
+    Returns False if the pool does not exist.
+    """
+    result = await get_pools_collection().update_one(
+        {"_id": ObjectId(pool_id)}, pool_update_document(updated_data)
+    )
+    pool_cache.invalidate_pool(pool_id)
+    return result.matched_count > 0
+
+
+async def delete_pool(pool_id: str):
+    """
+    Deletes a pool by ID.
+    """
+    result = await get_pools_collection().delete_one({"_id": ObjectId(pool_id)})
+    if not logs_embedded():
+        await get_log_source_collection().delete_many({"pool_id": ObjectId(pool_id)})
+    pool_cache.invalidate_pool(pool_id)
+    return result.deleted_count > 0
+
+
+async def insert_pool_log(pool_id, log_data):
+    """
+    Appends a maintenance log entry to a pool in a single server-side update,
+    so concurrent appends never overwrite each other. In the log collection
+    and bucket modes, the log is inserted before the pool revision is
+    incremented, and removed again if the pool does not exist.
+    Returns False if the pool does not exist.
+    """
+    log_data = stored_log(log_data)
+
+    if logs_in_collection():
+        result = await get_logs_collection().insert_one(
+            log_to_document(ObjectId(pool_id), log_data)
+        )
+        if not await bump_pool_revision(pool_id, summary_append_update([log_data])):
+            await get_logs_collection().delete_one({"_id": result.inserted_id})
+            return False
+        return True
+
+    if logs_in_buckets():
+        await get_buckets_collection().bulk_write(
+            bucket_append_operations(ObjectId(pool_id), [log_data])
+        )
+        if not await bump_pool_revision(pool_id, summary_append_update([log_data])):
+            # Any bucket of a missing pool is an orphan
+            await get_buckets_collection().delete_many({"pool_id": ObjectId(pool_id)})
+            return False
+        return True
+
+    result = await get_pools_collection().update_one(
+        {"_id": ObjectId(pool_id)},
+        {"$push": {"logbook": log_data}, **summary_append_update([log_data])},
+    )
+    pool_cache.invalidate_pool(pool_id)
+    return result.matched_count > 0
+
+
+async def insert_pool_logs(pool_logs: List[Tuple[str, dict]]) -> List[Optional[str]]:
+    """
+    Appends a batch of maintenance log entries, possibly across many pools, with
+    a single unordered bulk write.
+    Returns the error of each entry, None for the entries written.
+    """
+    pool_logs = [(pool_id, stored_log(log_data)) for pool_id, log_data in pool_logs]
+    pool_ids = [
+        ObjectId(pool_id) for pool_id, _ in pool_logs if ObjectId.is_valid(pool_id)
+    ]
+    existing_ids = {
+        pool["_id"]
+        async for pool in get_pools_collection().find(
+            {"_id": {"$in": pool_ids}}, {"_id": 1}
+        )
+    }
+    operations, op_entries, errors = bulk_log_operations(pool_logs, existing_ids)
+    if operations:
+        collection = get_log_source_collection()
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            record_bulk_write_errors(e.details, op_entries, errors)
+        if not logs_embedded():
+            summary_operations = summary_append_operations(pool_logs, errors)
+            if summary_operations:
+                await get_pools_collection().bulk_write(
+                    summary_operations, ordered=False
+                )
+        for pool_id in existing_ids:
+            pool_cache.invalidate_pool(pool_id)
+    return errors
+
+
+async def bump_pool_revision(pool_id: str, update: Optional[dict] = None) -> bool:
+    """
+    Increments the revision of a pool whose logs were written to the log
+    collection or buckets, or applies `update`, a summary update which also
+    increments it. Returns False if the pool does not exist.
+    """
+    result = await get_pools_collection().update_one(
+        {"_id": ObjectId(pool_id)}, update or {"$inc": REVISION_INCREMENT}
+    )
+    pool_cache.invalidate_pool(pool_id)
+    return result.matched_count > 0
+
+
+async def refresh_pool_summary(pool_id: str) -> bool:
+    """
+    Recomputes the summary of a pool from its logs in the log collection or
+    buckets, after one of them was edited or deleted, and increments its
+    revision. Returns False if the pool does not exist.
+    """
+    cursor = await get_log_source_collection().aggregate(log_summary_pipeline(pool_id))
+    results = await cursor.to_list()
+    summary = results[0]["summary"] if results else EMPTY_LOG_SUMMARY
+    return await bump_pool_revision(pool_id, summary_reset_update(summary))
+
+
+async def retrieve_pool_revision(pool_id: str) -> Optional[int]:
+    """
+    Retrieves only the revision of a pool, None if the pool does not exist.
+    """
+    pool_data = await get_pools_collection().find_one(
+        {"_id": ObjectId(pool_id)}, {"revision": 1}
+    )
+    return pool_data.get("revision", 0) if pool_data else None
+
+
+async def get_pools_fingerprint() -> str:
+    """
+    Retrieves a fingerprint of the whole pool collection, which changes with any
+    pool write, without reading the pools themselves.
+    """
+    cursor = await get_pools_collection().aggregate(POOLS_FINGERPRINT_PIPELINE)
+    return parse_pools_fingerprint(await cursor.to_list())
+
+
+async def retrieve_pool_logs(
+    pool_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Optional[List[dict]]:
+    """
+    Retrieves the maintenance logs for a pool, optionally restricted to an
+    inclusive date range and to the `limit` most recent entries.
+    Returns None if the pool does not exist.
+    """
+    if logs_in_collection():
+        query = {"pool_id": ObjectId(pool_id)}
+        date_filter = log_date_filter(start_date, end_date)
+        if date_filter:
+            query["date"] = date_filter
+        cursor = get_logs_collection().find(query, LOG_PROJECTION)
+        if limit:
+            logs = (await cursor.sort("date", -1).limit(limit).to_list())[::-1]
+        else:
+            logs = await cursor.sort("date", 1).to_list()
+        if logs or await get_pools_collection().count_documents(
+            {"_id": ObjectId(pool_id)}, limit=1
+        ):
+            return [log_from_bson(log) for log in logs]
+        return None
+
+    if logs_in_buckets():
+        buckets = await (
+            get_buckets_collection()
+            .find(bucket_range_query(pool_id, start_date, end_date), BUCKET_PROJECTION)
+            .to_list()
+        )
+        if buckets or await get_pools_collection().count_documents(
+            {"_id": ObjectId(pool_id)}, limit=1
+        ):
+            logs = [log for bucket in buckets for log in bucket_logs(bucket)]
+            logs = select_logs(logs, start_date, end_date, limit)
+            return [log_from_bson(log) for log in logs]
+        return None
+
+    cursor = await get_pools_collection().aggregate(
+        logbook_range_pipeline(pool_id, start_date, end_date, limit)
+    )
+    results = await cursor.to_list()
+    if results:
+        return [log_from_bson(log) for log in results[0]["logbook"]]
+    return None
+
+
+async def retrieve_pool_log_series(
+    pool_id: str,
+    unit: str = "day",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Optional[List[dict]]:
+    """
+    Aggregates the maintenance logs of a pool into day, week or month periods.
+    Returns None if the pool does not exist.
+    """
+    cursor = await get_log_source_collection().aggregate(
+        log_series_pipeline(pool_id, unit, start_date, end_date)
+    )
+    series = await cursor.to_list()
+    if series or await get_pools_collection().count_documents(
+        {"_id": ObjectId(pool_id)}, limit=1
+    ):
+        return series
+    return None
+
+
+async def delete_pool_logs(pool_id: str):
+    """
+    Deletes all maintenance logs for a pool.
+    """
+    if not logs_embedded():
+        result = await get_log_source_collection().delete_many(
+            {"pool_id": ObjectId(pool_id)}
+        )
+        await bump_pool_revision(pool_id, summary_reset_update(EMPTY_LOG_SUMMARY))
+        return result.deleted_count > 0
+
+    update = summary_reset_update(EMPTY_LOG_SUMMARY)
+    update["$set"] = {**update["$set"], "logbook": []}
+    result = await get_pools_collection().update_one({"_id": ObjectId(pool_id)}, update)
+    pool_cache.invalidate_pool(pool_id)
+    return result.modified_count > 0
+
+
+async def delete_all_pools():
+    """
+    Deletes all pools from the database.
+    """
+    result = await get_pools_collection().delete_many({})
+    if not logs_embedded():
+        await get_log_source_collection().delete_many({})
+    pool_cache.invalidate_all()
+    return result.deleted_count
+
+
+async def count_pools() -> int:
+    """
+    Counts the pools from the collection metadata.
+    """
+    return await get_pools_collection().estimated_document_count()
+
+
+async def count_all_logs() -> int:
+    """
+    Counts the maintenance logs stored across all pools.
+    """
+    if logs_in_collection():
+        return await get_logs_collection().estimated_document_count()
+
+    if logs_in_buckets():
+        cursor = await get_buckets_collection().aggregate(TOTAL_BUCKET_LOGS_PIPELINE)
+        results = await cursor.to_list()
+        return results[0]["total"] if results else 0
+
+    cursor = await get_pools_collection().aggregate(TOTAL_LOGBOOK_PIPELINE)
+    results = await cursor.to_list()
+    return results[0]["total"] if results else 0
+
+
+async def count_pools_per_type() -> List[dict]:
+    """
+    Counts the pools of each type.
+    """
+    results = await get_pools_collection().aggregate(pools_per_type_pipeline())
+    return await results.to_list()
+
+
+async def get_volume_distribution() -> dict:
+    """
+    Computes the distribution of the pools' water volume.
+    """
+    results = await get_pools_collection().aggregate(volume_distribution_pipeline())
+    return parse_volume_distribution((await results.to_list())[0])
+
+
+async def count_logs_per_month() -> List[dict]:
+    """
+    Counts the maintenance logs recorded each month.
+    """
+    results = await get_log_source_collection().aggregate(logs_per_month_pipeline())
+    return await results.to_list()
+
+
+async def get_compliance_report(unit: str = "month") -> dict:
+    """
+    Counts the readings out of the safe ranges per pool type and period, and
+    lists the pools whose latest reading is out of range.
+    """
+
+    async def aggregate(collection, pipeline: List[dict]) -> List[dict]:
+        return await (await collection.aggregate(pipeline)).to_list()
+
+    # Both aggregations run concurrently
+    periods, non_compliant_pools = await asyncio.gather(
+        aggregate(get_log_source_collection(), compliance_pipeline(unit)),
+        aggregate(get_pools_collection(), non_compliant_pools_pipeline()),
+    )
+    return {
+        "periods": periods,
+        "non_compliant_pools": parse_non_compliant_pools(non_compliant_pools),
+    }
+
+
+async def retrieve_pool_log_by_id(pool_id: str, log_id: str) -> Optional[dict]:
+    """
+    Retrieves a specific maintenance log entry by ID.
+    """
+    if logs_in_collection():
+        log = await get_logs_collection().find_one(
+            {"pool_id": ObjectId(pool_id), "id": {"$in": log_id_values(log_id)}},
+            LOG_PROJECTION,
+        )
+    elif logs_in_buckets():
+        bucket = await get_buckets_collection().find_one(
+            {"pool_id": ObjectId(pool_id), "ids": {"$in": log_id_values(log_id)}},
+            BUCKET_PROJECTION,
+        )
+        log = bucket_log(bucket, log_id) if bucket else None
+    else:
+        pool_data = await get_pools_collection().find_one(
+            *logbook_entry_query(pool_id, log_id)
+        )
+        log = pool_data["logbook"][0] if pool_data else None
+    return log_from_bson(log) if log else None
+
+
+async def update_pool_log_by_id(pool_id: str, log_id: str, updated_log: dict) -> bool:
+    """
+    Updates the given fields of a specific maintenance log entry by ID, in place.
+    Returns False if the pool or the log entry does not exist.
+    """
+    if logs_in_collection():
+        result = await get_logs_collection().update_one(
+            {"pool_id": ObjectId(pool_id), "id": {"$in": log_id_values(log_id)}},
+            {"$set": log_update_fields(updated_log)},
+        )
+        return result.matched_count > 0 and await refresh_pool_summary(pool_id)
+
+    if logs_in_buckets():
+        result = await get_buckets_collection().update_one(
+            {"pool_id": ObjectId(pool_id), "ids": {"$in": log_id_values(log_id)}},
+            bucket_update_pipeline(log_id, updated_log),
+        )
+        return result.matched_count > 0 and await refresh_pool_summary(pool_id)
+
+    if changes_reading(updated_log):
+        update = logbook_update_pipeline(log_id, updated_log)
+    else:
+        # Edits leaving the readings untouched keep the positional update
+        update = {
+            "$set": log_update_fields(updated_log, "logbook.$."),
+            "$inc": REVISION_INCREMENT,
+        }
+    result = await get_pools_collection().update_one(
+        {"_id": ObjectId(pool_id), "logbook.id": {"$in": log_id_values(log_id)}},
+        update,
+    )
+    pool_cache.invalidate_pool(pool_id)
+    return result.matched_count > 0
+
+
+async def delete_pool_log_by_id(pool_id: str, log_id: str) -> bool:
+    """
+    Deletes a specific maintenance log entry by ID.
+    """
+    if logs_in_collection():
+        result = await get_logs_collection().delete_one(
+            {"pool_id": ObjectId(pool_id), "id": {"$in": log_id_values(log_id)}}
+        )
+        return result.deleted_count > 0 and await refresh_pool_summary(pool_id)
+
+    if logs_in_buckets():
+        result = await get_buckets_collection().update_one(
+            {"pool_id": ObjectId(pool_id), "ids": {"$in": log_id_values(log_id)}},
+            bucket_delete_pipeline(log_id),
+        )
+        if result.matched_count == 0:
+            return False
+        await get_buckets_collection().delete_many(
+            {"pool_id": ObjectId(pool_id), "count": 0}
+        )
+        return await refresh_pool_summary(pool_id)
+
+    result = await get_pools_collection().update_one(
+        {"_id": ObjectId(pool_id), "logbook.id": {"$in": log_id_values(log_id)}},
+        logbook_delete_pipeline(log_id),
+    )
+    pool_cache.invalidate_pool(pool_id)
+    return result.matched_count > 0
+
+
+# MONGO HEALTH CHECKS
+
+
+async def fetch_server_info() -> dict:
+    """
+    Runs `buildInfo` on the server.
+    """
+    return await get_client().server_info()
+
+
+async def fetch_server_status() -> dict:
+    """
+    Runs `serverStatus` on the server.
+    """
+    return await get_client().admin.command("serverStatus")
+
+
+async def explain(database: str, command: dict) -> dict:
+    """
+    Runs an `explain` command on a database.
+    """
+    return await get_client()[database].command(command)
+
+
+async def get_mongo_info():
+    """
+    Retrieve MongoDB server version and build info.
+    """
+    try:
+        return parse_mongo_info(await fetch_server_info())
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to fetch server info: {str(e)}"}
+
+
+async def get_mongo_uptime():
+    """
+    Get MongoDB server uptime in seconds.
+    """
+    try:
+        return parse_mongo_uptime(await fetch_server_status())
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to fetch uptime: {str(e)}"}
+
+
+async def get_mongo_health():
+    """
+    Check if the MongoDB connection is healthy.
+    """
+    try:
+        return parse_mongo_health(await fetch_server_info())
+    except Exception as e:
+        return {"status": "error", "message": f"Error connecting to MongoDB: {str(e)}"}
+
+
+async def get_mongo_storage_stats():
+    """
+    Retrieve MongoDB storage statistics.
+    """
+    try:
+        return parse_mongo_storage_stats(await fetch_server_status())
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to fetch storage stats: {str(e)}",
+        }
+
+
+async def get_mongo_connection_stats():
+    """
+    Retrieve MongoDB connection statistics.
+    """
+    try:
+        return parse_mongo_connection_stats(await fetch_server_status())
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to fetch connection stats: {str(e)}",
+        }
+
+
+async def get_mongo_full_health():
+    """
+    Retrieve a comprehensive health report of MongoDB, from a single
+    `serverStatus` call.
+    """
+    try:
+        return parse_mongo_full_health(await fetch_server_status())
+    except Exception as e:
+        return failed_mongo_full_health(str(e))
@@ -0,0 +1,129 @@
+# Description: In-process read-through cache of pool reads, with LRU and TTL eviction
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+from dotenv import load_dotenv
+
+dotenv_path = os.path.join(os.path.dirname(__file__), ".env")
+load_dotenv(dotenv_path)
+
+# Maximum number of cached reads (0 disables the cache) and their lifetime in
+# seconds, which bounds staleness when another process writes to MongoDB
+POOL_CACHE_SIZE = int(os.getenv("POOL_CACHE_SIZE", 1000))
+POOL_CACHE_TTL = float(os.getenv("POOL_CACHE_TTL", 30))
+
+# Keys of the cached full pool listing, as models and as raw documents
+ALL_POOLS_KEY = ("pools",)
+ALL_RAW_POOLS_KEY = ("pools", "raw")
+
+
+def pool_key(pool_id: str, raw: bool = False) -> Tuple[str, ...]:
+    """
+    Returns the cache key of a single pool read, as a model or as a raw
+    document.
+    """
+    return ("pool", str(pool_id), "raw") if raw else ("pool", str(pool_id))
+
+
+class PoolCache:
+    """
+    Size-bounded LRU cache whose entries expire after a fixed TTL.
+    Cached values are shared between callers and must not be modified.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        # Bumped on every invalidation, so that a read started before a write
+        # never stores the data it fetched
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any, int]:
+        """
+        Looks up a key. Returns whether it was found, its value, and the
+        generation to hand back to `put` after a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self.clock():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value, self.generation
+                del self.entries[key]
+            self.misses += 1
+            return False, None, self.generation
+
+    def put(self, key: Hashable, value: Any, generation: int):
+        """
+        Stores a value read from MongoDB, unless the cache was invalidated since
+        the read started. Evicts the least recently used entries past the size.
+        """
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = (self.clock() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_pool(self, pool_id: str):
+        """
+        Drops the cached reads of a pool, along with the full listings.
+        """
+        with self.lock:
+            self.generation += 1
+            for key in (
+                pool_key(pool_id),
+                pool_key(pool_id, raw=True),
+                ALL_POOLS_KEY,
+                ALL_RAW_POOLS_KEY,
+            ):
+                self.entries.pop(key, None)
+
+    def invalidate_all(self):
+        """
+        Drops every cached read.
+        """
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the cache configuration, size and hit and miss counters.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+# Shared by the sync and async data layers, which invalidate it on every write
+pool_cache = PoolCache(POOL_CACHE_SIZE, POOL_CACHE_TTL)
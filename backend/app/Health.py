@@ -0,0 +1,274 @@
+# Description: Cached MongoDB health snapshot, refreshed by a background task
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.AsyncMongo import fetch_server_info, fetch_server_status
+from app.Mongo import (
+    failed_mongo_full_health,
+    parse_mongo_connection_stats,
+    parse_mongo_full_health,
+    parse_mongo_health,
+    parse_mongo_info,
+    parse_mongo_storage_stats,
+    parse_mongo_uptime,
+)
+
+dotenv_path = os.path.join(os.path.dirname(__file__), ".env")
+load_dotenv(dotenv_path)
+
+# Seconds between two `serverStatus` calls, whatever the health route traffic
+HEALTH_REFRESH_INTERVAL = float(os.getenv("HEALTH_REFRESH_INTERVAL", 10))
+
+# Number of snapshots kept in the health history (a day at the default interval)
+HEALTH_HISTORY_SIZE = int(os.getenv("HEALTH_HISTORY_SIZE", 8640))
+
+# `serverStatus` gauges recorded in the health history, by path
+HISTORY_GAUGES: Dict[str, Tuple[str, str]] = {
+    "connections_current": ("connections", "current"),
+    "connections_available": ("connections", "available"),
+    "resident_MB": ("mem", "resident"),
+    "virtual_MB": ("mem", "virtual"),
+}
+
+# `serverStatus` cumulative counters, recorded as per-second rates
+HISTORY_COUNTERS: Dict[str, Tuple[str, str]] = {
+    "inserts_per_second": ("opcounters", "insert"),
+    "queries_per_second": ("opcounters", "query"),
+    "updates_per_second": ("opcounters", "update"),
+    "deletes_per_second": ("opcounters", "delete"),
+    "getmores_per_second": ("opcounters", "getmore"),
+    "commands_per_second": ("opcounters", "command"),
+    "network_bytes_in_per_second": ("network", "bytesIn"),
+    "network_bytes_out_per_second": ("network", "bytesOut"),
+}
+
+
+def status_value(server_status: dict, path: Tuple[str, str]) -> Optional[float]:
+    """
+    Reads a `serverStatus` metric, None if the server does not report it.
+    """
+    section, field = path
+    return server_status.get(section, {}).get(field)
+
+
+def mean(values: List[Optional[float]]) -> Optional[float]:
+    """
+    Averages the known values, None if there are none.
+    """
+    known = [value for value in values if value is not None]
+    return sum(known) / len(known) if known else None
+
+
+class HealthHistory:
+    """
+    Fixed-size ring buffer of `serverStatus` samples: the oldest samples are
+    dropped once `size` are held.
+    """
+
+    def __init__(self, size: int):
+        self.samples: Deque[dict] = deque(maxlen=size)
+        self.last_counters: Optional[Dict[str, Optional[float]]] = None
+        self.last_timestamp: Optional[float] = None
+
+    def record(self, server_status: dict, timestamp: float):
+        """
+        Appends a sample of the gauges, and of the counter rates since the
+        previous sample. Rates are unknown for the first sample and across a
+        server restart, which resets the counters.
+        """
+        counters = {
+            name: status_value(server_status, path)
+            for name, path in HISTORY_COUNTERS.items()
+        }
+        previous_counters = self.last_counters or {}
+        elapsed = timestamp - (
+            self.last_timestamp if self.last_timestamp is not None else timestamp
+        )
+        sample = {"timestamp": timestamp}
+        for name, path in HISTORY_GAUGES.items():
+            sample[name] = status_value(server_status, path)
+        for name, value in counters.items():
+            previous = previous_counters.get(name)
+            if value is None or previous is None or value < previous or elapsed <= 0:
+                sample[name] = None
+            else:
+                sample[name] = (value - previous) / elapsed
+        self.last_counters = counters
+        self.last_timestamp = timestamp
+        self.samples.append(sample)
+
+    def downsample(self, points: int, since: Optional[float] = None) -> List[dict]:
+        """
+        Returns the samples taken since a timestamp, averaged into at most
+        `points` consecutive groups, each stamped with its last sample time.
+        """
+        samples = [
+            sample
+            for sample in self.samples
+            if since is None or sample["timestamp"] >= since
+        ]
+        if len(samples) <= points:
+            return samples
+        groups = [
+            samples[
+                index * len(samples) // points : (index + 1) * len(samples) // points
+            ]
+            for index in range(points)
+        ]
+        return [
+            {
+                "timestamp": group[-1]["timestamp"],
+                **{
+                    name: mean([sample[name] for sample in group])
+                    for name in (*HISTORY_GAUGES, *HISTORY_COUNTERS)
+                },
+            }
+            for group in groups
+        ]
+
+
+class MongoHealthSnapshot:
+    """
+    Latest `serverStatus` (and `buildInfo`) results, served by the health
+    routes along with their age, and recorded in the health history. Refreshed
+    by `run()` in the background, or on demand by `current()` when no
+    background refresh happened for two intervals, so MongoDB sees one
+    `serverStatus` call per interval whatever the route traffic.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        fetch_status: Callable[[], Awaitable[dict]] = fetch_server_status,
+        fetch_info: Callable[[], Awaitable[dict]] = fetch_server_info,
+        clock: Callable[[], float] = time.monotonic,
+        history_size: int = HEALTH_HISTORY_SIZE,
+    ):
+        self.interval = interval
+        self.fetch_status = fetch_status
+        self.fetch_info = fetch_info
+        self.clock = clock
+        self.server_status: Optional[dict] = None
+        self.server_info: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.taken_at: Optional[float] = None
+        self.refreshing: Optional[asyncio.Task] = None
+        self.history = HealthHistory(history_size)
+
+    async def refresh(self):
+        """
+        Takes a new snapshot. The build info only changes with a server restart,
+        so it is only fetched again after a failed refresh.
+        """
+        try:
+            if self.server_info is None:
+                self.server_info = await self.fetch_info()
+            self.server_status = await self.fetch_status()
+            self.error = None
+            self.history.record(self.server_status, time.time())
+        except Exception as e:
+            self.server_info = None
+            self.error = str(e)
+        self.taken_at = self.clock()
+
+    async def run(self):
+        """
+        Refreshes the snapshot every interval, until cancelled.
+        """
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    async def current(self) -> "MongoHealthSnapshot":
+        """
+        Returns the snapshot, refreshed first when it is older than two
+        intervals. Concurrent callers share a single refresh.
+        """
+        age = self.age()
+        if age is not None and age < 2 * self.interval:
+            return self
+        refreshing = self.refreshing
+        if (
+            refreshing is None
+            or refreshing.done()
+            or refreshing.get_loop() is not asyncio.get_running_loop()
+        ):
+            refreshing = self.refreshing = asyncio.ensure_future(self.refresh())
+        await asyncio.shield(refreshing)
+        return self
+
+    def age(self) -> Optional[float]:
+        """
+        Returns the age of the snapshot in seconds, None before the first one.
+        """
+        return None if self.taken_at is None else self.clock() - self.taken_at
+
+    def report(self, build: Callable[[dict], dict], failure: str) -> dict:
+        """
+        Builds a report from the server status, or the failure message when the
+        server could not be reached, with the snapshot age.
+        """
+        if self.server_status is None or self.error is not None:
+            report = {"status": "error", "message": f"{failure}: {self.error}"}
+        else:
+            report = build(self.server_status)
+        return {**report, "snapshot_age_seconds": self.age()}
+
+    def health(self) -> dict:
+        """
+        Health report of the snapshot.
+        """
+        return self.report(parse_mongo_health, "Error connecting to MongoDB")
+
+    def uptime(self) -> dict:
+        """
+        Uptime report of the snapshot.
+        """
+        return self.report(parse_mongo_uptime, "Failed to fetch uptime")
+
+    def storage_stats(self) -> dict:
+        """
+        Storage report of the snapshot.
+        """
+        return self.report(parse_mongo_storage_stats, "Failed to fetch storage stats")
+
+    def connection_stats(self) -> dict:
+        """
+        Connection report of the snapshot.
+        """
+        return self.report(
+            parse_mongo_connection_stats, "Failed to fetch connection stats"
+        )
+
+    def info(self) -> dict:
+        """
+        Server info report of the snapshot.
+        """
+        if self.server_info is None:
+            report = {
+                "status": "error",
+                "message": f"Failed to fetch server info: {self.error}",
+            }
+        else:
+            report = parse_mongo_info(self.server_info)
+        return {**report, "snapshot_age_seconds": self.age()}
+
+    def full_health(self) -> dict:
+        """
+        Comprehensive health report of the snapshot.
+        """
+        if self.server_status is None or self.error is not None:
+            report = failed_mongo_full_health(str(self.error))
+        else:
+            report = parse_mongo_full_health(self.server_status)
+        return {**report, "snapshot_age_seconds": self.age()}
+
+
+# Shared by the health routes, refreshed by the task started in the app lifespan
+mongo_health_snapshot = MongoHealthSnapshot(HEALTH_REFRESH_INTERVAL)
@@ -0,0 +1,263 @@
+# Description: Request and MongoDB command metrics, served in the Prometheus text format
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from pymongo import monitoring  # type: ignore
+
+# Upper bounds, in seconds, of the latency histogram buckets
+REQUEST_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+COMMAND_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    5.0,
+)
+
+# Route label of requests matching no route, so that scanned URLs do not
+# create a new series each
+UNMATCHED_ROUTE = "unmatched"
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def format_labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    """
+    Formats label pairs as `{name="value",...}`, escaping the values.
+    """
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = (
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric:
+    """
+    Named metric holding one value per combination of label values.
+    Updates take a lock, as pymongo reports commands from any thread.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], Any] = {}
+        self.lock = threading.Lock()
+
+    def samples(self) -> List[str]:
+        """
+        Returns the sample lines of the metric.
+        """
+        with self.lock:
+            values = list(self.values.items())
+        return [
+            f"{self.name}{format_labels(self.labels, label_values)} {value}"
+            for label_values, value in values
+        ]
+
+    def render(self) -> str:
+        """
+        Returns the metric in the Prometheus text format.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, label_values: Tuple[str, ...] = (), amount: float = 1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, label_values: Tuple[str, ...] = (), amount: float = 1):
+        self.inc(label_values, -amount)
+
+
+class Histogram(Metric):
+    """
+    Counts observations per bucket, along with their sum and count.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = REQUEST_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, label_values: Tuple[str, ...], value: float):
+        # Counts are kept per bucket and only made cumulative when rendered
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(label_values)
+            if entry is None:
+                entry = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = [
+                (label_values, list(counts), total)
+                for label_values, (counts, total) in self.values.items()
+            ]
+        names = self.labels + ("le",)
+        lines = []
+        for label_values, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{format_labels(names, label_values + (le,))} {cumulative}"
+                )
+            suffix = format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "Number of HTTP requests handled, per route template and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests, per route template.",
+    ("method", "route"),
+    REQUEST_LATENCY_BUCKETS,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "Number of HTTP requests being handled.",
+)
+mongodb_command_duration_seconds = Histogram(
+    "mongodb_command_duration_seconds",
+    "Time spent running MongoDB commands, per command name.",
+    ("command",),
+    COMMAND_LATENCY_BUCKETS,
+)
+mongodb_command_failures_total = Counter(
+    "mongodb_command_failures_total",
+    "Number of failed MongoDB commands, per command name.",
+    ("command",),
+)
+
+METRICS = [
+    http_requests_total,
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    mongodb_command_duration_seconds,
+    mongodb_command_failures_total,
+]
+
+
+def render_metrics() -> str:
+    """
+    Returns every metric in the Prometheus text format.
+    """
+    return "\n".join(metric.render() for metric in METRICS) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting and timing HTTP requests per route template,
+    such as `/pool/{pool_id}/log/{log_id}`, rather than per URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec()
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            http_requests_total.inc((method, route, str(status)))
+            http_request_duration_seconds.observe((method, route), elapsed)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Command listener timing the commands run by a MongoDB client.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongodb_command_duration_seconds.observe(
+            (event.command_name,), event.duration_micros / 1e6
+        )
+
+    def failed(self, event):
+        mongodb_command_duration_seconds.observe(
+            (event.command_name,), event.duration_micros / 1e6
+        )
+        mongodb_command_failures_total.inc((event.command_name,))
+
+
+# Registered on both the sync and async MongoDB clients
+mongo_command_metrics = MongoCommandMetrics()
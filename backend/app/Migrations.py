@@ -0,0 +1,276 @@
+# Description: Data migrations between the supported MongoDB storage layouts
+#
+# Usage: poetry run python -m app.Migrations <migration>
+
+import argparse
+
+from pymongo import ReplaceOne, UpdateOne  # type: ignore
+
+from app.Mongo import (
+    pools_collection,
+    logs_collection,
+    buckets_collection,
+    LOG_COLLECTION_INDEXES,
+    LOG_BUCKET_INDEXES,
+    POOL_INDEXES,
+    IMPORT_BATCH_SIZE,
+    BUCKET_PROJECTION,
+    BUCKET_SUMMARY_STAGE,
+    REVISION_INCREMENT,
+    log_to_document,
+    bucket_append_operations,
+    bucket_logs,
+    rebuild_log_summaries,
+    date_to_bson,
+    stored_date,
+    log_date_key,
+)
+
+
+def migrate_logbooks_to_collection() -> int:
+    """
+    Moves embedded logbooks into the log collection, one pool at a time.
+    Entries are upserted by pool and log ID before being pulled from the pool,
+    so an interrupted run can safely be restarted.
+    Returns the number of migrated log entries.
+    """
+    logs_collection.create_indexes(LOG_COLLECTION_INDEXES)
+    migrated = 0
+    for pool in pools_collection.find({"logbook.0": {"$exists": True}}, {"logbook": 1}):
+        logbook = pool["logbook"]
+        logs_collection.bulk_write(
+            [
+                ReplaceOne(
+                    {"pool_id": pool["_id"], "id": log.get("id")},
+                    log_to_document(pool["_id"], log),
+                    upsert=True,
+                )
+                for log in logbook
+            ],
+            ordered=False,
+        )
+        # Only pull the migrated entries, in case logs were appended meanwhile
+        pools_collection.update_one(
+            {"_id": pool["_id"]},
+            {
+                "$pull": {
+                    "logbook": {"id": {"$in": [log.get("id") for log in logbook]}}
+                },
+                "$inc": REVISION_INCREMENT,
+            },
+        )
+        migrated += len(logbook)
+    return migrated
+
+
+def migrate_logbooks_to_embedded() -> int:
+    """
+    Moves the log collection back into the embedded pool logbooks, one pool at
+    a time, ordered by date.
+    Returns the number of migrated log entries.
+    """
+    migrated = 0
+    for pool_id in logs_collection.distinct("pool_id"):
+        logs = list(
+            logs_collection.find({"pool_id": pool_id}, {"_id": 0, "pool_id": 0}).sort(
+                "date", 1
+            )
+        )
+        pools_collection.update_one(
+            {"_id": pool_id},
+            {"$push": {"logbook": {"$each": logs}}, "$inc": REVISION_INCREMENT},
+        )
+        logs_collection.delete_many(
+            {"pool_id": pool_id, "id": {"$in": [log.get("id") for log in logs]}}
+        )
+        migrated += len(logs)
+    return migrated
+
+
+def migrate_logbooks_to_buckets() -> int:
+    """
+    Moves embedded logbooks into log buckets, one pool at a time. Entries
+    already bucketed by an interrupted run are not bucketed twice, so the
+    migration can safely be restarted.
+    Returns the number of migrated log entries.
+    """
+    buckets_collection.create_indexes(LOG_BUCKET_INDEXES)
+    migrated = 0
+    for pool in pools_collection.find({"logbook.0": {"$exists": True}}, {"logbook": 1}):
+        logbook = pool["logbook"]
+        bucketed_ids = set(buckets_collection.distinct("ids", {"pool_id": pool["_id"]}))
+        logs = sorted(
+            (log for log in logbook if log.get("id") not in bucketed_ids),
+            key=lambda log: log_date_key(log["date"]),
+        )
+        if logs:
+            buckets_collection.bulk_write(bucket_append_operations(pool["_id"], logs))
+        # Only pull the migrated entries, in case logs were appended meanwhile
+        pools_collection.update_one(
+            {"_id": pool["_id"]},
+            {
+                "$pull": {
+                    "logbook": {"id": {"$in": [log.get("id") for log in logbook]}}
+                },
+                "$inc": REVISION_INCREMENT,
+            },
+        )
+        migrated += len(logbook)
+    return migrated
+
+
+def migrate_buckets_to_embedded() -> int:
+    """
+    Moves the log buckets back into the embedded pool logbooks, one pool at a
+    time, ordered by date.
+    Returns the number of migrated log entries.
+    """
+    migrated = 0
+    for pool_id in buckets_collection.distinct("pool_id"):
+        buckets = list(buckets_collection.find({"pool_id": pool_id}, BUCKET_PROJECTION))
+        logs = sorted(
+            (log for bucket in buckets for log in bucket_logs(bucket)),
+            key=lambda log: log_date_key(log["date"]),
+        )
+        pools_collection.update_one(
+            {"_id": pool_id},
+            {"$push": {"logbook": {"$each": logs}}, "$inc": REVISION_INCREMENT},
+        )
+        buckets_collection.delete_many(
+            {"pool_id": pool_id, "ids": {"$in": [log["id"] for log in logs]}}
+        )
+        migrated += len(logs)
+    return migrated
+
+
+def migrate_maintenance_dates() -> int:
+    """
+    Converts the next maintenance dates stored as strings by earlier versions
+    to datetimes, and creates the index of the due maintenance queries. Each
+    update only applies while the pool still holds the string it was computed
+    from, and strings that are not ISO 8601 dates are left as they are, so the
+    migration can safely be re-run.
+    Returns the number of converted pools.
+    """
+    pools_collection.create_indexes(POOL_INDEXES)
+    migrated = 0
+    operations = []
+    for pool in pools_collection.find(
+        {"next_maintenance": {"$type": "string"}}, {"next_maintenance": 1}
+    ):
+        try:
+            next_maintenance = date_to_bson(pool["next_maintenance"])
+        except ValueError:
+            continue
+        operations.append(
+            UpdateOne(
+                {"_id": pool["_id"], "next_maintenance": pool["next_maintenance"]},
+                {
+                    "$set": {"next_maintenance": next_maintenance},
+                    "$inc": REVISION_INCREMENT,
+                },
+            )
+        )
+        if len(operations) == IMPORT_BATCH_SIZE:
+            migrated += pools_collection.bulk_write(operations).modified_count
+            operations = []
+    if operations:
+        migrated += pools_collection.bulk_write(operations).modified_count
+    return migrated
+
+
+def migrate_log_dates() -> int:
+    """
+    Converts the log dates stored as strings by earlier versions to datetimes,
+    in the embedded logbooks, the log collection and the log buckets, then
+    rebuilds the pool summaries from the converted dates. Each update only
+    applies while the document still holds the dates it was computed from, and
+    strings that are not ISO 8601 dates are left as they are, so the migration
+    can safely be re-run. Run it before moving logs between storage layouts.
+    Returns the number of converted log entries.
+    """
+    migrated = 0
+
+    def flush(collection, operations):
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+        operations.clear()
+
+    operations = []
+    for pool in pools_collection.find(
+        {"logbook.date": {"$type": "string"}}, {"logbook": 1}
+    ):
+        logbook = [
+            {**log, "date": stored_date(log.get("date"))} for log in pool["logbook"]
+        ]
+        changed = sum(
+            new["date"] is not old.get("date")
+            for new, old in zip(logbook, pool["logbook"])
+        )
+        if changed:
+            operations.append(
+                UpdateOne(
+                    {"_id": pool["_id"], "logbook": pool["logbook"]},
+                    {"$set": {"logbook": logbook}, "$inc": REVISION_INCREMENT},
+                )
+            )
+            migrated += changed
+        if len(operations) == IMPORT_BATCH_SIZE:
+            flush(pools_collection, operations)
+    flush(pools_collection, operations)
+
+    for log in logs_collection.find({"date": {"$type": "string"}}, {"date": 1}):
+        date = stored_date(log["date"])
+        if date is not log["date"]:
+            operations.append(
+                UpdateOne(
+                    {"_id": log["_id"], "date": log["date"]}, {"$set": {"date": date}}
+                )
+            )
+            migrated += 1
+        if len(operations) == IMPORT_BATCH_SIZE:
+            flush(logs_collection, operations)
+    flush(logs_collection, operations)
+
+    for bucket in buckets_collection.find({"dates": {"$type": "string"}}, {"dates": 1}):
+        dates = [stored_date(date) for date in bucket["dates"]]
+        changed = sum(new is not old for new, old in zip(dates, bucket["dates"]))
+        if changed:
+            # The bucket keeps the window derived from its original dates
+            operations.append(
+                UpdateOne(
+                    {"_id": bucket["_id"], "dates": bucket["dates"]},
+                    [{"$set": {"dates": {"$literal": dates}}}, BUCKET_SUMMARY_STAGE],
+                )
+            )
+            migrated += changed
+        if len(operations) == IMPORT_BATCH_SIZE:
+            flush(buckets_collection, operations)
+    flush(buckets_collection, operations)
+
+    rebuild_log_summaries()
+    return migrated
+
+
+MIGRATIONS = {
+    "logbook-to-collection": migrate_logbooks_to_collection,
+    "logbook-to-embedded": migrate_logbooks_to_embedded,
+    "logbook-to-buckets": migrate_logbooks_to_buckets,
+    "buckets-to-embedded": migrate_buckets_to_embedded,
+    "rebuild-summaries": rebuild_log_summaries,
+    "maintenance-dates": migrate_maintenance_dates,
+    "log-dates": migrate_log_dates,
+}
+
+# What each migration counts, when it is not log entries
+MIGRATION_COUNTS = {"rebuild-summaries": "pools", "maintenance-dates": "pools"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a Plouf data migration.")
+    parser.add_argument("migration", choices=MIGRATIONS.keys())
+    args = parser.parse_args()
+
+    print(f"Running migration {args.migration}")
+    count = MIGRATIONS[args.migration]()
+    print(f"Migrated {count} {MIGRATION_COUNTS.get(args.migration, 'log entries')}.")
@@ -1,17 +1,23 @@
 # Description: Controller for all MongoDB operations
 
 import os
-import json
 import uuid
-from typing import Dict, Any
+import base64
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Any, Iterable, Iterator, Tuple, Union
 
 from dotenv import load_dotenv
-from pymongo import MongoClient  # type: ignore
-from typing import List, Optional
+from pymongo import MongoClient, IndexModel, ASCENDING, InsertOne, UpdateOne  # type: ignore
+from typing import List, Optional, Set
 from bson.binary import Binary, UuidRepresentation  # type: ignore
 from bson.objectid import ObjectId  # type: ignore
+from pymongo.errors import BulkWriteError  # type: ignore
 
-from app.Pools import Pool, PoolLog
+from app.Pools import Pool, PoolLog, PoolSummary, PoolUtils
+from app.Cache import pool_cache, pool_key, ALL_POOLS_KEY, ALL_RAW_POOLS_KEY
+from app.Metrics import mongo_command_metrics
+from app.Timing import mongo_command_timing, timed_phase
+from app.SlowOperations import slow_operation_log
 
 dotenv_path = os.path.join(os.path.dirname(__file__), ".env")
 load_dotenv(dotenv_path)
@@ -22,30 +28,1488 @@ MONGO_PASSWORD = os.getenv("MONGO_PASSWORD")
 MONGO_DATABASE = os.getenv("MONGO_DATABASE")
 MONGO_COLLECTION = os.getenv("MONGO_COLLECTION")
 
+# Where maintenance logs live: "embedded" in each pool document's logbook, in
+# their own "collection" keyed by pool id and date, or grouped per pool and
+# month into "bucket" documents holding the readings as parallel arrays
+MONGO_LOG_STORAGE = os.getenv("MONGO_LOG_STORAGE", "embedded")
+MONGO_LOG_COLLECTION = os.getenv("MONGO_LOG_COLLECTION", f"{MONGO_COLLECTION}_logs")
+MONGO_LOG_BUCKET_COLLECTION = os.getenv(
+    "MONGO_LOG_BUCKET_COLLECTION", f"{MONGO_COLLECTION}_log_buckets"
+)
+
 mongo_uri = f"mongodb://{MONGO_USER}:{MONGO_PASSWORD}@{MONGO_ADDRESS}"
 
-if not MONGO_DATABASE or not MONGO_COLLECTION:
-    raise ValueError(
-        "Environment variables MONGO_DATABASE and MONGO_COLLECTION must be set and non-empty strings."
+if not MONGO_DATABASE or not MONGO_COLLECTION:
+    raise ValueError(
+        "Environment variables MONGO_DATABASE and MONGO_COLLECTION must be set and non-empty strings."
+    )
+
+if MONGO_LOG_STORAGE not in ("embedded", "collection", "bucket"):
+    raise ValueError(
+        "Environment variable MONGO_LOG_STORAGE must be 'embedded', 'collection' or 'bucket'."
+    )
+
+# MongoDB connection setup
+client = MongoClient(
+    mongo_uri,
+    uuidRepresentation="standard",
+    event_listeners=[mongo_command_metrics, mongo_command_timing, slow_operation_log],
+)
+pools_collection = client[MONGO_DATABASE][MONGO_COLLECTION]
+logs_collection = client[MONGO_DATABASE][MONGO_LOG_COLLECTION]
+buckets_collection = client[MONGO_DATABASE][MONGO_LOG_BUCKET_COLLECTION]
+
+# Indexes backing the log collection: range reads per pool and lookups by log ID
+LOG_COLLECTION_INDEXES = [
+    IndexModel([("pool_id", ASCENDING), ("date", ASCENDING)]),
+    IndexModel([("pool_id", ASCENDING), ("id", ASCENDING)]),
+]
+
+# Index backing lookups of embedded logbook entries by log ID
+LOGBOOK_INDEXES = [IndexModel([("logbook.id", ASCENDING)])]
+
+# Serves the range scans and the ordering of the due maintenance queries
+POOL_INDEXES = [IndexModel([("next_maintenance", ASCENDING)])]
+
+# Indexes backing the log buckets: appends to the open bucket of a month, range
+# reads per pool and lookups by log ID
+LOG_BUCKET_INDEXES = [
+    IndexModel([("pool_id", ASCENDING), ("window", ASCENDING)]),
+    IndexModel([("pool_id", ASCENDING), ("end_date", ASCENDING)]),
+    IndexModel([("pool_id", ASCENDING), ("ids", ASCENDING)]),
+]
+
+# Maximum number of readings appended to a bucket before a new one is opened
+LOG_BUCKET_SIZE = 200
+
+# Parallel arrays of a log bucket, by logbook entry field
+BUCKET_ARRAYS = {
+    "id": "ids",
+    "date": "dates",
+    "pH_level": "pH_levels",
+    "chlorine_level": "chlorine_levels",
+    "notes": "notes",
+}
+
+# Bucket fields read back to rebuild the logbook entries
+BUCKET_PROJECTION = {"_id": 0, **{array: 1 for array in BUCKET_ARRAYS.values()}}
+
+# Recomputes the count and summaries of a bucket after its arrays were edited
+BUCKET_SUMMARY_STAGE = {
+    "$set": {
+        "count": {"$size": "$ids"},
+        "start_date": {"$min": "$dates"},
+        "end_date": {"$max": "$dates"},
+        "min_pH": {"$min": "$pH_levels"},
+        "max_pH": {"$max": "$pH_levels"},
+        "min_chlorine": {"$min": "$chlorine_levels"},
+        "max_chlorine": {"$max": "$chlorine_levels"},
+    }
+}
+
+# Log collection fields that are not part of a logbook entry
+LOG_PROJECTION = {"_id": 0, "pool_id": 0}
+
+# Sums the embedded logbook sizes of every pool
+TOTAL_LOGBOOK_PIPELINE = [
+    {
+        "$group": {
+            "_id": None,
+            "total": {"$sum": {"$size": {"$ifNull": ["$logbook", []]}}},
+        }
+    }
+]
+
+# Sums the reading counts of every log bucket
+TOTAL_BUCKET_LOGS_PIPELINE = [{"$group": {"_id": None, "total": {"$sum": "$count"}}}]
+
+# Applied by every write to a pool or its logs, so that the revision identifies
+# a version of the pool (and of its logs) for conditional requests
+REVISION_INCREMENT = {"revision": 1}
+# Its counterpart in update pipelines
+INCREMENTED_REVISION = {"$add": [{"$ifNull": ["$revision", 0]}, 1]}
+
+# Summary maintained on each pool by its log writes. A pool without logs has
+# no reading dates rather than null ones, so that the first $min and $max
+# applied to them set them
+EMPTY_LOG_SUMMARY = {"log_count": 0, "pH_sum": 0, "chlorine_sum": 0}
+LOG_SUMMARY_FIELDS = ("log_count", "pH_sum", "chlorine_sum", "first_date", "last")
+# Fields of the latest reading kept by a summary, in the order they are compared
+SUMMARY_READING_FIELDS = ("date", "pH_level", "chlorine_level")
+
+# Sums up the pool collection: any pool write changes the sum of the revisions,
+# and any insertion or deletion changes the count or the ID bounds
+POOLS_FINGERPRINT_PIPELINE = [
+    {
+        "$group": {
+            "_id": None,
+            "count": {"$sum": 1},
+            "revisions": {"$sum": {"$ifNull": ["$revision", 0]}},
+            "first_id": {"$min": "$_id"},
+            "last_id": {"$max": "$_id"},
+        }
+    }
+]
+
+# Pool fields returned by the summary listing, next to the derived log figures
+POOL_SUMMARY_FIELDS = {
+    field: 1
+    for field in (
+        "owner_name",
+        "length",
+        "width",
+        "depth",
+        "type",
+        "notes",
+        "water_volume",
+        "next_maintenance",
+        "revision",
+    )
+}
+
+# Lower bounds of the water volume ranges (cubic meters) reported by the stats
+VOLUME_BUCKET_BOUNDARIES = [0, 10, 25, 50, 100, 250, 500]
+
+# Periods the logbook series can be aggregated into, and the levels it reports
+LOG_SERIES_UNITS = ("day", "week", "month")
+LOG_SERIES_FIELDS = ("pH_level", "chlorine_level")
+
+# Safe range of each reading checked by the compliance report, and the
+# statuses it sorts readings into
+COMPLIANCE_RANGES = {
+    "pH_level": PoolUtils.PH_RANGE,
+    "chlorine_level": PoolUtils.CHLORINE_RANGE,
+}
+COMPLIANCE_STATUSES = ("too_low", "in_range", "too_high")
+
+# Windows of next maintenance dates listed by the due maintenance query, and
+# the default number of days of the `due` window
+DUE_WINDOWS = ("overdue", "due", "upcoming")
+DUE_WINDOW_DAYS = 7
+
+# Number of documents fetched per round trip when streaming pools
+STREAM_BATCH_SIZE = 100
+
+# Number of pools written per insert_many when importing pools
+IMPORT_BATCH_SIZE = 500
+
+# MongoDB error code of a write rejected on an existing _id
+DUPLICATE_KEY_ERROR = 11000
+
+# UTILS
+
+
+def logs_in_collection() -> bool:
+    """
+    Tells whether maintenance logs are stored in the log collection.
+    """
+    return MONGO_LOG_STORAGE == "collection"
+
+
+def logs_in_buckets() -> bool:
+    """
+    Tells whether maintenance logs are stored in log buckets.
+    """
+    return MONGO_LOG_STORAGE == "bucket"
+
+
+def logs_embedded() -> bool:
+    """
+    Tells whether maintenance logs are stored in the pool documents.
+    """
+    return MONGO_LOG_STORAGE == "embedded"
+
+
+def pool_projection() -> Optional[dict]:
+    """
+    Projection used for pool reads: pool metadata only when logs live elsewhere.
+    """
+    return None if logs_embedded() else {"logbook": 0}
+
+
+def log_to_document(pool_id: ObjectId, log_data: dict) -> dict:
+    """
+    Builds a log collection document from a logbook entry.
+    """
+    return {"pool_id": pool_id, **log_data}
+
+
+def date_to_bson(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """
+    Converts an ISO 8601 date or datetime to its stored form, a naive UTC
+    datetime as the driver decodes them, so that MongoDB can compare it in range
+    queries. Empty values are stored as None, datetimes are kept as they are,
+    and other strings raise ValueError.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def date_from_bson(value: Any) -> Optional[str]:
+    """
+    Converts a stored date back to its ISO 8601 form, without a time when it
+    falls at midnight, as dates are written. Strings stored by earlier versions
+    are returned as they are.
+    """
+    if isinstance(value, datetime):
+        if value.time() == datetime.min.time():
+            return value.date().isoformat()
+        return value.isoformat()
+    return value
+
+
+def stored_date(value: Any) -> Any:
+    """
+    Converts a log date to its stored form, a datetime. Strings that are not ISO
+    8601 dates, which earlier versions accepted, are kept as they are.
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        return date_to_bson(value) or value
+    except ValueError:
+        return value
+
+
+def log_date_key(value: Any) -> tuple:
+    """
+    Orders log dates as MongoDB does when a logbook mixes both forms: the
+    strings stored by earlier versions before the datetimes.
+    """
+    if isinstance(value, datetime):
+        return (1, value)
+    return (0, str(value))
+
+
+def stored_log(log_data: dict) -> dict:
+    """
+    Converts a log entry to its stored form, in place: a UUID as BSON binary and
+    the date as a datetime.
+    """
+    if isinstance(log_data.get("id"), uuid.UUID):
+        log_data["id"] = Binary.from_uuid(
+            log_data["id"], uuid_representation=UuidRepresentation.STANDARD
+        )
+    log_data["date"] = stored_date(log_data.get("date"))
+    return log_data
+
+
+def log_from_bson(log: dict) -> dict:
+    """
+    Converts the date of a stored log entry back to its ISO 8601 form, in place.
+    """
+    if "date" in log:
+        log["date"] = date_from_bson(log["date"])
+    return log
+
+
+def log_id_values(log_id: str) -> List[Any]:
+    """
+    Returns the stored forms a log ID can take: entries written by earlier
+    versions, which dumped pools to JSON before storing them, keep string IDs,
+    the others are stored as UUIDs.
+    """
+    values: List[Any] = [log_id]
+    try:
+        values.append(uuid.UUID(log_id))
+    except ValueError:
+        pass
+    return values
+
+
+def logbook_entry_query(pool_id: str, log_id: str) -> Tuple[dict, dict]:
+    """
+    Returns the filter and projection of a lookup of one embedded logbook entry
+    by ID, so that only the matching entry is sent back by MongoDB.
+    """
+    log_ids = {"$in": log_id_values(log_id)}
+    return (
+        {"_id": ObjectId(pool_id), "logbook.id": log_ids},
+        {"_id": 0, "logbook": {"$elemMatch": {"id": log_ids}}},
+    )
+
+
+def log_date_filter(
+    start_date: Optional[str] = None, end_date: Optional[str] = None
+) -> dict:
+    """
+    Builds an inclusive date range condition, empty when no bound is given.
+    """
+    date_filter = {}
+    if start_date:
+        date_filter["$gte"] = date_to_bson(start_date)
+    if end_date:
+        date_filter["$lte"] = date_to_bson(end_date)
+    return date_filter
+
+
+def logbook_range_pipeline(
+    pool_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    """
+    Builds the pipeline selecting a pool's embedded logbook entries within a
+    date range, keeping only the `limit` most recent ones.
+    """
+    logbook: Any = {"$ifNull": ["$logbook", []]}
+    conditions = [
+        {operator: ["$$log.date", bound]}
+        for operator, bound in log_date_filter(start_date, end_date).items()
+    ]
+    if conditions:
+        logbook = {
+            "$filter": {"input": logbook, "as": "log", "cond": {"$and": conditions}}
+        }
+    if limit:
+        logbook = {
+            "$slice": [
+                {"$sortArray": {"input": logbook, "sortBy": {"date": 1}}},
+                -limit,
+            ]
+        }
+    return [
+        {"$match": {"_id": ObjectId(pool_id)}},
+        {"$project": {"_id": 0, "logbook": logbook}},
+    ]
+
+
+def log_update_fields(updated_log: dict, prefix: str = "") -> dict:
+    """
+    Builds the $set document of a log update, one path per changed field under
+    `prefix`, so the rest of the entry and its ID are left untouched.
+    """
+    return {
+        f"{prefix}{field}": date_to_bson(value) if field == "date" else value
+        for field, value in updated_log.items()
+        if field != "id"
+    }
+
+
+def changes_reading(updated_log: dict) -> bool:
+    """
+    Tells whether a log edit changes a field kept by the pool summary.
+    """
+    return any(
+        field in SUMMARY_READING_FIELDS for field in log_update_fields(updated_log)
+    )
+
+
+def bucket_window(date: Union[str, datetime]) -> str:
+    """
+    Returns the time window a reading is bucketed in: the month of its date, as
+    `YYYY-MM`. Buckets written by earlier versions hold ISO 8601 strings.
+    """
+    if isinstance(date, datetime):
+        return date.strftime("%Y-%m")
+    return date[:7]
+
+
+def bucket_chunks(logs: List[dict]) -> List[List[int]]:
+    """
+    Groups the indexes of log entries by time window, in chunks of at most
+    `LOG_BUCKET_SIZE` entries, so that each chunk is appended to one bucket.
+    """
+    windows: Dict[str, List[int]] = {}
+    for index, log in enumerate(logs):
+        windows.setdefault(bucket_window(log["date"]), []).append(index)
+    return [
+        indexes[start : start + LOG_BUCKET_SIZE]
+        for indexes in windows.values()
+        for start in range(0, len(indexes), LOG_BUCKET_SIZE)
+    ]
+
+
+def bucket_append(pool_id: ObjectId, logs: List[dict]) -> UpdateOne:
+    """
+    Builds the upsert appending log entries of a same window to the open bucket
+    of their pool, creating a new bucket when they do not fit in it, and
+    widening the bucket summaries.
+    """
+    dates = sorted((log["date"] for log in logs), key=log_date_key)
+    pH_levels = [log["pH_level"] for log in logs]
+    chlorine_levels = [log["chlorine_level"] for log in logs]
+    return UpdateOne(
+        {
+            "pool_id": pool_id,
+            "window": bucket_window(dates[0]),
+            # A chunk that would overflow the open bucket starts a new one
+            "count": {"$lte": LOG_BUCKET_SIZE - len(logs)},
+        },
+        {
+            "$push": {
+                array: {"$each": [log.get(field) for log in logs]}
+                for field, array in BUCKET_ARRAYS.items()
+            },
+            "$inc": {"count": len(logs)},
+            "$min": {
+                "start_date": dates[0],
+                "min_pH": min(pH_levels),
+                "min_chlorine": min(chlorine_levels),
+            },
+            "$max": {
+                "end_date": dates[-1],
+                "max_pH": max(pH_levels),
+                "max_chlorine": max(chlorine_levels),
+            },
+        },
+        upsert=True,
+    )
+
+
+def bucket_append_operations(pool_id: ObjectId, logs: List[dict]) -> List[UpdateOne]:
+    """
+    Builds the upserts appending log entries of a pool to its buckets.
+    """
+    return [
+        bucket_append(pool_id, [logs[index] for index in chunk])
+        for chunk in bucket_chunks(logs)
+    ]
+
+
+def bucket_range_query(
+    pool_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None
+) -> dict:
+    """
+    Builds the filter of the buckets of a pool overlapping an inclusive date
+    range, using the bucket summaries.
+    """
+    query: Dict[str, Any] = {"pool_id": ObjectId(pool_id)}
+    if start_date:
+        query["end_date"] = {"$gte": date_to_bson(start_date)}
+    if end_date:
+        query["start_date"] = {"$lte": date_to_bson(end_date)}
+    return query
+
+
+def bucket_logs(bucket: dict) -> List[dict]:
+    """
+    Rebuilds the logbook entries held by a bucket.
+    """
+    return [
+        dict(zip(BUCKET_ARRAYS, values))
+        for values in zip(*(bucket[array] for array in BUCKET_ARRAYS.values()))
+    ]
+
+
+def bucket_log(bucket: dict, log_id: str) -> Optional[dict]:
+    """
+    Returns the entry of a bucket with the given log ID, None if it has none.
+    """
+    log_ids = log_id_values(log_id)
+    return next((log for log in bucket_logs(bucket) if log["id"] in log_ids), None)
+
+
+def select_logs(
+    logs: List[dict],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    """
+    Keeps the log entries within an inclusive date range, ordered by date, and
+    only the `limit` most recent ones. As in the server-side range reads, dates
+    that are not datetimes never fall within a range.
+    """
+    start, end = date_to_bson(start_date), date_to_bson(end_date)
+    if start or end:
+        logs = [
+            log
+            for log in logs
+            if isinstance(log["date"], datetime)
+            and (not start or log["date"] >= start)
+            and (not end or log["date"] <= end)
+        ]
+    logs = sorted(logs, key=lambda log: log_date_key(log["date"]))
+    return logs[-limit:] if limit else logs
+
+
+def bucket_indexes_matching(log_id: str) -> dict:
+    """
+    Builds the condition, on the index `$$i` of a bucket's arrays, matching the
+    entry with the given log ID.
+    """
+    return {
+        "$in": [
+            {"$arrayElemAt": ["$ids", "$$i"]},
+            {"$literal": log_id_values(log_id)},
+        ]
+    }
+
+
+def bucket_update_pipeline(log_id: str, updated_log: dict) -> List[dict]:
+    """
+    Builds the update pipeline setting the given fields of one entry of a
+    bucket, in place, and recomputing the bucket summaries.
+    """
+    fields = {
+        BUCKET_ARRAYS[field]: {
+            "$map": {
+                "input": {"$range": [0, {"$size": "$ids"}]},
+                "as": "i",
+                "in": {
+                    "$cond": [
+                        bucket_indexes_matching(log_id),
+                        {"$literal": value},
+                        {"$arrayElemAt": [f"${BUCKET_ARRAYS[field]}", "$$i"]},
+                    ]
+                },
+            }
+        }
+        for field, value in log_update_fields(updated_log).items()
+        if field in BUCKET_ARRAYS
+    }
+    return ([{"$set": fields}] if fields else []) + [BUCKET_SUMMARY_STAGE]
+
+
+def bucket_delete_pipeline(log_id: str) -> List[dict]:
+    """
+    Builds the update pipeline removing one entry from a bucket's arrays and
+    recomputing the bucket summaries.
+    """
+    return [
+        {
+            "$set": {
+                "kept": {
+                    "$filter": {
+                        "input": {"$range": [0, {"$size": "$ids"}]},
+                        "as": "i",
+                        "cond": {"$not": [bucket_indexes_matching(log_id)]},
+                    }
+                }
+            }
+        },
+        {
+            "$set": {
+                array: {
+                    "$map": {
+                        "input": "$kept",
+                        "as": "i",
+                        "in": {"$arrayElemAt": [f"${array}", "$$i"]},
+                    }
+                }
+                for array in BUCKET_ARRAYS.values()
+            }
+        },
+        {"$unset": "kept"},
+        BUCKET_SUMMARY_STAGE,
+    ]
+
+
+def bucket_entry_stages() -> List[dict]:
+    """
+    Builds the stages turning log buckets into one document per log entry,
+    carrying its `pool_id`.
+    """
+    return [
+        {
+            "$project": {
+                "pool_id": 1,
+                "entries": {
+                    "$map": {
+                        "input": {"$range": [0, {"$size": "$ids"}]},
+                        "as": "i",
+                        "in": {
+                            field: {"$arrayElemAt": [f"${array}", "$$i"]}
+                            for field, array in BUCKET_ARRAYS.items()
+                        },
+                    }
+                },
+            }
+        },
+        {"$unwind": "$entries"},
+        {"$replaceWith": {"$mergeObjects": ["$entries", {"pool_id": "$pool_id"}]}},
+    ]
+
+
+def log_source_stages() -> List[dict]:
+    """
+    Builds the stages turning the configured log storage into one document per
+    log entry, carrying its `pool_id`. They run on `log_source_collection()`.
+    """
+    if logs_in_collection():
+        return []
+    if logs_in_buckets():
+        return bucket_entry_stages()
+    return [
+        {"$project": {"logbook": 1}},
+        {"$unwind": "$logbook"},
+        {"$replaceWith": {"$mergeObjects": ["$logbook", {"pool_id": "$_id"}]}},
+    ]
+
+
+def log_source_collection():
+    """
+    Returns the collection `log_source_stages()` runs on.
+    """
+    if logs_in_collection():
+        return logs_collection
+    return buckets_collection if logs_in_buckets() else pools_collection
+
+
+def summary_reading(log: dict) -> dict:
+    """
+    Returns the reading of a log entry, as kept by a summary for its latest log.
+    """
+    return {field: log[field] for field in SUMMARY_READING_FIELDS}
+
+
+def logs_summary(logs: List[dict]) -> dict:
+    """
+    Computes the summary of a pool's logs: their count, the first reading date,
+    the latest reading, and the level sums from which averages are derived.
+    """
+    if not logs:
+        return dict(EMPTY_LOG_SUMMARY)
+    readings = [summary_reading(log) for log in logs]
+    return {
+        "log_count": len(readings),
+        "pH_sum": sum(reading["pH_level"] for reading in readings),
+        "chlorine_sum": sum(reading["chlorine_level"] for reading in readings),
+        "first_date": min((reading["date"] for reading in readings), key=log_date_key),
+        # Same order as $max on the readings: by date, then by levels
+        "last": max(
+            readings,
+            key=lambda reading: (
+                log_date_key(reading["date"]),
+                reading["pH_level"],
+                reading["chlorine_level"],
+            ),
+        ),
+    }
+
+
+def summary_append_update(logs: List[dict]) -> dict:
+    """
+    Builds the pool update adding appended logs to its summary and incrementing
+    its revision. $max keeps the latest reading, as readings compare field by
+    field, starting with their date.
+    """
+    summary = logs_summary(logs)
+    return {
+        "$inc": {
+            **REVISION_INCREMENT,
+            "summary.log_count": summary["log_count"],
+            "summary.pH_sum": summary["pH_sum"],
+            "summary.chlorine_sum": summary["chlorine_sum"],
+        },
+        "$min": {"summary.first_date": summary["first_date"]},
+        "$max": {"summary.last": summary["last"]},
+    }
+
+
+def summary_reset_update(summary: dict) -> dict:
+    """
+    Builds the pool update replacing its summary and incrementing its revision.
+    """
+    return {"$set": {"summary": summary}, "$inc": REVISION_INCREMENT}
+
+
+def logbook_summary_expression() -> dict:
+    """
+    Builds the expression computing the summary of an embedded logbook, for the
+    update pipelines rewriting the logbook.
+    """
+    logbook = {"$ifNull": ["$logbook", []]}
+    has_logs = {"$gt": [{"$size": logbook}, 0]}
+    last = {
+        "$max": {
+            "$map": {
+                "input": logbook,
+                "in": {field: f"$$this.{field}" for field in SUMMARY_READING_FIELDS},
+            }
+        }
+    }
+    return {
+        "log_count": {"$size": logbook},
+        "pH_sum": {"$sum": "$logbook.pH_level"},
+        "chlorine_sum": {"$sum": "$logbook.chlorine_level"},
+        "first_date": {"$cond": [has_logs, {"$min": "$logbook.date"}, "$$REMOVE"]},
+        "last": {"$cond": [has_logs, last, "$$REMOVE"]},
+    }
+
+
+def logbook_update_pipeline(log_id: str, updated_log: dict) -> List[dict]:
+    """
+    Builds the update pipeline setting the given fields of one embedded logbook
+    entry and recomputing the pool summary, for edits changing a reading.
+    """
+    return [
+        {
+            "$set": {
+                "logbook": {
+                    "$map": {
+                        "input": "$logbook",
+                        "in": {
+                            "$cond": [
+                                {
+                                    "$in": [
+                                        "$$this.id",
+                                        {"$literal": log_id_values(log_id)},
+                                    ]
+                                },
+                                {
+                                    "$mergeObjects": [
+                                        "$$this",
+                                        {"$literal": log_update_fields(updated_log)},
+                                    ]
+                                },
+                                "$$this",
+                            ]
+                        },
+                    }
+                },
+                "revision": INCREMENTED_REVISION,
+            }
+        },
+        {"$set": {"summary": logbook_summary_expression()}},
+    ]
+
+
+def logbook_delete_pipeline(log_id: str) -> List[dict]:
+    """
+    Builds the update pipeline removing one entry from an embedded logbook and
+    recomputing the pool summary.
+    """
+    return [
+        {
+            "$set": {
+                "logbook": {
+                    "$filter": {
+                        "input": "$logbook",
+                        "cond": {
+                            "$not": [
+                                {
+                                    "$in": [
+                                        "$$this.id",
+                                        {"$literal": log_id_values(log_id)},
+                                    ]
+                                }
+                            ]
+                        },
+                    }
+                },
+                "revision": INCREMENTED_REVISION,
+            }
+        },
+        {"$set": {"summary": logbook_summary_expression()}},
+    ]
+
+
+def log_summary_pipeline(pool_id: Optional[str] = None) -> List[dict]:
+    """
+    Builds the pipeline computing the summary of the logs of one pool, or of
+    every pool, from the log collection or buckets: one document per pool with
+    its `summary`.
+    """
+    match = [{"$match": {"pool_id": ObjectId(pool_id)}}] if pool_id else []
+    return (
+        match
+        + log_source_stages()
+        + [
+            {
+                "$group": {
+                    "_id": "$pool_id",
+                    "log_count": {"$sum": 1},
+                    "pH_sum": {"$sum": "$pH_level"},
+                    "chlorine_sum": {"$sum": "$chlorine_level"},
+                    "first_date": {"$min": "$date"},
+                    "last": {
+                        "$max": {field: f"${field}" for field in SUMMARY_READING_FIELDS}
+                    },
+                }
+            },
+            {
+                "$project": {
+                    "summary": {field: f"${field}" for field in LOG_SUMMARY_FIELDS}
+                }
+            },
+        ]
+    )
+
+
+def pools_per_type_pipeline() -> List[dict]:
+    """
+    Builds the pipeline counting pools per type, most common first.
+    """
+    return [
+        {"$group": {"_id": "$type", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$project": {"_id": 0, "type": "$_id", "count": 1}},
+    ]
+
+
+def volume_distribution_pipeline() -> List[dict]:
+    """
+    Builds the pipeline computing the water volume range counts along with the
+    overall volume figures.
+    """
+    return [
+        {
+            "$facet": {
+                "ranges": [
+                    {
+                        "$bucket": {
+                            "groupBy": "$water_volume",
+                            "boundaries": VOLUME_BUCKET_BOUNDARIES,
+                            "default": "other",
+                            "output": {"count": {"$sum": 1}},
+                        }
+                    }
+                ],
+                "overall": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "min": {"$min": "$water_volume"},
+                            "max": {"$max": "$water_volume"},
+                            "average": {"$avg": "$water_volume"},
+                            "total": {"$sum": "$water_volume"},
+                        }
+                    },
+                    {"$project": {"_id": 0}},
+                ],
+            }
+        }
+    ]
+
+
+def parse_volume_distribution(mongo_data: Dict[str, Any]) -> dict:
+    """
+    Maps the volume distribution pipeline result to labelled ranges.
+    """
+    bounds = VOLUME_BUCKET_BOUNDARIES
+    ranges = []
+    for bucket in mongo_data["ranges"]:
+        lower = bucket["_id"]
+        if lower == "other":
+            # Volumes above the last boundary, or missing
+            label = f"{bounds[-1]}+"
+        else:
+            label = f"{lower}-{bounds[bounds.index(lower) + 1]}"
+        ranges.append({"range": label, "count": bucket["count"]})
+    overall = mongo_data["overall"][0] if mongo_data["overall"] else {}
+    return {"ranges": ranges, **overall}
+
+
+def logs_per_month_pipeline() -> List[dict]:
+    """
+    Builds the pipeline counting logs per month, oldest first.
+    """
+    return log_source_stages() + [
+        {
+            "$group": {
+                "_id": {
+                    "$dateToString": {
+                        "format": "%Y-%m",
+                        "date": {
+                            "$convert": {
+                                "input": "$date",
+                                "to": "date",
+                                "onError": None,
+                                "onNull": None,
+                            }
+                        },
+                    }
+                },
+                "count": {"$sum": 1},
+            }
+        },
+        {"$sort": {"_id": 1}},
+        {"$project": {"_id": 0, "month": "$_id", "count": 1}},
+    ]
+
+
+def log_period(unit: str) -> dict:
+    """
+    Builds the expression truncating a log date to the start of its day, week
+    (starting on Monday) or month, null if the date cannot be read.
+    """
+    period: Dict[str, Any] = {
+        "date": {
+            "$convert": {
+                "input": "$date",
+                "to": "date",
+                "onError": None,
+                "onNull": None,
+            }
+        },
+        "unit": unit,
+    }
+    if unit == "week":
+        period["startOfWeek"] = "monday"
+    return {"$dateTrunc": period}
+
+
+def log_series_pipeline(
+    pool_id: str,
+    unit: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> List[dict]:
+    """
+    Builds the pipeline aggregating a pool's logs within an inclusive date range
+    into day, week (starting on Monday) or month periods, oldest first, with the
+    count and the minimum, maximum and mean pH and chlorine levels of each.
+    Runs on `log_source_collection()`.
+    """
+    date_filter = log_date_filter(start_date, end_date)
+    if logs_in_collection():
+        query: Dict[str, Any] = {"pool_id": ObjectId(pool_id)}
+        if date_filter:
+            query["date"] = date_filter
+        stages = [{"$match": query}]
+    elif logs_in_buckets():
+        stages = [{"$match": bucket_range_query(pool_id, start_date, end_date)}]
+        stages += bucket_entry_stages()
+        if date_filter:
+            # Buckets overlapping the range may hold entries outside of it
+            stages.append({"$match": {"date": date_filter}})
+    else:
+        stages = logbook_range_pipeline(pool_id, start_date, end_date)
+        stages += [{"$unwind": "$logbook"}, {"$replaceWith": "$logbook"}]
+
+    group: Dict[str, Any] = {"_id": log_period(unit), "count": {"$sum": 1}}
+    levels = {}
+    for field in LOG_SERIES_FIELDS:
+        for statistic in ("min", "max", "avg"):
+            group[f"{field}_{statistic}"] = {f"${statistic}": f"${field}"}
+        levels[field] = {
+            "min": f"${field}_min",
+            "max": f"${field}_max",
+            "mean": f"${field}_avg",
+        }
+    return stages + [
+        {"$group": group},
+        # Logs whose date could not be read
+        {"$match": {"_id": {"$ne": None}}},
+        {"$sort": {"_id": 1}},
+        {
+            "$project": {
+                "_id": 0,
+                "period": {"$dateToString": {"format": "%Y-%m-%d", "date": "$_id"}},
+                "count": 1,
+                **levels,
+            }
+        },
+    ]
+
+
+def level_status(field: str, value: Optional[str] = None) -> dict:
+    """
+    Builds the expression sorting a reading of `field`, read from `value`
+    (the field itself by default), into `too_low`, `in_range` or `too_high`,
+    as `PoolUtils` does.
+    """
+    low, high = COMPLIANCE_RANGES[field]
+    value = value or f"${field}"
+    return {
+        "$switch": {
+            "branches": [
+                {"case": {"$lt": [value, low]}, "then": "too_low"},
+                {"case": {"$gt": [value, high]}, "then": "too_high"},
+            ],
+            "default": "in_range",
+        }
+    }
+
+
+def compliance_pipeline(unit: str = "month") -> List[dict]:
+    """
+    Builds the pipeline counting the readings too low, in range and too high,
+    per pool type and per period, oldest first. Logs are first counted per
+    pool, so that the pool type is only looked up once per pool and period.
+    Runs on `log_source_collection()`.
+    """
+    counts: Dict[str, Any] = {"count": {"$sum": 1}}
+    for field in COMPLIANCE_RANGES:
+        for status in COMPLIANCE_STATUSES:
+            counts[f"{field}_{status}"] = {
+                "$sum": {"$cond": [{"$eq": [f"${field}_status", status]}, 1, 0]}
+            }
+    return log_source_stages() + [
+        {
+            "$set": {
+                f"{field}_status": level_status(field) for field in COMPLIANCE_RANGES
+            }
+        },
+        {
+            "$group": {
+                "_id": {"pool_id": "$pool_id", "period": log_period(unit)},
+                **counts,
+            }
+        },
+        {"$match": {"_id.period": {"$ne": None}}},
+        {
+            "$lookup": {
+                "from": MONGO_COLLECTION,
+                "localField": "_id.pool_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"_id": 0, "type": 1}}],
+                "as": "pool",
+            }
+        },
+        {
+            "$group": {
+                "_id": {"type": {"$first": "$pool.type"}, "period": "$_id.period"},
+                **{name: {"$sum": f"${name}"} for name in counts},
+            }
+        },
+        {"$sort": {"_id.period": 1, "_id.type": 1}},
+        {
+            "$project": {
+                "_id": 0,
+                "type": "$_id.type",
+                "period": {
+                    "$dateToString": {"format": "%Y-%m-%d", "date": "$_id.period"}
+                },
+                "count": 1,
+                **{
+                    field: {
+                        status: f"${field}_{status}" for status in COMPLIANCE_STATUSES
+                    }
+                    for field in COMPLIANCE_RANGES
+                },
+            }
+        },
+    ]
+
+
+def parse_non_compliant_pools(pools: List[dict]) -> List[dict]:
+    """
+    Converts the latest reading dates of the non-compliant pools to ISO 8601.
+    """
+    for pool in pools:
+        pool["last_log_date"] = date_from_bson(pool.get("last_log_date"))
+    return pools
+
+
+def non_compliant_pools_pipeline() -> List[dict]:
+    """
+    Builds the pipeline listing the pools whose latest reading is out of range,
+    with the status of each level.
+    """
+    out_of_range = []
+    for field, (low, high) in COMPLIANCE_RANGES.items():
+        out_of_range.append({f"last_{field}": {"$lt": low}})
+        out_of_range.append({f"last_{field}": {"$gt": high}})
+    return pool_summary_pipeline() + [
+        {"$match": {"$or": out_of_range}},
+        {
+            "$project": {
+                "_id": 0,
+                "id": {"$toString": "$_id"},
+                "owner_name": 1,
+                "type": 1,
+                "last_log_date": 1,
+                **{
+                    field: {
+                        "value": f"$last_{field}",
+                        "status": level_status(field, f"$last_{field}"),
+                    }
+                    for field in COMPLIANCE_RANGES
+                },
+            }
+        },
+        {"$sort": {"last_log_date": -1}},
+    ]
+
+
+def pool_summary_pipeline() -> List[dict]:
+    """
+    Builds the pipeline listing pools without their logbook, with the log
+    figures read from the summary stored on each pool, whatever the log storage
+    mode and the number of logs.
+    """
+    log_count = {"$ifNull": ["$summary.log_count", 0]}
+    has_logs = {"$gt": [log_count, 0]}
+    return [
+        {
+            "$project": {
+                **POOL_SUMMARY_FIELDS,
+                "log_count": log_count,
+                "first_log_date": "$summary.first_date",
+                "last_log_date": "$summary.last.date",
+                "last_pH_level": "$summary.last.pH_level",
+                "last_chlorine_level": "$summary.last.chlorine_level",
+                "average_pH_level": {
+                    "$cond": [
+                        has_logs,
+                        {"$divide": ["$summary.pH_sum", log_count]},
+                        None,
+                    ]
+                },
+                "average_chlorine_level": {
+                    "$cond": [
+                        has_logs,
+                        {"$divide": ["$summary.chlorine_sum", log_count]},
+                        None,
+                    ]
+                },
+            }
+        }
+    ]
+
+
+def due_window(
+    window: str, days: int, today: date
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Returns the bounds, start included and end excluded, of the next maintenance
+    dates in a window: `overdue` before today, `due` from today until `days`
+    days ahead, and `upcoming` after that. None leaves a side open.
+    """
+    start_of_today = datetime.combine(today, datetime.min.time())
+    horizon = start_of_today + timedelta(days=days)
+    return {
+        "overdue": (None, start_of_today),
+        "due": (start_of_today, horizon),
+        "upcoming": (horizon, None),
+    }[window]
+
+
+def due_pools_pipeline(
+    window: str,
+    days: int = DUE_WINDOW_DAYS,
+    limit: Optional[int] = None,
+    today: Optional[date] = None,
+) -> List[dict]:
+    """
+    Builds the pipeline listing the summaries of the pools whose next
+    maintenance falls in a window, soonest first, as a range scan of the
+    next_maintenance index. Dates left as strings by earlier versions are not
+    matched, as a range over datetimes only matches datetimes.
+    """
+    start, end = due_window(window, days, today or datetime.now(timezone.utc).date())
+    bounds = {}
+    if start is not None:
+        bounds["$gte"] = start
+    if end is not None:
+        bounds["$lt"] = end
+    stages = [
+        {"$match": {"next_maintenance": bounds}},
+        {"$sort": {"next_maintenance": 1}},
+    ]
+    if limit:
+        stages.append({"$limit": limit})
+    return stages + pool_summary_pipeline()
+
+
+def encode_page_cursor(last_id: ObjectId) -> str:
+    """
+    Builds the opaque cursor pointing past the given pool ID.
+    """
+    return base64.urlsafe_b64encode(last_id.binary).decode().rstrip("=")
+
+
+def decode_page_cursor(cursor: str) -> ObjectId:
+    """
+    Recovers the pool ID a page cursor points past.
+    """
+    return ObjectId(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+
+def pool_page_query(cursor: Optional[str] = None) -> dict:
+    """
+    Builds the keyset condition selecting the pools after a page cursor.
+    """
+    return {"_id": {"$gt": decode_page_cursor(cursor)}} if cursor else {}
+
+
+def pool_page_pipeline(limit: int, cursor: Optional[str] = None) -> List[dict]:
+    """
+    Builds the summary pipeline for one page, fetching one extra pool to detect
+    whether another page follows.
+    """
+    return [
+        {"$match": pool_page_query(cursor)},
+        {"$sort": {"_id": 1}},
+        {"$limit": limit + 1},
+    ] + pool_summary_pipeline()
+
+
+def split_page(documents: List[dict], limit: int) -> Tuple[List[dict], Optional[str]]:
+    """
+    Drops the extra pool fetched past the page and derives the next page cursor,
+    None on the last page.
+    """
+    if len(documents) > limit:
+        documents = documents[:limit]
+        return documents, encode_page_cursor(documents[-1]["_id"])
+    return documents, None
+
+
+def bulk_log_operations(
+    pool_logs: List[Tuple[str, dict]], existing_ids: Set[ObjectId]
+) -> Tuple[list, List[List[int]], List[Optional[str]]]:
+    """
+    Builds the unordered bulk write of a batch of (pool ID, log) entries: one
+    $push per pool in the embedded mode, one upsert per bucket written in the
+    bucket mode, one insert per log otherwise.
+    Returns the operations, the batch indexes written by each operation, and the
+    per-entry errors, set for the entries of invalid or missing pools.
+    """
+    errors: List[Optional[str]] = [None] * len(pool_logs)
+    entries_per_pool: Dict[ObjectId, List[int]] = {}
+    for index, (pool_id, _) in enumerate(pool_logs):
+        if not ObjectId.is_valid(pool_id):
+            errors[index] = "Invalid pool ID."
+        elif ObjectId(pool_id) not in existing_ids:
+            errors[index] = "Pool not found."
+        else:
+            entries_per_pool.setdefault(ObjectId(pool_id), []).append(index)
+
+    if logs_in_buckets():
+        op_entries = []
+        operations = []
+        for pool_id, indexes in entries_per_pool.items():
+            logs = [pool_logs[index][1] for index in indexes]
+            for chunk in bucket_chunks(logs):
+                op_entries.append([indexes[position] for position in chunk])
+                operations.append(
+                    bucket_append(pool_id, [logs[position] for position in chunk])
+                )
+        return operations, op_entries, errors
+
+    if logs_in_collection():
+        op_entries = [
+            [index] for indexes in entries_per_pool.values() for index in indexes
+        ]
+        operations = [
+            InsertOne(
+                log_to_document(ObjectId(pool_logs[index][0]), pool_logs[index][1])
+            )
+            for (index,) in op_entries
+        ]
+        return operations, op_entries, errors
+
+    op_entries = list(entries_per_pool.values())
+    operations = [
+        UpdateOne(
+            {"_id": pool_id},
+            {
+                "$push": {"logbook": {"$each": [pool_logs[i][1] for i in indexes]}},
+                **summary_append_update([pool_logs[i][1] for i in indexes]),
+            },
+        )
+        for pool_id, indexes in entries_per_pool.items()
+    ]
+    return operations, op_entries, errors
+
+
+def summary_append_operations(
+    pool_logs: List[Tuple[str, dict]], errors: List[Optional[str]]
+) -> List[UpdateOne]:
+    """
+    Builds the pool updates adding the entries of a bulk write that were written
+    to the log collection or buckets to the summaries of their pools.
+    """
+    written: Dict[ObjectId, List[dict]] = {}
+    for (pool_id, log_data), error in zip(pool_logs, errors):
+        if error is None:
+            written.setdefault(ObjectId(pool_id), []).append(log_data)
+    return [
+        UpdateOne({"_id": pool_id}, summary_append_update(logs))
+        for pool_id, logs in written.items()
+    ]
+
+
+def record_bulk_write_errors(
+    details: dict, op_entries: List[List[int]], errors: List[Optional[str]]
+):
+    """
+    Reports the failed operations of an unordered bulk write on the entries they
+    were writing.
+    """
+    for write_error in details.get("writeErrors", []):
+        for index in op_entries[write_error["index"]]:
+            errors[index] = write_error.get("errmsg", "Write failed.")
+
+
+def export_pipeline() -> List[dict]:
+    """
+    Pipeline yielding every pool with its complete logbook, ordered by creation,
+    whatever the log storage mode.
+    """
+    if logs_embedded():
+        return [{"$sort": {"_id": 1}}]
+    if logs_in_buckets():
+        log_collection = MONGO_LOG_BUCKET_COLLECTION
+        log_pipeline = bucket_entry_stages()
+    else:
+        log_collection = MONGO_LOG_COLLECTION
+        log_pipeline = []
+    return [
+        {"$sort": {"_id": 1}},
+        {
+            "$lookup": {
+                "from": log_collection,
+                "localField": "_id",
+                "foreignField": "pool_id",
+                "pipeline": log_pipeline
+                + [{"$sort": {"date": 1}}, {"$project": LOG_PROJECTION}],
+                "as": "logbook",
+            }
+        },
+    ]
+
+
+def pool_update_document(updated_data: dict) -> dict:
+    """
+    Builds the update of a pool from the fields sent by a client, incrementing
+    its revision.
+    """
+    # The revision and the log summary are only ever written by the database
+    updated_data = {
+        k: v for k, v in updated_data.items() if k not in ("revision", "summary")
+    }
+    if not logs_embedded():
+        # Logs are only written through the log operations in these modes
+        updated_data = {k: v for k, v in updated_data.items() if k != "logbook"}
+    elif "logbook" in updated_data:
+        updated_data["logbook"] = [stored_log(log) for log in updated_data["logbook"]]
+        updated_data["summary"] = logs_summary(updated_data["logbook"])
+    if "next_maintenance" in updated_data:
+        updated_data["next_maintenance"] = date_to_bson(
+            updated_data["next_maintenance"]
+        )
+    update = {"$inc": REVISION_INCREMENT}
+    if updated_data:
+        update["$set"] = updated_data
+    return update
+
+
+def pool_import_document(pool: Pool) -> dict:
+    """
+    Builds the stored form of an imported pool, keeping its ID when it is a valid
+    ObjectId so that importing the same export twice does not duplicate pools.
+    """
+    pool_data = pool_to_bson(pool)
+    pool_id = pool_data.pop("id", None)
+    if pool_id and ObjectId.is_valid(pool_id):
+        pool_data["_id"] = ObjectId(pool_id)
+    return pool_data
+
+
+def duplicate_insert_indexes(details: dict) -> Set[int]:
+    """
+    Returns the batch indexes of the documents an unordered insert_many skipped
+    because they already exist. Any other write error is raised.
+    """
+    skipped = set()
+    for write_error in details.get("writeErrors", []):
+        if write_error.get("code") != DUPLICATE_KEY_ERROR:
+            raise BulkWriteError(details)
+        skipped.add(write_error["index"])
+    return skipped
+
+
+def imported_log_documents(
+    documents: List[dict], logbooks: List[List[dict]], skipped: Set[int]
+) -> List[dict]:
+    """
+    Builds the log collection documents of the logbooks split from a batch of
+    imported pools, leaving out the pools that were skipped.
+    """
+    return [
+        log_to_document(document["_id"], log)
+        for index, (document, logbook) in enumerate(zip(documents, logbooks))
+        if index not in skipped
+        for log in logbook
+    ]
+
+
+def imported_bucket_operations(
+    documents: List[dict], logbooks: List[List[dict]], skipped: Set[int]
+) -> List[UpdateOne]:
+    """
+    Builds the bucket upserts of the logbooks split from a batch of imported
+    pools, leaving out the pools that were skipped.
+    """
+    return [
+        operation
+        for index, (document, logbook) in enumerate(zip(documents, logbooks))
+        if index not in skipped
+        for operation in bucket_append_operations(document["_id"], logbook)
+    ]
+
+
+def parse_pools_fingerprint(results: List[dict]) -> str:
+    """
+    Encodes the result of the pool collection fingerprint pipeline.
+    """
+    if not results:
+        return "0"
+    fingerprint = results[0]
+    return "-".join(
+        str(fingerprint[field])
+        for field in ("count", "revisions", "first_id", "last_id")
     )
 
-# MongoDB connection setup
-client = MongoClient(mongo_uri, uuidRepresentation="standard")
-pools_collection = client[MONGO_DATABASE][MONGO_COLLECTION]
 
-# UTILS
+def fingerprint_of(ids: List[str], revisions: List[int]) -> str:
+    """
+    Computes the pool collection fingerprint from the IDs and revisions of every
+    pool, the same way as the fingerprint pipeline.
+    """
+    if not ids:
+        return "0"
+    object_ids = [ObjectId(pool_id) for pool_id in ids]
+    return "-".join(
+        str(value)
+        for value in (len(ids), sum(revisions), min(object_ids), max(object_ids))
+    )
+
+
+def pools_fingerprint(pools: List[Union[Pool, PoolSummary]]) -> str:
+    """
+    Computes the pool collection fingerprint of a full listing already read.
+    """
+    return fingerprint_of(
+        [pool.id for pool in pools], [pool.revision for pool in pools]
+    )
+
+
+def raw_pools_fingerprint(pools: List[dict]) -> str:
+    """
+    Computes the pool collection fingerprint of a raw full listing already read.
+    """
+    return fingerprint_of(
+        [pool["id"] for pool in pools], [pool["revision"] for pool in pools]
+    )
+
+
+@timed_phase("build")
+def parse_pool_summary(mongo_data: Dict[str, Any]) -> PoolSummary:
+    # Expose MongoDB's _id as the summary id
+    mongo_data["id"] = str(mongo_data.pop("_id"))
+    for field in ("next_maintenance", "first_log_date", "last_log_date"):
+        mongo_data[field] = date_from_bson(mongo_data.get(field))
+    return PoolSummary(**mongo_data)
 
 
+@timed_phase("build")
 def parse_pool_data(mongo_data: Dict[str, Any]) -> Pool:
     # Convert MongoDB's _id (ObjectId) to UUID
     pool_id = str(mongo_data["_id"])  # Convert ObjectId to UUID
     # Convert logbook entries' ids from UUID string to UUID object
     logbook = []
     for log in mongo_data.get("logbook", []):
+        # Stored entries were validated when written, and may hold dates that
+        # earlier versions accepted
         logbook.append(
-            PoolLog(
-                id=log["id"],
-                date=log["date"],
+            PoolLog.model_construct(
+                id=log["id"]
+                if isinstance(log["id"], uuid.UUID)
+                else uuid.UUID(log["id"]),
+                date=date_from_bson(log["date"]),
                 pH_level=log["pH_level"],
                 chlorine_level=log["chlorine_level"],
                 notes=log["notes"],
@@ -61,54 +1525,283 @@ def parse_pool_data(mongo_data: Dict[str, Any]) -> Pool:
         type=mongo_data["type"],
         notes=mongo_data["notes"],
         water_volume=mongo_data["water_volume"],
-        next_maintenance=mongo_data.get("next_maintenance"),
+        next_maintenance=date_from_bson(mongo_data.get("next_maintenance")),
+        revision=mongo_data.get("revision", 0),
         logbook=logbook,
     )
 
 
-# Helper function to convert Pool to dictionary
-def pool_to_dict(pool: Pool):
-    return json.loads(pool.json())
+@timed_phase("build")
+def raw_pool_data(mongo_data: Dict[str, Any]) -> dict:
+    """
+    Maps a stored pool straight to its response form, without building the
+    models: pools are validated when written, so the stored fields and logbook
+    entries are returned as decoded by the driver.
+    """
+    return {
+        "id": str(mongo_data["_id"]),
+        "owner_name": mongo_data["owner_name"],
+        "length": mongo_data["length"],
+        "width": mongo_data["width"],
+        "depth": mongo_data["depth"],
+        "type": mongo_data["type"],
+        "notes": mongo_data.get("notes"),
+        "water_volume": mongo_data["water_volume"],
+        "next_maintenance": date_from_bson(mongo_data.get("next_maintenance")),
+        "revision": mongo_data.get("revision", 0),
+        "logbook": [log_from_bson(log) for log in mongo_data.get("logbook", [])],
+    }
+
+
+def log_to_bson(log: PoolLog) -> dict:
+    """
+    Converts a log entry to its stored form, with its UUID as BSON binary and
+    its date as a datetime.
+    """
+    return stored_log(log.model_dump())
+
+
+def pool_to_bson(pool: Pool) -> dict:
+    """
+    Converts a pool to its stored form straight from the model, without a JSON
+    round trip, keeping the log UUIDs as BSON binary and the next maintenance
+    as a datetime, along with the summary of its logbook.
+    """
+    pool_data = pool.model_dump(exclude={"logbook"})
+    pool_data["next_maintenance"] = date_to_bson(pool.next_maintenance)
+    pool_data["logbook"] = [log_to_bson(log) for log in pool.logbook]
+    pool_data["summary"] = logs_summary(pool_data["logbook"])
+    return pool_data
 
 
 # MONGO OPERATIONS
 
 
+def ensure_indexes():
+    """
+    Creates the pool indexes, and the ones required by the configured log
+    storage.
+    """
+    pools_collection.create_indexes(POOL_INDEXES)
+    if logs_in_collection():
+        logs_collection.create_indexes(LOG_COLLECTION_INDEXES)
+    elif logs_in_buckets():
+        buckets_collection.create_indexes(LOG_BUCKET_INDEXES)
+    else:
+        pools_collection.create_indexes(LOGBOOK_INDEXES)
+
+
 def create_pool(pool: Pool):
     """
     Inserts a new pool into the database.
     """
-    pool_data = pool_to_dict(pool)
+    pool_data = pool_to_bson(pool)
+    pool_data["revision"] = 1
+    logbook = [] if logs_embedded() else pool_data.pop("logbook", [])
     result = pools_collection.insert_one(pool_data)
+    if logbook and logs_in_buckets():
+        buckets_collection.bulk_write(
+            bucket_append_operations(result.inserted_id, logbook)
+        )
+    elif logbook:
+        logs_collection.insert_many(
+            [log_to_document(result.inserted_id, log) for log in logbook]
+        )
+    pool_cache.invalidate_pool(str(result.inserted_id))
     return str(result.inserted_id)
 
 
 def read_all_pools() -> List[Pool]:
     """
-    Retrieves all pools from the database.
+    Retrieves all pools from the database, through the pool cache.
+    """
+    found, pools, generation = pool_cache.get(ALL_POOLS_KEY)
+    if found:
+        return pools
+    results = pools_collection.find({}, pool_projection())
+    pools = [parse_pool_data(pool) for pool in results]
+    pool_cache.put(ALL_POOLS_KEY, pools, generation)
+    return pools
+
+
+def read_all_raw_pools() -> List[dict]:
+    """
+    Retrieves all pools from the database in their response form, without
+    building the models, through the pool cache.
+    """
+    found, pools, generation = pool_cache.get(ALL_RAW_POOLS_KEY)
+    if found:
+        return pools
+    results = pools_collection.find({}, pool_projection())
+    pools = [raw_pool_data(pool) for pool in results]
+    pool_cache.put(ALL_RAW_POOLS_KEY, pools, generation)
+    return pools
+
+
+def read_pool_summaries() -> List[PoolSummary]:
+    """
+    Retrieves all pools from the database as summaries, without their logbook.
+    """
+    results = pools_collection.aggregate(pool_summary_pipeline())
+    return [parse_pool_summary(pool) for pool in results]
+
+
+def read_due_pools(
+    window: str, days: int = DUE_WINDOW_DAYS, limit: Optional[int] = None
+) -> List[PoolSummary]:
+    """
+    Retrieves the summaries of the pools whose next maintenance falls in a
+    window, soonest first.
+    """
+    results = pools_collection.aggregate(due_pools_pipeline(window, days, limit))
+    return [parse_pool_summary(pool) for pool in results]
+
+
+def read_pools_page(
+    limit: int, cursor: Optional[str] = None, summary: bool = False
+) -> Tuple[List[Union[Pool, PoolSummary]], Optional[str]]:
+    """
+    Retrieves one page of pools ordered by ID, starting after the given cursor.
+    Returns the pools and the cursor of the next page, None on the last page.
+    """
+    if summary:
+        documents = list(pools_collection.aggregate(pool_page_pipeline(limit, cursor)))
+    else:
+        documents = list(
+            pools_collection.find(pool_page_query(cursor), pool_projection())
+            .sort("_id", 1)
+            .limit(limit + 1)
+        )
+    documents, next_cursor = split_page(documents, limit)
+    parse = parse_pool_summary if summary else parse_pool_data
+    return [parse(pool) for pool in documents], next_cursor
+
+
+def iter_pools(summary: bool = False) -> Iterator[Union[Pool, PoolSummary]]:
+    """
+    Yields every pool as soon as it is decoded, fetching them in small batches.
+    """
+    if summary:
+        results = pools_collection.aggregate(
+            pool_summary_pipeline(), batchSize=STREAM_BATCH_SIZE
+        )
+        for pool in results:
+            yield parse_pool_summary(pool)
+    else:
+        results = pools_collection.find(
+            {}, pool_projection(), batch_size=STREAM_BATCH_SIZE
+        )
+        for pool in results:
+            yield parse_pool_data(pool)
+
+
+def iter_export_pools() -> Iterator[Pool]:
+    """
+    Yields every pool with its logbook straight from a cursor, fetching them in
+    small batches.
+    """
+    results = pools_collection.aggregate(export_pipeline(), batchSize=STREAM_BATCH_SIZE)
+    for pool in results:
+        yield parse_pool_data(pool)
+
+
+def insert_pool_batch(pools: List[Pool]) -> Tuple[int, int]:
+    """
+    Inserts a batch of imported pools with a single unordered insert_many,
+    skipping the pools that already exist.
+    Returns the number of imported and skipped pools.
+    """
+    documents = [pool_import_document(pool) for pool in pools]
+    logbooks = (
+        [] if logs_embedded() else [document.pop("logbook") for document in documents]
+    )
+    skipped: Set[int] = set()
+    try:
+        pools_collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        skipped = duplicate_insert_indexes(e.details)
+    if logs_in_buckets():
+        operations = imported_bucket_operations(documents, logbooks, skipped)
+        if operations:
+            buckets_collection.bulk_write(operations)
+    else:
+        logs = imported_log_documents(documents, logbooks, skipped)
+        if logs:
+            logs_collection.insert_many(logs, ordered=False)
+    pool_cache.invalidate_all()
+    return len(documents) - len(skipped), len(skipped)
+
+
+def import_pools(
+    pools: Iterable[Pool],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[int, int]:
     """
-    results = pools_collection.find()
-    return [parse_pool_data(pool) for pool in results]
+    Imports a stream of pools, `batch_size` at a time, so that memory stays
+    bounded whatever the stream length. `progress` is called after each batch
+    with the number of pools imported and skipped so far.
+    Returns the number of imported and skipped pools.
+    """
+    imported = skipped = 0
+    batch: List[Pool] = []
+    for pool in pools:
+        batch.append(pool)
+        if len(batch) == batch_size:
+            batch_imported, batch_skipped = insert_pool_batch(batch)
+            imported, skipped = imported + batch_imported, skipped + batch_skipped
+            batch = []
+            if progress:
+                progress(imported, skipped)
+    if batch:
+        batch_imported, batch_skipped = insert_pool_batch(batch)
+        imported, skipped = imported + batch_imported, skipped + batch_skipped
+        if progress:
+            progress(imported, skipped)
+    return imported, skipped
 
 
 def retrieve_pool(pool_id: str) -> Optional[Pool]:
     """
-    Retrieves a specific pool by ID.
+    Retrieves a specific pool by ID, through the pool cache.
+    """
+    found, pool, generation = pool_cache.get(pool_key(pool_id))
+    if found:
+        return pool
+    pool_data = pools_collection.find_one({"_id": ObjectId(pool_id)}, pool_projection())
+    if pool_data:
+        pool = parse_pool_data(pool_data)
+        pool_cache.put(pool_key(pool_id), pool, generation)
+        return pool
+    return None
+
+
+def retrieve_raw_pool(pool_id: str) -> Optional[dict]:
+    """
+    Retrieves a specific pool by ID in its response form, without building the
+    models, through the pool cache.
     """
-    pool_data = pools_collection.find_one({"_id": ObjectId(pool_id)})
+    found, pool, generation = pool_cache.get(pool_key(pool_id, raw=True))
+    if found:
+        return pool
+    pool_data = pools_collection.find_one({"_id": ObjectId(pool_id)}, pool_projection())
     if pool_data:
-        return parse_pool_data(pool_data)
+        pool = raw_pool_data(pool_data)
+        pool_cache.put(pool_key(pool_id, raw=True), pool, generation)
+        return pool
     return None
 
 
 def update_pool(pool_id: str, updated_data: dict):
     """
-    Updates a pool's data by ID.
+    Updates a pool's data by ID and increments its revision.
+    Returns False if the pool does not exist.
     """
     result = pools_collection.update_one(
-        {"_id": ObjectId(pool_id)}, {"$set": updated_data}
+        {"_id": ObjectId(pool_id)}, pool_update_document(updated_data)
     )
-    return result.modified_count > 0
+    pool_cache.invalidate_pool(pool_id)
+    return result.matched_count > 0
 
 
 def delete_pool(pool_id: str):
@@ -116,40 +1809,244 @@ def delete_pool(pool_id: str):
     Deletes a pool by ID.
     """
     result = pools_collection.delete_one({"_id": ObjectId(pool_id)})
+    if not logs_embedded():
+        log_source_collection().delete_many({"pool_id": ObjectId(pool_id)})
+    pool_cache.invalidate_pool(pool_id)
     return result.deleted_count > 0
 
 
 def insert_pool_log(pool_id, log_data):
-    # Convert UUID to BSON Binary
-    if "id" in log_data and isinstance(log_data["id"], uuid.UUID):
-        log_data["id"] = Binary.from_uuid(
-            log_data["id"], uuid_representation=UuidRepresentation.STANDARD
+    """
+    Appends a maintenance log entry to a pool in a single server-side update,
+    so concurrent appends never overwrite each other. In the log collection
+    and bucket modes, the log is inserted before the pool revision is
+    incremented, and removed again if the pool does not exist.
+    Returns False if the pool does not exist.
+    """
+    log_data = stored_log(log_data)
+
+    if logs_in_collection():
+        result = logs_collection.insert_one(
+            log_to_document(ObjectId(pool_id), log_data)
+        )
+        if not bump_pool_revision(pool_id, summary_append_update([log_data])):
+            logs_collection.delete_one({"_id": result.inserted_id})
+            return False
+        return True
+
+    if logs_in_buckets():
+        buckets_collection.bulk_write(
+            bucket_append_operations(ObjectId(pool_id), [log_data])
         )
+        if not bump_pool_revision(pool_id, summary_append_update([log_data])):
+            # Any bucket of a missing pool is an orphan
+            buckets_collection.delete_many({"pool_id": ObjectId(pool_id)})
+            return False
+        return True
 
     result = pools_collection.update_one(
         {"_id": ObjectId(pool_id)},
-        {"$push": {"logbook": log_data}},
+        {"$push": {"logbook": log_data}, **summary_append_update([log_data])},
     )
-    return result.modified_count > 0
+    pool_cache.invalidate_pool(pool_id)
+    return result.matched_count > 0
 
 
-def retrieve_pool_logs(pool_id: str) -> List[dict]:
+def insert_pool_logs(pool_logs: List[Tuple[str, dict]]) -> List[Optional[str]]:
     """
-    Retrieves all maintenance logs for a pool.
+    Appends a batch of maintenance log entries, possibly across many pools, with
+    a single unordered bulk write.
+    Returns the error of each entry, None for the entries written.
     """
-    pool_data = pools_collection.find_one({"_id": ObjectId(pool_id)})
-    if pool_data:
-        return pool_data.get("logbook", [])
-    return []
+    pool_logs = [(pool_id, stored_log(log_data)) for pool_id, log_data in pool_logs]
+    pool_ids = [
+        ObjectId(pool_id) for pool_id, _ in pool_logs if ObjectId.is_valid(pool_id)
+    ]
+    existing_ids = {
+        pool["_id"]
+        for pool in pools_collection.find({"_id": {"$in": pool_ids}}, {"_id": 1})
+    }
+    operations, op_entries, errors = bulk_log_operations(pool_logs, existing_ids)
+    if operations:
+        collection = log_source_collection()
+        try:
+            collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            record_bulk_write_errors(e.details, op_entries, errors)
+        if not logs_embedded():
+            summary_operations = summary_append_operations(pool_logs, errors)
+            if summary_operations:
+                pools_collection.bulk_write(summary_operations, ordered=False)
+        for pool_id in existing_ids:
+            pool_cache.invalidate_pool(pool_id)
+    return errors
 
 
-def delete_pool_logs(pool_id: str):
+def bump_pool_revision(pool_id: str, update: Optional[dict] = None) -> bool:
     """
-    Deletes all maintenance logs for a pool.
+    Increments the revision of a pool whose logs were written to the log
+    collection or buckets, or applies `update`, a summary update which also
+    increments it. Returns False if the pool does not exist.
     """
     result = pools_collection.update_one(
-        {"_id": ObjectId(pool_id)}, {"$set": {"logbook": []}}
+        {"_id": ObjectId(pool_id)}, update or {"$inc": REVISION_INCREMENT}
+    )
+    pool_cache.invalidate_pool(pool_id)
+    return result.matched_count > 0
+
+
+def refresh_pool_summary(pool_id: str) -> bool:
+    """
+    Recomputes the summary of a pool from its logs in the log collection or
+    buckets, after one of them was edited or deleted, and increments its
+    revision. Returns False if the pool does not exist.
+    """
+    results = list(log_source_collection().aggregate(log_summary_pipeline(pool_id)))
+    summary = results[0]["summary"] if results else EMPTY_LOG_SUMMARY
+    return bump_pool_revision(pool_id, summary_reset_update(summary))
+
+
+def rebuild_log_summaries() -> int:
+    """
+    Recomputes the summary of every pool from its logs, for the pools written
+    before summaries were maintained, or after logs were written to the
+    database directly. Returns the number of pools.
+    """
+    if logs_embedded():
+        result = pools_collection.update_many(
+            {},
+            [
+                {
+                    "$set": {
+                        "summary": logbook_summary_expression(),
+                        "revision": INCREMENTED_REVISION,
+                    }
+                }
+            ],
+        )
+    else:
+        result = pools_collection.update_many(
+            {}, summary_reset_update(EMPTY_LOG_SUMMARY)
+        )
+        # Pools with logs then get their summary in a single server-side pass
+        log_source_collection().aggregate(
+            log_summary_pipeline()
+            + [
+                {
+                    "$merge": {
+                        "into": MONGO_COLLECTION,
+                        "on": "_id",
+                        "whenMatched": [{"$set": {"summary": "$$new.summary"}}],
+                        "whenNotMatched": "discard",
+                    }
+                }
+            ]
+        )
+    pool_cache.invalidate_all()
+    return result.matched_count
+
+
+def retrieve_pool_revision(pool_id: str) -> Optional[int]:
+    """
+    Retrieves only the revision of a pool, None if the pool does not exist.
+    """
+    pool_data = pools_collection.find_one({"_id": ObjectId(pool_id)}, {"revision": 1})
+    return pool_data.get("revision", 0) if pool_data else None
+
+
+def get_pools_fingerprint() -> str:
+    """
+    Retrieves a fingerprint of the whole pool collection, which changes with any
+    pool write, without reading the pools themselves.
+    """
+    results = list(pools_collection.aggregate(POOLS_FINGERPRINT_PIPELINE))
+    return parse_pools_fingerprint(results)
+
+
+def retrieve_pool_logs(
+    pool_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Optional[List[dict]]:
+    """
+    Retrieves the maintenance logs for a pool, optionally restricted to an
+    inclusive date range and to the `limit` most recent entries.
+    Returns None if the pool does not exist.
+    """
+    if logs_in_collection():
+        query = {"pool_id": ObjectId(pool_id)}
+        date_filter = log_date_filter(start_date, end_date)
+        if date_filter:
+            query["date"] = date_filter
+        cursor = logs_collection.find(query, LOG_PROJECTION)
+        if limit:
+            logs = list(cursor.sort("date", -1).limit(limit))[::-1]
+        else:
+            logs = list(cursor.sort("date", 1))
+        if logs or pools_collection.count_documents(
+            {"_id": ObjectId(pool_id)}, limit=1
+        ):
+            return [log_from_bson(log) for log in logs]
+        return None
+
+    if logs_in_buckets():
+        buckets = list(
+            buckets_collection.find(
+                bucket_range_query(pool_id, start_date, end_date), BUCKET_PROJECTION
+            )
+        )
+        if buckets or pools_collection.count_documents(
+            {"_id": ObjectId(pool_id)}, limit=1
+        ):
+            logs = [log for bucket in buckets for log in bucket_logs(bucket)]
+            logs = select_logs(logs, start_date, end_date, limit)
+            return [log_from_bson(log) for log in logs]
+        return None
+
+    results = list(
+        pools_collection.aggregate(
+            logbook_range_pipeline(pool_id, start_date, end_date, limit)
+        )
+    )
+    if results:
+        return [log_from_bson(log) for log in results[0]["logbook"]]
+    return None
+
+
+def retrieve_pool_log_series(
+    pool_id: str,
+    unit: str = "day",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Optional[List[dict]]:
+    """
+    Aggregates the maintenance logs of a pool into day, week or month periods.
+    Returns None if the pool does not exist.
+    """
+    series = list(
+        log_source_collection().aggregate(
+            log_series_pipeline(pool_id, unit, start_date, end_date)
+        )
     )
+    if series or pools_collection.count_documents({"_id": ObjectId(pool_id)}, limit=1):
+        return series
+    return None
+
+
+def delete_pool_logs(pool_id: str):
+    """
+    Deletes all maintenance logs for a pool.
+    """
+    if not logs_embedded():
+        result = log_source_collection().delete_many({"pool_id": ObjectId(pool_id)})
+        bump_pool_revision(pool_id, summary_reset_update(EMPTY_LOG_SUMMARY))
+        return result.deleted_count > 0
+
+    update = summary_reset_update(EMPTY_LOG_SUMMARY)
+    update["$set"] = {**update["$set"], "logbook": []}
+    result = pools_collection.update_one({"_id": ObjectId(pool_id)}, update)
+    pool_cache.invalidate_pool(pool_id)
     return result.modified_count > 0
 
 
@@ -158,58 +2055,258 @@ def delete_all_pools():
     Deletes all pools from the database.
     """
     result = pools_collection.delete_many({})
+    if not logs_embedded():
+        log_source_collection().delete_many({})
+    pool_cache.invalidate_all()
     return result.deleted_count
 
 
+def count_pools() -> int:
+    """
+    Counts the pools from the collection metadata.
+    """
+    return pools_collection.estimated_document_count()
+
+
+def count_all_logs() -> int:
+    """
+    Counts the maintenance logs stored across all pools.
+    """
+    if logs_in_collection():
+        return logs_collection.estimated_document_count()
+
+    if logs_in_buckets():
+        results = list(buckets_collection.aggregate(TOTAL_BUCKET_LOGS_PIPELINE))
+        return results[0]["total"] if results else 0
+
+    results = list(pools_collection.aggregate(TOTAL_LOGBOOK_PIPELINE))
+    return results[0]["total"] if results else 0
+
+
+def count_pools_per_type() -> List[dict]:
+    """
+    Counts the pools of each type.
+    """
+    return list(pools_collection.aggregate(pools_per_type_pipeline()))
+
+
+def get_volume_distribution() -> dict:
+    """
+    Computes the distribution of the pools' water volume.
+    """
+    results = list(pools_collection.aggregate(volume_distribution_pipeline()))
+    return parse_volume_distribution(results[0])
+
+
+def count_logs_per_month() -> List[dict]:
+    """
+    Counts the maintenance logs recorded each month.
+    """
+    return list(log_source_collection().aggregate(logs_per_month_pipeline()))
+
+
+def get_compliance_report(unit: str = "month") -> dict:
+    """
+    Counts the readings out of the safe ranges per pool type and period, and
+    lists the pools whose latest reading is out of range.
+    """
+    return {
+        "periods": list(log_source_collection().aggregate(compliance_pipeline(unit))),
+        "non_compliant_pools": parse_non_compliant_pools(
+            list(pools_collection.aggregate(non_compliant_pools_pipeline()))
+        ),
+    }
+
+
 def retrieve_pool_log_by_id(pool_id: str, log_id: str) -> Optional[dict]:
     """
     Retrieves a specific maintenance log entry by ID.
     """
-    pool_data = pools_collection.find_one({"_id": ObjectId(pool_id)})
-    if pool_data:
-        for log in pool_data.get("logbook", []):
-            if str(log.get("id")) == str(log_id):
-                return log
-    return None
+    if logs_in_collection():
+        log = logs_collection.find_one(
+            {"pool_id": ObjectId(pool_id), "id": {"$in": log_id_values(log_id)}},
+            LOG_PROJECTION,
+        )
+    elif logs_in_buckets():
+        bucket = buckets_collection.find_one(
+            {"pool_id": ObjectId(pool_id), "ids": {"$in": log_id_values(log_id)}},
+            BUCKET_PROJECTION,
+        )
+        log = bucket_log(bucket, log_id) if bucket else None
+    else:
+        pool_data = pools_collection.find_one(*logbook_entry_query(pool_id, log_id))
+        log = pool_data["logbook"][0] if pool_data else None
+    return log_from_bson(log) if log else None
 
 
 def update_pool_log_by_id(pool_id: str, log_id: str, updated_log: dict) -> bool:
     """
-    Updates a specific maintenance log entry by ID.
+    Updates the given fields of a specific maintenance log entry by ID, in place.
+    Returns False if the pool or the log entry does not exist.
     """
+    if logs_in_collection():
+        result = logs_collection.update_one(
+            {"pool_id": ObjectId(pool_id), "id": {"$in": log_id_values(log_id)}},
+            {"$set": log_update_fields(updated_log)},
+        )
+        return result.matched_count > 0 and refresh_pool_summary(pool_id)
+
+    if logs_in_buckets():
+        result = buckets_collection.update_one(
+            {"pool_id": ObjectId(pool_id), "ids": {"$in": log_id_values(log_id)}},
+            bucket_update_pipeline(log_id, updated_log),
+        )
+        return result.matched_count > 0 and refresh_pool_summary(pool_id)
+
+    if changes_reading(updated_log):
+        update = logbook_update_pipeline(log_id, updated_log)
+    else:
+        # Edits leaving the readings untouched keep the positional update
+        update = {
+            "$set": log_update_fields(updated_log, "logbook.$."),
+            "$inc": REVISION_INCREMENT,
+        }
     result = pools_collection.update_one(
-        {"_id": ObjectId(pool_id), "logbook.id": uuid.UUID(log_id)},
-        {"$set": {"logbook.$": updated_log}},
+        {"_id": ObjectId(pool_id), "logbook.id": {"$in": log_id_values(log_id)}},
+        update,
     )
-    return result.modified_count > 0
+    pool_cache.invalidate_pool(pool_id)
+    return result.matched_count > 0
 
 
 def delete_pool_log_by_id(pool_id: str, log_id: str) -> bool:
     """
     Deletes a specific maintenance log entry by ID.
     """
+    if logs_in_collection():
+        result = logs_collection.delete_one(
+            {"pool_id": ObjectId(pool_id), "id": {"$in": log_id_values(log_id)}}
+        )
+        return result.deleted_count > 0 and refresh_pool_summary(pool_id)
+
+    if logs_in_buckets():
+        result = buckets_collection.update_one(
+            {"pool_id": ObjectId(pool_id), "ids": {"$in": log_id_values(log_id)}},
+            bucket_delete_pipeline(log_id),
+        )
+        if result.matched_count == 0:
+            return False
+        buckets_collection.delete_many({"pool_id": ObjectId(pool_id), "count": 0})
+        return refresh_pool_summary(pool_id)
+
     result = pools_collection.update_one(
-        {"_id": ObjectId(pool_id)}, {"$pull": {"logbook": {"id": uuid.UUID(log_id)}}}
+        {"_id": ObjectId(pool_id), "logbook.id": {"$in": log_id_values(log_id)}},
+        logbook_delete_pipeline(log_id),
     )
-    return result.modified_count > 0
+    pool_cache.invalidate_pool(pool_id)
+    return result.matched_count > 0
 
 
 # MONGO HEALTH CHECKS
 
 
+def parse_mongo_info(info: dict) -> dict:
+    """
+    Builds the server info report from the result of `buildInfo`.
+    """
+    return {
+        "status": "ok",
+        "version": info.get("version"),
+        "build_environment": info.get("buildEnvironment", {}),
+        "storage_engines": info.get("storageEngines", []),
+        "javascript_engine": info.get("javascriptEngine"),
+    }
+
+
+def parse_mongo_health(result: dict) -> dict:
+    """
+    Builds the health report from the result of any server command.
+    """
+    if result.get("ok") == 1:
+        return {"status": "ok", "message": "MongoDB server is healthy."}
+    return {"status": "error", "message": "MongoDB server returned a non-OK status."}
+
+
+def parse_mongo_uptime(server_status: dict) -> dict:
+    """
+    Builds the uptime report from the result of `serverStatus`.
+    """
+    return {"status": "ok", "uptime_seconds": server_status.get("uptime", 0)}
+
+
+def parse_mongo_storage_stats(server_status: dict) -> dict:
+    """
+    Builds the storage report from the result of `serverStatus`.
+    """
+    memory_info = server_status.get("mem", {})
+    return {
+        "status": "ok",
+        "storage_engine": server_status.get("storageEngine", {}).get("name", "unknown"),
+        "memory": {
+            "resident_MB": memory_info.get("resident"),
+            "virtual_MB": memory_info.get("virtual"),
+            "mapped_MB": memory_info.get("mapped"),
+        },
+    }
+
+
+def parse_mongo_connection_stats(server_status: dict) -> dict:
+    """
+    Builds the connection report from the result of `serverStatus`.
+    """
+    connections = server_status.get("connections", {})
+    return {
+        "status": "ok",
+        "connections": {
+            "current": connections.get("current"),
+            "available": connections.get("available"),
+            "total_created": connections.get("totalCreated"),
+        },
+    }
+
+
+def parse_mongo_full_health(server_status: dict) -> dict:
+    """
+    Builds the comprehensive health report from a single `serverStatus` result.
+    """
+    health = parse_mongo_health(server_status)
+    return {
+        "overall_status": health["status"],
+        "health": health,
+        "uptime": parse_mongo_uptime(server_status),
+        "storage_stats": parse_mongo_storage_stats(server_status),
+        "connection_stats": parse_mongo_connection_stats(server_status),
+    }
+
+
+def failed_mongo_full_health(error: str) -> dict:
+    """
+    Builds the comprehensive health report of a server that could not be reached.
+    """
+    return {
+        "overall_status": "error",
+        "health": {
+            "status": "error",
+            "message": f"Error connecting to MongoDB: {error}",
+        },
+        "uptime": {"status": "error", "message": f"Failed to fetch uptime: {error}"},
+        "storage_stats": {
+            "status": "error",
+            "message": f"Failed to fetch storage stats: {error}",
+        },
+        "connection_stats": {
+            "status": "error",
+            "message": f"Failed to fetch connection stats: {error}",
+        },
+    }
+
+
 def get_mongo_info():
     """
     Retrieve MongoDB server version and build info.
     """
     try:
-        info = client.server_info()
-        return {
-            "status": "ok",
-            "version": info.get("version"),
-            "build_environment": info.get("buildEnvironment", {}),
-            "storage_engines": info.get("storageEngines", []),
-            "javascript_engine": info.get("javascriptEngine"),
-        }
+        return parse_mongo_info(client.server_info())
     except Exception as e:
         return {"status": "error", "message": f"Failed to fetch server info: {str(e)}"}
 
@@ -219,9 +2316,7 @@ def get_mongo_uptime():
     Get MongoDB server uptime in seconds.
     """
     try:
-        server_status = client.admin.command("serverStatus")
-        uptime_seconds = server_status.get("uptime", 0)
-        return {"status": "ok", "uptime_seconds": uptime_seconds}
+        return parse_mongo_uptime(client.admin.command("serverStatus"))
     except Exception as e:
         return {"status": "error", "message": f"Failed to fetch uptime: {str(e)}"}
 
@@ -231,14 +2326,7 @@ def get_mongo_health():
     Check if the MongoDB connection is healthy.
     """
     try:
-        info = client.server_info()
-        if info.get("ok") == 1:
-            return {"status": "ok", "message": "MongoDB server is healthy."}
-        else:
-            return {
-                "status": "error",
-                "message": "MongoDB server returned a non-OK status.",
-            }
+        return parse_mongo_health(client.server_info())
     except Exception as e:
         return {"status": "error", "message": f"Error connecting to MongoDB: {str(e)}"}
 
@@ -248,18 +2336,7 @@ def get_mongo_storage_stats():
     Retrieve MongoDB storage statistics.
     """
     try:
-        server_status = client.admin.command("serverStatus")
-        storage_engine = server_status.get("storageEngine", {}).get("name", "unknown")
-        memory_info = server_status.get("mem", {})
-        return {
-            "status": "ok",
-            "storage_engine": storage_engine,
-            "memory": {
-                "resident_MB": memory_info.get("resident"),
-                "virtual_MB": memory_info.get("virtual"),
-                "mapped_MB": memory_info.get("mapped"),
-            },
-        }
+        return parse_mongo_storage_stats(client.admin.command("serverStatus"))
     except Exception as e:
         return {
             "status": "error",
@@ -272,16 +2349,7 @@ def get_mongo_connection_stats():
     Retrieve MongoDB connection statistics.
     """
     try:
-        server_status = client.admin.command("serverStatus")
-        connections = server_status.get("connections", {})
-        return {
-            "status": "ok",
-            "connections": {
-                "current": connections.get("current"),
-                "available": connections.get("available"),
-                "total_created": connections.get("totalCreated"),
-            },
-        }
+        return parse_mongo_connection_stats(client.admin.command("serverStatus"))
     except Exception as e:
         return {
             "status": "error",
@@ -291,23 +2359,10 @@ def get_mongo_connection_stats():
 
 def get_mongo_full_health():
     """
-    Retrieve a comprehensive health report of MongoDB.
+    Retrieve a comprehensive health report of MongoDB, from a single
+    `serverStatus` call.
     """
     try:
-        health = get_mongo_health()
-        uptime = get_mongo_uptime()
-        storage = get_mongo_storage_stats()
-        connections = get_mongo_connection_stats()
-
-        return {
-            "overall_status": health["status"],
-            "health": health,
-            "uptime": uptime,
-            "storage_stats": storage,
-            "connection_stats": connections,
-        }
+        return parse_mongo_full_health(client.admin.command("serverStatus"))
     except Exception as e:
-        return {
-            "status": "error",
-            "message": f"Failed to fetch full health report: {str(e)}",
-        }
+        return failed_mongo_full_health(str(e))
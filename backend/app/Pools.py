@@ -1,8 +1,25 @@
 # Description: Defines the data models and utility functions for the swimming pool application.
 
+import math
+from datetime import datetime
 from uuid import uuid4, UUID
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Optional, List, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+from pydantic import BaseModel, Field, field_validator
+
+
+def check_iso_date(value: str) -> str:
+    """
+    Checks that a log date is an ISO 8601 date or datetime, as it is stored as
+    a datetime.
+    """
+    try:
+        datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError("Date must be an ISO 8601 date or datetime.")
+    return value
 
 
 class PoolLog(BaseModel):
@@ -16,6 +33,14 @@ class PoolLog(BaseModel):
     chlorine_level: float
     notes: Optional[str] = ""
 
+    @field_validator("date")
+    @classmethod
+    def check_date(cls, value: str) -> str:
+        """
+        Rejects the dates that cannot be stored as datetimes.
+        """
+        return check_iso_date(value)
+
     class Config:
         # Allow both UUID and str inputs for id field
         json_encoders = {
@@ -23,6 +48,36 @@ class PoolLog(BaseModel):
         }
 
 
+class PoolLogUpdate(BaseModel):
+    """
+    Represents a partial edit of a maintenance log entry: only the fields set
+    are changed.
+    """
+
+    date: Optional[str] = None
+    pH_level: Optional[float] = None
+    chlorine_level: Optional[float] = None
+    notes: Optional[str] = None
+
+    @field_validator("date", "pH_level", "chlorine_level", mode="before")
+    @classmethod
+    def reject_null(cls, value):
+        """
+        Rejects the readings sent as null: they may be left out, not cleared.
+        """
+        if value is None:
+            raise ValueError("Field cannot be null.")
+        return value
+
+    @field_validator("date")
+    @classmethod
+    def check_date(cls, value: str) -> str:
+        """
+        Rejects the dates that cannot be stored as datetimes.
+        """
+        return check_iso_date(value)
+
+
 class Pool(BaseModel):
     """
     Represents a swimming pool and its associated information and operations.
@@ -37,6 +92,7 @@ class Pool(BaseModel):
     notes: Optional[str] = None
     water_volume: float = Field(default_factory=lambda: 0.0)
     next_maintenance: Optional[str] = None
+    revision: int = 0  # Incremented by the database on every write
     logbook: List[PoolLog] = Field(default_factory=list)
 
     def validate_dimensions(cls, values):
@@ -100,31 +156,138 @@ class Pool(BaseModel):
         )
 
 
+class PoolSummary(BaseModel):
+    """
+    Represents a swimming pool without its logbook, along with figures read
+    from the log summary maintained on the database side.
+    """
+
+    id: Optional[str] = None
+    owner_name: str
+    length: float
+    width: float
+    depth: float
+    type: str
+    notes: Optional[str] = None
+    water_volume: float = Field(default_factory=lambda: 0.0)
+    next_maintenance: Optional[str] = None
+    revision: int = 0
+    log_count: int = 0
+    first_log_date: Optional[str] = None
+    last_log_date: Optional[str] = None
+    last_pH_level: Optional[float] = None
+    last_chlorine_level: Optional[float] = None
+    average_pH_level: Optional[float] = None
+    average_chlorine_level: Optional[float] = None
+
+
 class PoolUtils:
     """
     Utility class for checking pool maintenance parameters.
     """
 
+    # Inclusive safe ranges of the readings, also applied by the compliance
+    # report computed in MongoDB
+    PH_RANGE = (7.2, 7.8)
+    CHLORINE_RANGE = (1.0, 3.0)
+
+    # Classification codes returned by the batch checks, MISSING for NaN
+    TOO_LOW, IN_RANGE, TOO_HIGH, MISSING = 0, 1, 2, 3
+
+    # Messages of the checks, indexed by classification code
+    PH_MESSAGES = (
+        "pH level is too low. Add pH increaser.",
+        "pH level is within the safe range.",
+        "pH level is too high. Add pH reducer.",
+        "pH level is missing. Measure it again.",
+    )
+    CHLORINE_MESSAGES = (
+        "Chlorine level is too low. Add chlorine.",
+        "Chlorine level is within the safe range.",
+        "Chlorine level is too high. Dilute with water or wait for natural reduction.",
+        "Chlorine level is missing. Measure it again.",
+    )
+
     @staticmethod
     def check_ph_level(ph_level: float) -> str:
         """
         Checks if the pH level is within the safe range.
         """
-        if 7.2 <= ph_level <= 7.8:
-            return "pH level is within the safe range."
-        elif ph_level < 7.2:
-            return "pH level is too low. Add pH increaser."
+        low, high = PoolUtils.PH_RANGE
+        if math.isnan(ph_level):
+            return PoolUtils.PH_MESSAGES[PoolUtils.MISSING]
+        elif low <= ph_level <= high:
+            return PoolUtils.PH_MESSAGES[PoolUtils.IN_RANGE]
+        elif ph_level < low:
+            return PoolUtils.PH_MESSAGES[PoolUtils.TOO_LOW]
         else:
-            return "pH level is too high. Add pH reducer."
+            return PoolUtils.PH_MESSAGES[PoolUtils.TOO_HIGH]
 
     @staticmethod
     def check_chlorine_level(chlorine_level: float) -> str:
         """
         Checks if the chlorine level is within the safe range.
         """
-        if 1.0 <= chlorine_level <= 3.0:
-            return "Chlorine level is within the safe range."
-        elif chlorine_level < 1.0:
-            return "Chlorine level is too low. Add chlorine."
+        low, high = PoolUtils.CHLORINE_RANGE
+        if math.isnan(chlorine_level):
+            return PoolUtils.CHLORINE_MESSAGES[PoolUtils.MISSING]
+        elif low <= chlorine_level <= high:
+            return PoolUtils.CHLORINE_MESSAGES[PoolUtils.IN_RANGE]
+        elif chlorine_level < low:
+            return PoolUtils.CHLORINE_MESSAGES[PoolUtils.TOO_LOW]
         else:
-            return "Chlorine level is too high. Dilute with water or wait for natural reduction."
+            return PoolUtils.CHLORINE_MESSAGES[PoolUtils.TOO_HIGH]
+
+    @staticmethod
+    def classify_levels(
+        levels: ArrayLike, level_range: Tuple[float, float]
+    ) -> np.ndarray:
+        """
+        Classifies an array of readings against an inclusive range, returning
+        one `TOO_LOW`, `IN_RANGE` or `TOO_HIGH` code per reading, and `MISSING`
+        for the NaN readings, as the scalar checks do.
+        """
+        levels = np.asarray(levels, dtype=np.float64)
+        low, high = level_range
+        codes = (levels >= low).view(np.int8)
+        codes += levels > high
+        codes[np.isnan(levels)] = PoolUtils.MISSING
+        return codes
+
+    @staticmethod
+    def classify_ph_levels(ph_levels: ArrayLike) -> np.ndarray:
+        """
+        Classifies an array of pH levels, such as a whole logbook or fleet.
+        """
+        return PoolUtils.classify_levels(ph_levels, PoolUtils.PH_RANGE)
+
+    @staticmethod
+    def classify_chlorine_levels(chlorine_levels: ArrayLike) -> np.ndarray:
+        """
+        Classifies an array of chlorine levels, such as a whole logbook or fleet.
+        """
+        return PoolUtils.classify_levels(chlorine_levels, PoolUtils.CHLORINE_RANGE)
+
+    @staticmethod
+    def classify_readings(
+        ph_levels: ArrayLike, chlorine_levels: ArrayLike
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Classifies paired pH and chlorine readings. Returns the pH codes, the
+        chlorine codes and the mask of the readings with either level out of
+        range or missing.
+        """
+        ph_codes = PoolUtils.classify_ph_levels(ph_levels)
+        chlorine_codes = PoolUtils.classify_chlorine_levels(chlorine_levels)
+        out_of_range = (ph_codes != PoolUtils.IN_RANGE) | (
+            chlorine_codes != PoolUtils.IN_RANGE
+        )
+        return ph_codes, chlorine_codes, out_of_range
+
+    @staticmethod
+    def describe_levels(codes: np.ndarray, messages: Tuple[str, ...]) -> np.ndarray:
+        """
+        Looks up the message of each classification code, such as
+        `describe_levels(codes, PoolUtils.PH_MESSAGES)`.
+        """
+        return np.asarray(messages)[codes]
@@ -0,0 +1,30 @@
+# Description: JSON response class serializing route results with orjson
+
+from typing import Any
+
+import orjson  # type: ignore
+from fastapi.responses import JSONResponse  # type: ignore
+from pydantic import BaseModel
+
+from app.Timing import timed
+
+
+def encode_model(value: Any) -> Any:
+    """
+    Serializes the values orjson does not support natively: the pool models.
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson, which also encodes UUIDs and pydantic
+    models directly. Routes returning it skip FastAPI's `jsonable_encoder`
+    pass, so their result is only encoded once.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with timed("encode"):
+            return orjson.dumps(content, default=encode_model)
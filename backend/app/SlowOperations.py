@@ -0,0 +1,232 @@
+# Description: In-memory log of the slow MongoDB commands, with their query shape and explain plan
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import bson  # type: ignore
+from dotenv import load_dotenv
+from pymongo import monitoring  # type: ignore
+
+dotenv_path = os.path.join(os.path.dirname(__file__), ".env")
+load_dotenv(dotenv_path)
+
+# Commands lasting at least this many milliseconds are logged (0 disables
+# the log), and the most recent SLOW_OPERATION_LOG_SIZE of them are kept
+SLOW_OPERATION_MS = float(os.getenv("SLOW_OPERATION_MS", 100))
+SLOW_OPERATION_LOG_SIZE = int(os.getenv("SLOW_OPERATION_LOG_SIZE", 100))
+# Let /health/mongo/slow_operations capture the query plan of slow reads
+SLOW_OPERATION_EXPLAIN = os.getenv("SLOW_OPERATION_EXPLAIN", "false").lower() == "true"
+
+# Commands whose query plan can be captured with `explain`
+EXPLAINABLE_COMMANDS = ("find", "aggregate")
+
+# Command fields holding the documents matched by each command
+SHAPE_FIELDS = ("filter", "pipeline", "query", "updates", "deletes")
+
+# Command fields set by the driver, which do not belong to an explained command
+DRIVER_FIELDS = (
+    "lsid",
+    "txnNumber",
+    "autocommit",
+    "startTransaction",
+    "readConcern",
+)
+
+
+def query_shape(value: Any) -> Any:
+    """
+    Returns the shape of a filter or pipeline: its structure and operators,
+    with every value replaced by its type name.
+    """
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [query_shape(item) for item in value]
+    return type(value).__name__
+
+
+def command_shape(command_name: str, command: dict) -> Any:
+    """
+    Returns the shape of the documents matched by a command, if any.
+    """
+    for field in SHAPE_FIELDS:
+        if field in command:
+            value = command[field]
+            if field in ("updates", "deletes"):
+                # Statements of a bulk write, described by their filter
+                value = [statement.get("q") for statement in value]
+            return query_shape(value)
+    return None
+
+
+def reply_document_count(reply: dict) -> Optional[int]:
+    """
+    Returns the number of documents returned or written by a command.
+    """
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        if batch is not None:
+            return len(batch)
+    if "n" in reply:
+        return reply["n"]
+    return None
+
+
+def explain_command(command: dict) -> dict:
+    """
+    Returns the `explain` command planning a find or aggregate command,
+    without running it.
+    """
+    explained = {
+        key: value
+        for key, value in command.items()
+        if not key.startswith("$") and key not in DRIVER_FIELDS
+    }
+    return {"explain": explained, "verbosity": "queryPlanner"}
+
+
+def plan_stages(plan: dict) -> List[str]:
+    """
+    Lists the stages of a query plan from the root down, with the index used
+    by index scans.
+    """
+    stages = []
+    # Plans run by the slot-based engine nest the classic plan
+    plan = plan.get("queryPlan", plan)
+    while plan:
+        stage = plan.get("stage", "?")
+        if "indexName" in plan:
+            stage += f" {plan['indexName']}"
+        stages.append(stage)
+        children = plan.get("inputStages") or [plan.get("inputStage")]
+        plan = children[0] if children else None
+    return stages
+
+
+def plan_summary(explain: dict) -> Optional[str]:
+    """
+    Summarizes the winning plan of an explain result, such as
+    `FETCH > IXSCAN pool_id_1_date_1` or `COLLSCAN`.
+    """
+    planner = explain.get("queryPlanner")
+    if planner is None:
+        # Aggregations whose first stages are not pushed down to the query
+        # layer nest the planner in their $cursor stage
+        for stage in explain.get("stages", []):
+            planner = stage.get("$cursor", {}).get("queryPlanner")
+            if planner is not None:
+                break
+    if planner is None:
+        return None
+    return " > ".join(plan_stages(planner.get("winningPlan", {})))
+
+
+class SlowOperation:
+    """
+    A logged command, with the time it was run at.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        command_name: str,
+        command: dict,
+        reply: dict,
+        duration_ms: float,
+        timestamp: float,
+    ):
+        self.database = database
+        self.command_name = command_name
+        self.collection = command.get(command_name)
+        self.shape = command_shape(command_name, command)
+        self.duration_ms = duration_ms
+        self.documents = reply_document_count(reply)
+        self.reply_bytes = len(bson.encode(reply))
+        self.timestamp = timestamp
+        # Only kept for the reads whose plan can be captured later
+        self.command = (
+            explain_command(command) if command_name in EXPLAINABLE_COMMANDS else None
+        )
+        self.plan: Optional[str] = None
+
+    def report(self) -> dict:
+        return {
+            "timestamp": self.timestamp,
+            "database": self.database,
+            "command": self.command_name,
+            "collection": self.collection if isinstance(self.collection, str) else None,
+            "shape": self.shape,
+            "duration_ms": round(self.duration_ms, 3),
+            "documents": self.documents,
+            "reply_bytes": self.reply_bytes,
+            "plan": self.plan,
+        }
+
+
+class SlowOperationLog(monitoring.CommandListener):
+    """
+    Command listener keeping the most recent commands lasting at least
+    `threshold_ms`, to spot the ones missing an index without enabling the
+    database profiler.
+    """
+
+    def __init__(self, threshold_ms: float, size: int):
+        self.threshold_ms = threshold_ms
+        self.operations: "deque[SlowOperation]" = deque(maxlen=size)
+        # Commands being run, keyed by connection and request, as only their
+        # start event carries the command itself
+        self.running: Dict[Tuple[Any, int], Tuple[str, dict]] = {}
+        self.lock = threading.Lock()
+
+    def started(self, event):
+        if self.threshold_ms <= 0 or event.command_name == "explain":
+            return
+        with self.lock:
+            self.running[(event.connection_id, event.request_id)] = (
+                event.database_name,
+                event.command,
+            )
+
+    def succeeded(self, event):
+        if self.threshold_ms <= 0:
+            return
+        with self.lock:
+            started = self.running.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if started is None or duration_ms < self.threshold_ms:
+            return
+        database, command = started
+        self.record(database, event.command_name, command, event.reply, duration_ms)
+
+    def failed(self, event):
+        with self.lock:
+            self.running.pop((event.connection_id, event.request_id), None)
+
+    def record(
+        self,
+        database: str,
+        command_name: str,
+        command: dict,
+        reply: dict,
+        duration_ms: float,
+    ):
+        operation = SlowOperation(
+            database, command_name, command, reply, duration_ms, time.time()
+        )
+        with self.lock:
+            self.operations.append(operation)
+
+    def recent(self, limit: int) -> List[SlowOperation]:
+        """
+        Returns the most recent slow operations, most recent first.
+        """
+        with self.lock:
+            return list(reversed(self.operations))[:limit]
+
+
+# Registered on both the sync and async MongoDB clients
+slow_operation_log = SlowOperationLog(SLOW_OPERATION_MS, SLOW_OPERATION_LOG_SIZE)
@@ -0,0 +1,166 @@
+# Description: Opt-in per-request Server-Timing breakdown of database, model build and encode time
+
+import functools
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from pymongo import monitoring  # type: ignore
+
+dotenv_path = os.path.join(os.path.dirname(__file__), ".env")
+load_dotenv(dotenv_path)
+
+# Time every request, rather than only the ones sending the request header
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+# Request header asking for the breakdown of a single request
+SERVER_TIMING_REQUEST_HEADER = b"x-server-timing"
+
+# Phases of a request, in the order they are reported
+TIMING_PHASES = ("db", "build", "encode")
+TIMING_DESCRIPTIONS = {
+    "db": "MongoDB",
+    "build": "Model build",
+    "encode": "Encode",
+}
+
+
+class RequestTiming:
+    """
+    Time spent by a request in each phase, and its number of MongoDB round
+    trips.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.started_at = clock()
+        self.durations: Dict[str, float] = {phase: 0.0 for phase in TIMING_PHASES}
+        self.round_trips = 0
+
+    def add(self, phase: str, seconds: float):
+        self.durations[phase] += seconds
+
+    def add_round_trip(self, seconds: float):
+        self.durations["db"] += seconds
+        self.round_trips += 1
+
+    def header(self) -> str:
+        """
+        Returns the `Server-Timing` header value, durations in milliseconds.
+        """
+        metrics = []
+        for phase in TIMING_PHASES:
+            description = TIMING_DESCRIPTIONS[phase]
+            if phase == "db":
+                description += f" ({self.round_trips} round trips)"
+            metrics.append(
+                f'{phase};dur={self.durations[phase] * 1000:.2f};desc="{description}"'
+            )
+        total = (self.clock() - self.started_at) * 1000
+        metrics.append(f'total;dur={total:.2f};desc="Total"')
+        return ", ".join(metrics)
+
+
+# Timing of the request being handled, None when it was not asked for
+request_timing: ContextVar[Optional[RequestTiming]] = ContextVar(
+    "request_timing", default=None
+)
+
+
+@contextmanager
+def timed(phase: str):
+    """
+    Adds the time spent in the block to a phase of the current request.
+    """
+    timing = request_timing.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(phase, time.perf_counter() - start)
+
+
+def timed_phase(phase: str):
+    """
+    Decorator adding the time spent in a function to a phase of the current
+    request.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if request_timing.get() is None:
+                return function(*args, **kwargs)
+            with timed(phase):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timing_requested(scope) -> bool:
+    if SERVER_TIMING:
+        return True
+    return any(name == SERVER_TIMING_REQUEST_HEADER for name, _ in scope["headers"])
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware timing the requests sending an `X-Server-Timing` header,
+    or every request with SERVER_TIMING enabled, and adding the breakdown as
+    a `Server-Timing` response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not timing_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+
+        async def send_with_timing(message):
+            # Responses are encoded before they start, so the breakdown is
+            # complete by then, except for the body of streamed responses
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.header().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = request_timing.set(timing)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timing.reset(token)
+
+
+class MongoCommandTiming(monitoring.CommandListener):
+    """
+    Command listener adding the commands run by a MongoDB client to the
+    database time of the request that ran them.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        timing = request_timing.get()
+        if timing is not None:
+            timing.add_round_trip(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+# Registered on both the sync and async MongoDB clients
+mongo_command_timing = MongoCommandTiming()
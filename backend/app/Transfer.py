@@ -0,0 +1,255 @@
+# Description: Streaming export and import of pools and their logbooks, as NDJSON or CSV
+#
+# Usage: poetry run python -m app.Transfer export --format csv --output pools.csv
+#        poetry run python -m app.Transfer import pools.csv --format csv
+
+import argparse
+import codecs
+import csv
+import io
+import json
+import sys
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+
+from app.Pools import Pool, PoolLog
+from app.Mongo import IMPORT_BATCH_SIZE, import_pools, iter_export_pools
+
+EXPORT_FORMATS = ["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# CSV columns: the pool fields, repeated on every row of the pool, then the
+# fields of one of its logs (left empty for pools without logs)
+POOL_CSV_FIELDS = [
+    "pool_id",
+    "owner_name",
+    "length",
+    "width",
+    "depth",
+    "type",
+    "notes",
+    "water_volume",
+    "next_maintenance",
+    "revision",
+]
+LOG_CSV_FIELDS = ["log_id", "log_date", "pH_level", "chlorine_level", "log_notes"]
+CSV_FIELDS = POOL_CSV_FIELDS + LOG_CSV_FIELDS
+
+
+def csv_line(row: List) -> str:
+    """
+    Encodes one CSV row, quoting fields as needed.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(row)
+    return buffer.getvalue()
+
+
+def export_header(export_format: str) -> str:
+    """
+    Returns the text written before the first pool of an export.
+    """
+    return csv_line(CSV_FIELDS) if export_format == "csv" else ""
+
+
+def encode_pool(pool: Pool, export_format: str) -> str:
+    """
+    Encodes a pool and its logbook: one NDJSON line, or one CSV row per log.
+    """
+    if export_format == "ndjson":
+        return pool.model_dump_json() + "\n"
+
+    pool_row = [
+        pool.id,
+        pool.owner_name,
+        pool.length,
+        pool.width,
+        pool.depth,
+        pool.type,
+        pool.notes,
+        pool.water_volume,
+        pool.next_maintenance,
+        pool.revision,
+    ]
+    if not pool.logbook:
+        return csv_line(pool_row + [None] * len(LOG_CSV_FIELDS))
+    return "".join(
+        csv_line(
+            pool_row + [log.id, log.date, log.pH_level, log.chlorine_level, log.notes]
+        )
+        for log in pool.logbook
+    )
+
+
+class PoolDecoder:
+    """
+    Incrementally decodes an import stream fed one text line at a time, so that
+    only the pool being decoded is held in memory.
+    """
+
+    def __init__(self, import_format: str):
+        if import_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {import_format}")
+        self.import_format = import_format
+        self.record_number = 0
+        self.header: Optional[List[str]] = None
+        self.pending = ""  # CSV record spanning several lines
+        self.current: Optional[Pool] = None  # CSV pool awaiting its other rows
+
+    def feed(self, line: str) -> List[Pool]:
+        """
+        Decodes a line and returns the pools it completes.
+        """
+        if self.import_format == "ndjson":
+            if not line.strip():
+                return []
+            self.record_number += 1
+            return [self.parse(lambda: Pool(**json.loads(line)))]
+
+        # A quoted field may contain line breaks: a record is complete once its
+        # quotes are balanced
+        self.pending += line
+        if self.pending.count('"') % 2:
+            return []
+        record, self.pending = self.pending, ""
+        if not record.strip():
+            return []
+        row = next(csv.reader([record]))
+        if self.header is None:
+            self.header = row
+            return []
+        self.record_number += 1
+        return self.add_csv_row(dict(zip(self.header, row)))
+
+    def close(self) -> List[Pool]:
+        """
+        Returns the last pool of the stream, once it has been fully read.
+        """
+        if self.pending.strip():
+            raise ValueError(f"Truncated record after record {self.record_number}")
+        pools = [self.current] if self.current else []
+        self.current = None
+        return pools
+
+    def add_csv_row(self, row: dict) -> List[Pool]:
+        """
+        Adds a CSV row to the pool it belongs to. Consecutive rows sharing a
+        pool ID are the logs of a single pool.
+        """
+        completed = []
+        pool_id = row.get("pool_id") or None
+        if self.current is None or pool_id is None or pool_id != self.current.id:
+            completed = [self.current] if self.current else []
+            pool_fields = {
+                field: row[field] for field in POOL_CSV_FIELDS[1:] if row.get(field)
+            }
+            self.current = self.parse(lambda: Pool(id=pool_id, **pool_fields))
+        if row.get("log_date"):
+            log_fields = {
+                "date": row["log_date"],
+                "pH_level": row.get("pH_level"),
+                "chlorine_level": row.get("chlorine_level"),
+                "notes": row.get("log_notes", ""),
+            }
+            if row.get("log_id"):
+                log_fields["id"] = row["log_id"]
+            self.current.logbook.append(self.parse(lambda: PoolLog(**log_fields)))
+        return completed
+
+    def parse(self, build):
+        """
+        Builds a model, reporting validation errors with the record number.
+        """
+        try:
+            return build()
+        except Exception as e:
+            raise ValueError(f"Invalid record {self.record_number}: {str(e)}")
+
+
+def iter_import_pools(lines: Iterable[str], import_format: str) -> Iterator[Pool]:
+    """
+    Yields the pools of an import stream given as text lines.
+    """
+    decoder = PoolDecoder(import_format)
+    for line in lines:
+        yield from decoder.feed(line)
+    yield from decoder.close()
+
+
+async def aiter_import_pools(
+    chunks: AsyncIterable[bytes], import_format: str
+) -> AsyncIterator[Pool]:
+    """
+    Yields the pools of an import stream given as UTF-8 byte chunks of any size,
+    such as a request body.
+    """
+    decoder = PoolDecoder(import_format)
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += text.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            for pool in decoder.feed(line + "\n"):
+                yield pool
+    buffer += text.decode(b"", final=True)
+    for pool in decoder.feed(buffer) + decoder.close():
+        yield pool
+
+
+def export_pools(output, export_format: str) -> int:
+    """
+    Writes every pool to `output` straight from a MongoDB cursor.
+    Returns the number of exported pools.
+    """
+    output.write(export_header(export_format))
+    exported = 0
+    for pool in iter_export_pools():
+        output.write(encode_pool(pool, export_format))
+        exported += 1
+    return exported
+
+
+def print_progress(imported: int, skipped: int):
+    print(
+        f"\rImported {imported} pools, skipped {skipped} existing",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or import Plouf pools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Export every pool.")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    export_parser.add_argument("--output", help="Output file, stdout by default.")
+    import_parser = commands.add_parser("import", help="Import an export.")
+    import_parser.add_argument("input", help="Export file, - for stdin.")
+    import_parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        output = (
+            open(args.output, "w", newline="", encoding="utf-8")
+            if args.output
+            else sys.stdout
+        )
+        with output:
+            count = export_pools(output, args.format)
+        print(f"Exported {count} pools.", file=sys.stderr)
+    else:
+        source = (
+            open(args.input, newline="", encoding="utf-8")
+            if args.input != "-"
+            else sys.stdin
+        )
+        with source:
+            imported, skipped = import_pools(
+                iter_import_pools(source, args.format),
+                args.batch_size,
+                print_progress,
+            )
+        print(f"\nImported {imported} pools, skipped {skipped} existing.")
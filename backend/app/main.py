@@ -1,13 +1,20 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager, suppress
 from dotenv import load_dotenv
 
-from fastapi import FastAPI  # type: ignore
+from fastapi import FastAPI, Response  # type: ignore
 from fastapi.middleware.cors import CORSMiddleware  # type: ignore
 
 from app.routes.health.mongo import mongo_health_router
 from app.routes.health.api import api_health_router
 from app.routes.pool.router import pool_router
 from app.routes.stats.router import stats_router
+from app.Responses import FastJSONResponse
+from app.AsyncMongo import close_client, ensure_indexes
+from app.Health import mongo_health_snapshot
+from app.Metrics import MetricsMiddleware, METRICS_CONTENT_TYPE, render_metrics
+from app.Timing import ServerTimingMiddleware
 
 load_dotenv()
 
@@ -17,7 +24,25 @@ HOST = os.getenv("BACKEND_ADDRESS", "0.0.0.0")
 
 BACKEND_VERSION = os.getenv("BACKEND_VERSION", "1.0.0")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        print(f"Failed to create MongoDB indexes: {str(e)}")
+    # Keep the MongoDB health snapshot served by the health routes up to date
+    health_refresher = asyncio.create_task(mongo_health_snapshot.run())
+    yield
+    health_refresher.cancel()
+    with suppress(asyncio.CancelledError):
+        await health_refresher
+    # Release the MongoDB connection pool bound to the server event loop
+    await close_client()
+
+
+# Encode route results with orjson rather than the standard library encoder
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Configure CORS
 origins = [
@@ -30,6 +55,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods
     allow_headers=["*"],  # Allow all headers
+    # Let browser clients revalidate with If-None-Match and read the timings
+    expose_headers=["ETag", "Server-Timing"],
 )
 
 
@@ -41,6 +68,14 @@ async def add_cors_header(request, call_next):
     return response
 
 
+# Break down the time of the requests asking for it in a Server-Timing header
+app.add_middleware(ServerTimingMiddleware)
+
+# Count and time requests per route template, outermost so that the other
+# middlewares are included in the measured latency
+app.add_middleware(MetricsMiddleware)
+
+
 # Include the router
 app.include_router(pool_router, prefix="/pool", tags=["Pool"])
 
@@ -58,6 +93,14 @@ async def root():
     return {"message": "Welcome to Plouf backend ! 🏊‍♂️", "version": BACKEND_VERSION}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Request and MongoDB command metrics in the Prometheus text format.
+    """
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn  # type: ignore
 
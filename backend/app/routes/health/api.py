@@ -3,6 +3,8 @@
 import time
 from fastapi import APIRouter  # type: ignore
 
+from app.Cache import pool_cache
+
 start_time = time.time()
 
 api_health_router = APIRouter()
@@ -44,3 +46,25 @@ async def api_uptime():
         return {"status": "ok", "uptime_seconds": time.time() - start_time}
     except Exception as e:
         return {"status": "error", "message": f"Failed to fetch uptime: {str(e)}"}
+
+
+@api_health_router.get(
+    "/cache",
+    summary="Pool Cache Statistics",
+    response_description="Pool cache size and hit and miss counters.",
+)
+async def api_cache_stats():
+    """
+    Retrieve the statistics of the in-process pool cache.
+
+    Returns:
+    - `cache`: Cache size and limits (`size`, `max_size`, `ttl_seconds`), and
+      `hits`, `misses`, `hit_ratio` and `evictions` since the server started.
+    """
+    try:
+        return {"status": "ok", "cache": pool_cache.stats()}
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to fetch cache statistics: {str(e)}",
+        }
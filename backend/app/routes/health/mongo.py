@@ -1,13 +1,15 @@
 # Description : MongoDB health check API routes for the FastAPI application.
 
-from fastapi import APIRouter  # type: ignore
-from app.Mongo import (
-    get_mongo_health,
-    get_mongo_uptime,
-    get_mongo_info,
-    get_mongo_storage_stats,
-    get_mongo_connection_stats,
-    get_mongo_full_health,
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Query  # type: ignore
+from app.Health import mongo_health_snapshot
+from app.AsyncMongo import explain
+from app.SlowOperations import (
+    SLOW_OPERATION_EXPLAIN,
+    plan_summary,
+    slow_operation_log,
 )
 
 mongo_health_router = APIRouter()
@@ -27,8 +29,10 @@ async def mongo_health():
     Returns:
     - `status: ok` if the server is healthy.
     - `status: error` otherwise.
+    - `snapshot_age_seconds`: Age in seconds of the health snapshot served,
+      refreshed in the background rather than on each request.
     """
-    return get_mongo_health()
+    return (await mongo_health_snapshot.current()).health()
 
 
 @mongo_health_router.get(
@@ -44,8 +48,10 @@ async def mongo_uptime():
 
     Returns:
     - `uptime_seconds`: Time in seconds the server has been running.
+    - `snapshot_age_seconds`: Age in seconds of the health snapshot served,
+      refreshed in the background rather than on each request.
     """
-    return get_mongo_uptime()
+    return (await mongo_health_snapshot.current()).uptime()
 
 
 @mongo_health_router.get(
@@ -65,8 +71,10 @@ async def mongo_info():
 
     Returns:
     - Detailed server information in JSON format.
+    - `snapshot_age_seconds`: Age in seconds of the health snapshot served,
+      refreshed in the background rather than on each request.
     """
-    return get_mongo_info()
+    return (await mongo_health_snapshot.current()).info()
 
 
 @mongo_health_router.get(
@@ -84,8 +92,10 @@ async def mongo_storage_stats():
 
     Returns:
     - A JSON object with storage engine and memory stats.
+    - `snapshot_age_seconds`: Age in seconds of the health snapshot served,
+      refreshed in the background rather than on each request.
     """
-    return get_mongo_storage_stats()
+    return (await mongo_health_snapshot.current()).storage_stats()
 
 
 @mongo_health_router.get(
@@ -104,8 +114,10 @@ async def mongo_connection_stats():
 
     Returns:
     - A JSON object with connection stats.
+    - `snapshot_age_seconds`: Age in seconds of the health snapshot served,
+      refreshed in the background rather than on each request.
     """
-    return get_mongo_connection_stats()
+    return (await mongo_health_snapshot.current()).connection_stats()
 
 
 @mongo_health_router.get(
@@ -125,5 +137,82 @@ async def mongo_full_health():
 
     Returns:
     - A JSON object with a detailed health report.
+    - `snapshot_age_seconds`: Age in seconds of the health snapshot served,
+      refreshed in the background rather than on each request.
     """
-    return get_mongo_full_health()
+    return (await mongo_health_snapshot.current()).full_health()
+
+
+@mongo_health_router.get(
+    "/history",
+    summary="MongoDB Health History",
+    response_description="Downsampled time series of MongoDB health metrics.",
+)
+async def mongo_health_history(
+    points: int = Query(120, ge=1, le=1000),
+    window: Optional[float] = Query(None, gt=0),
+):
+    """
+    Retrieve the recent history of the MongoDB health metrics, sampled from
+    `serverStatus` at each health snapshot refresh and kept in memory.
+
+    Args:
+    - `points`: Maximum number of points returned, consecutive samples being
+      averaged together beyond it (optional).
+    - `window`: Only return the samples of the last `window` seconds (optional).
+
+    Returns:
+    - `refresh_interval_seconds`: Time between two samples.
+    - `samples`: Oldest first, each with its `timestamp` (Unix time), current and
+      available connections, resident and virtual memory in MB, and operation
+      and network byte rates per second (null when unknown).
+    """
+    since = time.time() - window if window else None
+    return {
+        "status": "ok",
+        "refresh_interval_seconds": mongo_health_snapshot.interval,
+        "samples": mongo_health_snapshot.history.downsample(points, since),
+    }
+
+
+@mongo_health_router.get(
+    "/slow_operations",
+    summary="MongoDB Slow Operations",
+    response_description="Most recent MongoDB commands slower than the threshold.",
+)
+async def mongo_slow_operations(limit: int = Query(50, ge=1, le=1000)):
+    """
+    Retrieve the most recent MongoDB commands run by the backend that lasted at
+    least `SLOW_OPERATION_MS` milliseconds, kept in memory.
+
+    With `SLOW_OPERATION_EXPLAIN` enabled, the query plan of the slow find and
+    aggregate commands is captured with `explain` the first time they are
+    listed, such as `FETCH > IXSCAN pool_id_1_date_1` or `COLLSCAN` when no
+    index serves the query.
+
+    Args:
+    - `limit`: Maximum number of operations returned (optional).
+
+    Returns:
+    - `threshold_ms`: Duration from which commands are logged.
+    - `operations`: Most recent first, each with its `timestamp` (Unix time),
+      command and collection, query `shape` (values replaced by their type),
+      `duration_ms`, number of `documents` returned or written, `reply_bytes`
+      and `plan` (null unless captured).
+    """
+    operations = slow_operation_log.recent(limit)
+    if SLOW_OPERATION_EXPLAIN:
+        for operation in operations:
+            if operation.command is None or operation.plan is not None:
+                continue
+            try:
+                operation.plan = plan_summary(
+                    await explain(operation.database, operation.command)
+                )
+            except Exception as e:
+                print(f"Failed to explain a slow {operation.command_name}: {str(e)}")
+    return {
+        "status": "ok",
+        "threshold_ms": slow_operation_log.threshold_ms,
+        "operations": [operation.report() for operation in operations],
+    }
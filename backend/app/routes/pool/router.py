@@ -1,22 +1,78 @@
 # Description: Pool routes for supporting CRUD operations.
-import uuid  # type: ignore
-
-from fastapi import APIRouter  # type: ignore
-from app.Pools import Pool, PoolLog
-from app.Mongo import (
+import json
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, Query, Request, Response  # type: ignore
+from fastapi.responses import StreamingResponse  # type: ignore
+from app.Pools import Pool, PoolLog, PoolLogUpdate
+from app.Responses import FastJSONResponse
+from app.AsyncMongo import (
     create_pool,
-    read_all_pools,
-    retrieve_pool,
+    read_all_raw_pools,
+    read_pool_summaries,
+    read_pools_page,
+    read_due_pools,
+    iter_pools,
+    iter_export_pools,
+    import_pools,
+    retrieve_raw_pool,
+    retrieve_pool_revision,
+    get_pools_fingerprint,
     update_pool,
     delete_pool,
     delete_all_pools,
+    insert_pool_log,
+    insert_pool_logs,
+    retrieve_pool_logs,
+    retrieve_pool_log_series,
     retrieve_pool_log_by_id,
+    update_pool_log_by_id,
     delete_pool_logs,
     delete_pool_log_by_id,
 )
+from app.Mongo import (
+    DUE_WINDOWS,
+    DUE_WINDOW_DAYS,
+    log_to_bson,
+    pools_fingerprint,
+    raw_pools_fingerprint,
+)
+from app.Transfer import (
+    EXPORT_MEDIA_TYPES,
+    export_header,
+    encode_pool,
+    aiter_import_pools,
+)
 
 pool_router = APIRouter()
 
+# Largest number of log entries accepted by a single bulk request
+MAX_BULK_LOGS = 10_000
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds a strong ETag from the parts identifying a version of a resource.
+    """
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Tells whether an If-None-Match header lists the given ETag.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Builds the bodiless response telling the client its copy is up to date.
+    """
+    return Response(status_code=304, headers={"ETag": etag})
+
 
 @pool_router.post(
     "/",
@@ -36,7 +92,7 @@ async def create_new_pool(pool_data: dict):
     """
     try:
         pool = Pool(**pool_data)
-        pool_id = create_pool(pool)
+        pool_id = await create_pool(pool)
         return {
             "status": "ok",
             "id": pool_id,
@@ -51,20 +107,178 @@ async def create_new_pool(pool_data: dict):
     summary="Retrieve all pools",
     response_description="Table of pools.",
 )
-async def get_all_pools():
+async def get_all_pools(
+    response: Response,
+    summary: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Retrieve all pools from the database.
 
+    Args:
+    - `summary`: Return pools without their logbook, with the log count and the
+      latest reading (date, pH and chlorine levels) instead (optional).
+    - `limit`: Return pools one page of this size at a time (optional).
+    - `cursor`: Opaque cursor of the page to return, taken from the previous
+      page's `next_cursor` (optional).
+
     Returns:
     - `pools`: List of pools in the database.
+    - `next_cursor`: Cursor of the next page, null on the last one (paginated
+      requests only).
+    - An `ETag` header that changes with any write to the pools returned, or
+      to any pool for the unpaginated listings. Sending it back in
+      `If-None-Match` gets a bodiless 304 response, without reading the pools
+      of the unpaginated listings, while they did not change.
     """
     try:
-        pools = read_all_pools()
-        return {"status": "ok", "pools": pools}
+        if limit:
+            # Pages are tagged from the pools they return, along with the page
+            # and representation, without a collection-wide scan
+            representation = "summary" if summary else "full"
+            pools, next_cursor = await read_pools_page(limit, cursor, summary)
+            etag = make_etag(
+                pools_fingerprint(pools), representation, cursor, next_cursor
+            )
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            response.headers["ETag"] = etag
+            return {"status": "ok", "pools": pools, "next_cursor": next_cursor}
+        # The unpaginated listings are checked against the collection
+        # fingerprint before anything is read, tagged with their representation
+        tags = ("summary",) if summary else ()
+        if if_none_match:
+            etag = make_etag(await get_pools_fingerprint(), *tags)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        if summary:
+            pools = await read_pool_summaries()
+            response.headers["ETag"] = make_etag(pools_fingerprint(pools), *tags)
+            return {"status": "ok", "pools": pools}
+        # The full listing may come from the pool cache: derive its ETag from
+        # the pools themselves. The stored documents are mapped straight to the
+        # response, and returned as one so that they are encoded only once.
+        pools = await read_all_raw_pools()
+        return FastJSONResponse(
+            {"status": "ok", "pools": pools},
+            headers={"ETag": make_etag(raw_pools_fingerprint(pools))},
+        )
     except Exception as e:
         return {"status": "error", "message": f"Failed to retrieve pools: {str(e)}"}
 
 
+@pool_router.get(
+    "/all/stream",
+    summary="Stream all pools",
+    response_description="Newline-delimited JSON stream of pools.",
+)
+async def stream_all_pools(summary: bool = False):
+    """
+    Stream all pools from the database as newline-delimited JSON, one pool per
+    line, written as soon as it is read from MongoDB.
+
+    Args:
+    - `summary`: Stream pool summaries instead of full pools (optional).
+
+    Returns:
+    - One JSON pool per line. A failure ends the stream with a
+      `{"status": "error"}` line.
+    """
+
+    async def pool_lines():
+        try:
+            async for pool in iter_pools(summary):
+                yield pool.model_dump_json() + "\n"
+        except Exception as e:
+            yield (
+                json.dumps(
+                    {"status": "error", "message": f"Failed to stream pools: {str(e)}"}
+                )
+                + "\n"
+            )
+
+    return StreamingResponse(pool_lines(), media_type="application/x-ndjson")
+
+
+@pool_router.get(
+    "/export",
+    summary="Export all pools",
+    response_description="NDJSON or CSV stream of pools and their logbooks.",
+)
+async def export_all_pools(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+):
+    """
+    Export every pool with its logbook, streamed straight from a MongoDB cursor.
+
+    Args:
+    - `format`: `ndjson` for one JSON pool per line, or `csv` for one row per
+      log with the pool fields repeated (optional, defaults to `ndjson`).
+
+    Returns:
+    - The export, to be sent back to `POST /pool/import`. A failure ends an
+      NDJSON export with a `{"status": "error"}` line.
+    """
+
+    async def export_lines():
+        yield export_header(export_format)
+        try:
+            async for pool in iter_export_pools():
+                yield encode_pool(pool, export_format)
+        except Exception as e:
+            yield (
+                json.dumps(
+                    {"status": "error", "message": f"Failed to export pools: {str(e)}"}
+                )
+                + "\n"
+            )
+
+    return StreamingResponse(
+        export_lines(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename=pools.{export_format}"},
+    )
+
+
+@pool_router.post(
+    "/import",
+    summary="Import pools",
+    response_description="Pool import status.",
+)
+async def import_all_pools(
+    request: Request,
+    import_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+):
+    """
+    Import pools and their logbooks from an export sent as the request body. The
+    body is read and written in batches, so any export size can be imported.
+    Pools that already exist are skipped, so a failed import can be re-run.
+
+    Args:
+    - `format`: Format of the export, `ndjson` or `csv` (optional, defaults to
+      `ndjson`).
+
+    Returns:
+    - `status`: Status of the operation.
+    - `imported`: Number of pools imported.
+    - `skipped`: Number of pools skipped because they already exist.
+    """
+    try:
+        imported, skipped = await import_pools(
+            aiter_import_pools(request.stream(), import_format)
+        )
+        return {
+            "status": "ok",
+            "imported": imported,
+            "skipped": skipped,
+            "message": f"Imported {imported} pools, skipped {skipped} existing.",
+        }
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to import pools: {str(e)}"}
+
+
 @pool_router.delete(
     "/all",
     summary="Delete all pools",
@@ -79,7 +293,7 @@ async def delete_all_pools_route():
     - `message`: Additional information about the operation.
     """
     try:
-        deleted_count = delete_all_pools()
+        deleted_count = await delete_all_pools()
         return {
             "status": "ok",
             "message": f"Deleted {deleted_count} pools successfully.",
@@ -88,12 +302,92 @@ async def delete_all_pools_route():
         return {"status": "error", "message": f"Failed to delete pools: {str(e)}"}
 
 
+@pool_router.post(
+    "/logs/bulk",
+    summary="Log maintenance for many pools at once",
+    response_description="Per-entry maintenance log status.",
+)
+async def bulk_log_maintenance(log_data: List[dict]):
+    """
+    Log a batch of maintenance entries, possibly for many pools, in a single
+    write. Entries are validated first; invalid ones are reported and skipped
+    while the others are written.
+
+    Args:
+    - `log_data`: List of maintenance log entries, each with the `pool_id` of
+      its pool.
+
+    Returns:
+    - `status`: Status of the operation.
+    - `logged`: Number of entries written.
+    - `results`: Status of each entry, in request order, with the `id` of the
+      written entries and the `message` of the failed ones.
+    """
+    if len(log_data) > MAX_BULK_LOGS:
+        return {
+            "status": "error",
+            "message": f"Too many log entries, the limit is {MAX_BULK_LOGS}.",
+        }
+    try:
+        results: List[dict] = [{}] * len(log_data)
+        pool_logs, batch_indexes = [], []
+        for index, entry in enumerate(log_data):
+            try:
+                log = PoolLog(**entry)
+                stored = log_to_bson(log)
+            except Exception as e:
+                results[index] = {"status": "error", "message": str(e)}
+                continue
+            pool_logs.append((str(entry.get("pool_id")), stored))
+            batch_indexes.append((index, log.id))
+
+        errors = await insert_pool_logs(pool_logs) if pool_logs else []
+        for (index, log_id), error in zip(batch_indexes, errors):
+            if error:
+                results[index] = {"status": "error", "message": error}
+            else:
+                results[index] = {"status": "ok", "id": str(log_id)}
+
+        logged = sum(result["status"] == "ok" for result in results)
+        return {"status": "ok", "logged": logged, "results": results}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to log maintenance: {str(e)}"}
+
+
+@pool_router.get(
+    "/due",
+    summary="Retrieve the pools due for maintenance",
+    response_description="Table of pool summaries.",
+)
+async def get_due_pools(
+    window: str = Query("due", pattern=f"^({'|'.join(DUE_WINDOWS)})$"),
+    days: int = Query(DUE_WINDOW_DAYS, ge=1, le=366),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+):
+    """
+    Retrieve the pools whose next maintenance falls in a window, soonest first.
+
+    Args:
+    - `window`: `overdue` for maintenance dates before today, `due` for dates
+      from today until `days` days ahead (default), `upcoming` for later dates.
+    - `days`: Length of the `due` window, in days (default 7).
+    - `limit`: Return at most this many pools (optional).
+
+    Returns:
+    - `pools`: List of pool summaries, as returned by `GET /all?summary=true`.
+    """
+    try:
+        return {"status": "ok", "pools": await read_due_pools(window, days, limit)}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to retrieve pools: {str(e)}"}
+
+
 @pool_router.get(
     "/{pool_id}",
     summary="Retrieve a specific pool",
     response_description="Pool data.",
 )
-async def get_pool_by_id(pool_id: str):
+async def get_pool_by_id(pool_id: str, if_none_match: Optional[str] = Header(None)):
     """
     Retrieve a specific pool from the database.
 
@@ -102,9 +396,22 @@ async def get_pool_by_id(pool_id: str):
 
     Returns:
     - `pool`: Pool data.
+    - An `ETag` header derived from the pool revision. Sending it back in
+      `If-None-Match` gets a bodiless 304 response while the pool is unchanged.
     """
     try:
-        pool = retrieve_pool(pool_id)
+        if if_none_match:
+            revision = await retrieve_pool_revision(pool_id)
+            if revision is not None:
+                etag = make_etag(pool_id, revision)
+                if etag_matches(if_none_match, etag):
+                    return not_modified(etag)
+        pool = await retrieve_raw_pool(pool_id)
+        if pool:
+            return FastJSONResponse(
+                {"status": "ok", "pool": pool},
+                headers={"ETag": make_etag(pool_id, pool["revision"])},
+            )
         return {"status": "ok", "pool": pool}
     except Exception as e:
         return {"status": "error", "message": f"Failed to retrieve pool: {str(e)}"}
@@ -128,7 +435,7 @@ async def update_pool_by_id(pool_id: str, pool_data: dict):
     - `message`: Additional information about the operation.
     """
     try:
-        updated = update_pool(pool_id, pool_data)
+        updated = await update_pool(pool_id, pool_data)
         if not updated:
             return {"status": "error", "message": "Pool not found."}
         return {"status": "ok", "message": "Pool updated successfully."}
@@ -153,7 +460,7 @@ async def delete_pool_by_id(pool_id: str):
     - `message`: Additional information about the operation.
     """
     try:
-        deleted = delete_pool(pool_id)
+        deleted = await delete_pool(pool_id)
         if not deleted:
             return {"status": "error", "message": "Pool not found."}
         return {"status": "ok", "message": "Pool deleted successfully."}
@@ -179,14 +486,10 @@ async def log_maintenance(pool_id: str, log_data: dict):
     - `message`: Additional information about the operation.
     """
     try:
-        pool = retrieve_pool(pool_id)
-        if not pool:
-            return {"status": "error", "message": "Pool not found."}
         log = PoolLog(**log_data)
-        pool.log_maintenance(log)
-        updated = update_pool(pool_id, pool.dict())
-        if not updated:
-            return {"status": "error", "message": "Failed to log maintenance."}
+        logged = await insert_pool_log(pool_id, log_to_bson(log))
+        if not logged:
+            return {"status": "error", "message": "Pool not found."}
         return {"status": "ok", "message": "Maintenance logged successfully."}
     except Exception as e:
         return {"status": "error", "message": f"Failed to log maintenance: {str(e)}"}
@@ -197,21 +500,40 @@ async def log_maintenance(pool_id: str, log_data: dict):
     summary="Retrieve all maintenance logs",
     response_description="Maintenance log data.",
 )
-async def get_all_pool_logs(pool_id: str):
+async def get_all_pool_logs(
+    pool_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Retrieve all maintenance logs for a specific pool.
 
     Args:
     - `pool_id`: ID of the pool to retrieve logs from.
+    - `start_date`: Only return logs dated on or after this date (optional).
+    - `end_date`: Only return logs dated on or before this date (optional).
+    - `limit`: Only return this many of the most recent logs (optional).
 
     Returns:
     - `logs`: List of maintenance log entries.
+    - An `ETag` header derived from the pool revision, which every log write
+      increments. Sending it back in `If-None-Match` gets a bodiless 304
+      response while the logs are unchanged.
     """
     try:
-        pool = retrieve_pool(pool_id)
-        if not pool:
+        # Taken before the logs are read, so it is never newer than them
+        revision = await retrieve_pool_revision(pool_id)
+        if revision is None:
             return {"status": "error", "message": "Pool not found."}
-        return {"status": "ok", "logs": pool.logbook}
+        etag = make_etag(pool_id, revision)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        logs = await retrieve_pool_logs(pool_id, start_date, end_date, limit)
+        if logs is None:
+            return {"status": "error", "message": "Pool not found."}
+        return FastJSONResponse({"status": "ok", "logs": logs}, headers={"ETag": etag})
     except Exception as e:
         return {"status": "error", "message": f"Failed to retrieve logs: {str(e)}"}
 
@@ -232,12 +554,61 @@ async def delete_all_pool_log_(pool_id: str):
     - `status`: Status of the operation.
     """
     try:
-        delete_pool_logs(pool_id)
+        await delete_pool_logs(pool_id)
         return {"status": "ok", "message": "All logs deleted successfully."}
     except Exception as e:
         return {"status": "error", "message": f"Failed to delete logs: {str(e)}"}
 
 
+@pool_router.get(
+    "/{pool_id}/log/series",
+    summary="Retrieve the maintenance log series",
+    response_description="pH and chlorine levels aggregated per period.",
+)
+async def get_pool_log_series(
+    pool_id: str,
+    unit: str = Query("day", pattern="^(day|week|month)$"),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Retrieve the pH and chlorine levels of a pool aggregated by MongoDB into
+    day, week or month periods, so that charts get a bounded number of points
+    whatever the length of the history.
+
+    Args:
+    - `pool_id`: ID of the pool to retrieve the series of.
+    - `unit`: Period of the series: `day`, `week` (starting on Monday) or `month`.
+    - `start_date`: Only include logs dated on or after this date (optional).
+    - `end_date`: Only include logs dated on or before this date (optional).
+
+    Returns:
+    - `series`: One entry per period holding logs, oldest first, with the first
+      day of the `period`, the log `count`, and the `min`, `max` and `mean` of
+      `pH_level` and `chlorine_level`.
+    - An `ETag` header derived from the pool revision, as for `/log/all`.
+    """
+    try:
+        revision = await retrieve_pool_revision(pool_id)
+        if revision is None:
+            return {"status": "error", "message": "Pool not found."}
+        etag = make_etag(pool_id, revision)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        series = await retrieve_pool_log_series(pool_id, unit, start_date, end_date)
+        if series is None:
+            return {"status": "error", "message": "Pool not found."}
+        return FastJSONResponse(
+            {"status": "ok", "unit": unit, "series": series}, headers={"ETag": etag}
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to retrieve log series: {str(e)}",
+        }
+
+
 @pool_router.get(
     "/{pool_id}/log/{log_id}",
     summary="Retrieve a specific maintenance log",
@@ -255,10 +626,10 @@ async def get_pool_log_by_id(pool_id: str, log_id: str):
     - `log`: Maintenance log data.
     """
     try:
-        log = retrieve_pool_log_by_id(pool_id, log_id)
+        log = await retrieve_pool_log_by_id(pool_id, log_id)
         if not log:
             return {"status": "error", "message": "Log not found."}
-        return {"status": "ok", "log": log}
+        return FastJSONResponse({"status": "ok", "log": log})
     except Exception as e:
         return {"status": "error", "message": f"Failed to retrieve log: {str(e)}"}
 
@@ -268,31 +639,26 @@ async def get_pool_log_by_id(pool_id: str, log_id: str):
     summary="Update a specific maintenance log",
     response_description="Update status.",
 )
-async def update_pool_log(pool_id: str, log_id: str, log_data: dict):
+async def update_pool_log(pool_id: str, log_id: str, log_data: PoolLogUpdate):
     """
     Update a specific maintenance log entry for a pool.
 
     Args:
     - `pool_id`: ID of the pool to retrieve the log from.
     - `log_id`: ID of the log entry to be update.
+    - `log_data`: Fields of the log entry to change; the others are kept. The
+      date and levels cannot be set to null.
 
     Returns:
     - Update success status.
     """
     try:
-        pool = retrieve_pool(pool_id)
-        if not pool:
-            return {"status": "error", "message": "Pool not found."}
-        log = PoolLog(**log_data)
-        log.id = uuid.UUID(log_id)
-
-        for i, log_entry in enumerate(pool.logbook):
-            if str(log_entry.id) == str(log_id):
-                pool.logbook[i] = log
-                break
-        updated = update_pool(pool_id, pool.dict())
+        changes = log_data.model_dump(exclude_unset=True)
+        if not changes:
+            return {"status": "error", "message": "No log fields to update."}
+        updated = await update_pool_log_by_id(pool_id, log_id, changes)
         if not updated:
-            return {"status": "error", "message": "Failed to update maintenance."}
+            return {"status": "error", "message": "Log not found."}
         return {"status": "ok", "message": "Maintenance updated successfully."}
     except Exception as e:
         return {"status": "error", "message": f"Failed to update maintenance: {str(e)}"}
@@ -315,7 +681,7 @@ async def delete_pool_log_by_id_(pool_id: str, log_id: str):
     - `status`: Status of the operation.
     """
     try:
-        deleted = delete_pool_log_by_id(pool_id, log_id)
+        deleted = await delete_pool_log_by_id(pool_id, log_id)
         if not deleted:
             return {"status": "error", "message": "Log not found."}
         return {"status": "ok", "message": "Log deleted successfully."}
@@ -1,7 +1,14 @@
 # Description: Stats router for handling stats related requests.
 
-from fastapi import APIRouter  # type: ignore
-from app.Mongo import read_all_pools
+from fastapi import APIRouter, Query  # type: ignore
+from app.AsyncMongo import (
+    count_pools,
+    count_all_logs,
+    count_pools_per_type,
+    get_volume_distribution,
+    count_logs_per_month,
+    get_compliance_report,
+)
 
 stats_router = APIRouter()
 
@@ -19,8 +26,8 @@ async def get_number_pools():
     - `total_pools`: Total number of pools in the database.
     """
     try:
-        pools = read_all_pools()
-        return {"status": "ok", "total_pools": len(pools)}
+        total_pools = await count_pools()
+        return {"status": "ok", "total_pools": total_pools}
     except Exception as e:
         return {"status": "error", "message": f"Failed to retrieve stats: {str(e)}"}
 
@@ -38,12 +45,93 @@ async def get_number_logs():
     - `total_logs`: Total number of logs stored in the database.
     """
     try:
-        pools = read_all_pools()
+        total_logs = await count_all_logs()
+        return {"status": "ok", "total_logs": total_logs}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to retrieve stats: {str(e)}"}
 
-        total_logs = 0
 
-        for pool in pools:
-            total_logs += len(pool.logbook)
-        return {"status": "ok", "total_logs": total_logs}
+@stats_router.get(
+    "/pools_per_type",
+    summary="Retrieve the number of pools per type.",
+    response_description="Number of pools of each type.",
+)
+async def get_pools_per_type():
+    """
+    Retrieve the number of pools of each type, most common first.
+
+    Returns:
+    - `pools_per_type`: List of `type` and `count` pairs.
+    """
+    try:
+        pools_per_type = await count_pools_per_type()
+        return {"status": "ok", "pools_per_type": pools_per_type}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to retrieve stats: {str(e)}"}
+
+
+@stats_router.get(
+    "/volume_distribution",
+    summary="Retrieve the distribution of pool water volumes.",
+    response_description="Water volume ranges and overall figures.",
+)
+async def get_volume_distribution_stats():
+    """
+    Retrieve the distribution of the pools' water volume.
+
+    Returns:
+    - `volume_distribution`: Number of pools per volume range (`ranges`), along
+      with the `min`, `max`, `average` and `total` water volume in cubic meters.
+    """
+    try:
+        volume_distribution = await get_volume_distribution()
+        return {"status": "ok", "volume_distribution": volume_distribution}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to retrieve stats: {str(e)}"}
+
+
+@stats_router.get(
+    "/logs_per_month",
+    summary="Retrieve the number of logs per month.",
+    response_description="Number of logs recorded each month.",
+)
+async def get_logs_per_month():
+    """
+    Retrieve the number of maintenance logs recorded each month, oldest first.
+
+    Returns:
+    - `logs_per_month`: List of `month` (YYYY-MM) and `count` pairs.
+    """
+    try:
+        logs_per_month = await count_logs_per_month()
+        return {"status": "ok", "logs_per_month": logs_per_month}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to retrieve stats: {str(e)}"}
+
+
+@stats_router.get(
+    "/compliance",
+    summary="Retrieve the water quality compliance report.",
+    response_description="Readings per safe range status, and non-compliant pools.",
+)
+async def get_compliance(unit: str = Query("month", pattern="^(day|week|month)$")):
+    """
+    Retrieve how the fleet readings compare with the safe ranges of
+    `PoolUtils` (pH 7.2-7.8, chlorine 1.0-3.0 ppm), computed inside MongoDB
+    without loading the logbooks into the backend.
+
+    Args:
+    - `unit`: Period the readings are counted per: `day`, `week` or `month`.
+
+    Returns:
+    - `periods`: Per pool `type` and `period` (first day), oldest first, the
+      number of readings (`count`) and of `too_low`, `in_range` and `too_high`
+      `pH_level` and `chlorine_level` readings.
+    - `non_compliant_pools`: Pools whose latest reading is out of range, with
+      its date and the `value` and `status` of each level.
+    """
+    try:
+        report = await get_compliance_report(unit)
+        return {"status": "ok", "unit": unit, **report}
     except Exception as e:
         return {"status": "error", "message": f"Failed to retrieve stats: {str(e)}"}
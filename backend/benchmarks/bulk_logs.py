@@ -0,0 +1,83 @@
+# Description: Throughput benchmark of log ingestion, one entry per request versus bulk requests.
+#
+# Usage: poetry run python -m benchmarks.bulk_logs --pools 50 --readings 5000 --batch 1000
+
+import argparse
+import asyncio
+import time
+
+import httpx  # type: ignore
+from fastapi import FastAPI  # type: ignore
+
+from app import Mongo, AsyncMongo
+from app.Pools import Pool
+from app.routes.pool.router import pool_router
+
+READING = {"date": "2024-01-01", "pH_level": 7.4, "chlorine_level": 2.0}
+
+
+def seed_pools(count: int) -> list:
+    """
+    Replaces the collection content with empty synthetic pools.
+    """
+    Mongo.delete_all_pools()
+    return [
+        Mongo.create_pool(
+            Pool(owner_name=f"Owner {i}", length=10, width=5, depth=2, type="salt")
+        )
+        for i in range(count)
+    ]
+
+
+async def ingest(pool_ids: list, readings: int, batch: int) -> float:
+    """
+    Posts `readings` readings spread over the pools, one per request when
+    `batch` is 0, else `batch` per bulk request, and returns the observed
+    throughput in readings per second.
+    """
+    app = FastAPI()
+    app.include_router(pool_router, prefix="/pool")
+    transport = httpx.ASGITransport(app=app)
+    entries = [
+        {**READING, "pool_id": pool_ids[i % len(pool_ids)]} for i in range(readings)
+    ]
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        start = time.perf_counter()
+        if batch:
+            for i in range(0, readings, batch):
+                response = await client.post(
+                    "/pool/logs/bulk", json=entries[i : i + batch]
+                )
+                assert response.json()["logged"] == len(entries[i : i + batch])
+        else:
+            for entry in entries:
+                response = await client.post(
+                    f"/pool/{entry['pool_id']}/log", json=READING
+                )
+                assert response.json()["status"] == "ok"
+        elapsed = time.perf_counter() - start
+
+    return readings / elapsed
+
+
+async def main(args):
+    single = await ingest(seed_pools(args.pools), args.readings, 0)
+    bulk = await ingest(seed_pools(args.pools), args.readings, args.batch)
+    await AsyncMongo.close_client()
+    Mongo.delete_all_pools()
+
+    print(f"Readings: {args.readings} over {args.pools} pools")
+    print(f"Single-entry route : {single:10.1f} readings/s")
+    print(f"Bulk route ({args.batch:>5}) : {bulk:10.1f} readings/s")
+    print(f"Speedup            : {bulk / single:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log ingestion benchmark.")
+    parser.add_argument("--pools", type=int, default=50)
+    parser.add_argument("--readings", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
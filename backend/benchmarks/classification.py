@@ -0,0 +1,62 @@
+# Description: Microbenchmark of the classification of water quality readings.
+#
+# Compares the scalar PoolUtils checks, called once per reading, with the
+# batch classification of NumPy arrays. Works on synthetic readings, so it
+# does not need MongoDB.
+#
+# Usage: poetry run python -m benchmarks.classification --readings 1000000
+
+import argparse
+import time
+
+import numpy as np
+
+from app.Pools import PoolUtils
+
+
+def make_readings(count: int, seed: int = 0):
+    """
+    Returns pH and chlorine readings scattered around the safe ranges.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.normal(7.5, 0.3, count), rng.normal(2.0, 0.8, count)
+
+
+def classify_scalar(ph_levels: list, chlorine_levels: list):
+    ph_messages = [PoolUtils.check_ph_level(level) for level in ph_levels]
+    chlorine_messages = [
+        PoolUtils.check_chlorine_level(level) for level in chlorine_levels
+    ]
+    return ph_messages, chlorine_messages
+
+
+def classify_batch(ph_levels: np.ndarray, chlorine_levels: np.ndarray):
+    return PoolUtils.classify_readings(ph_levels, chlorine_levels)
+
+
+def main(args):
+    ph_levels, chlorine_levels = make_readings(args.readings)
+    # The scalar checks are fed Python floats, as read from the logbooks
+    ph_list, chlorine_list = ph_levels.tolist(), chlorine_levels.tolist()
+
+    timings = {}
+    for name, operation, inputs in (
+        ("scalar", classify_scalar, (ph_list, chlorine_list)),
+        ("batch", classify_batch, (ph_levels, chlorine_levels)),
+    ):
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            operation(*inputs)
+        timings[name] = (time.perf_counter() - start) / args.repeats
+        print(
+            f"{name:<7} | {timings[name] * 1e3:>9.2f} ms"
+            f" | {timings[name] * 1e9 / args.readings:>7.2f} ns per reading"
+        )
+    print(f"Batch speedup: {timings['scalar'] / timings['batch']:.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reading classification benchmark.")
+    parser.add_argument("--readings", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,103 @@
+# Description: Load test comparing blocking and async MongoDB access under concurrent requests.
+#
+# Usage: poetry run python -m benchmarks.concurrent_load --requests 500 --concurrency 50
+
+import argparse
+import asyncio
+import time
+
+import httpx  # type: ignore
+from fastapi import FastAPI  # type: ignore
+
+from app import Mongo, AsyncMongo
+from app.Cache import pool_cache
+from app.Pools import Pool, PoolLog
+
+
+def build_app(read_all_pools, blocking: bool) -> FastAPI:
+    """
+    Builds a minimal app serving the pool listing through the given data layer.
+    """
+    app = FastAPI()
+
+    @app.get("/pool/all")
+    async def get_all_pools():
+        pools = read_all_pools() if blocking else await read_all_pools()
+        return {"status": "ok", "pools": pools}
+
+    return app
+
+
+async def run_load(app: FastAPI, total_requests: int, concurrency: int) -> float:
+    """
+    Fires `total_requests` requests with at most `concurrency` in flight and returns
+    the observed throughput in requests per second.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def one_request():
+            async with semaphore:
+                response = await client.get("/pool/all")
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(total_requests)))
+        elapsed = time.perf_counter() - start
+
+    return total_requests / elapsed
+
+
+def seed_pools(count: int, logs_per_pool: int):
+    """
+    Replaces the collection content with synthetic pools.
+    """
+    Mongo.delete_all_pools()
+    for i in range(count):
+        pool = Pool(
+            owner_name=f"Owner {i}",
+            length=10,
+            width=5,
+            depth=2,
+            type="chlorine",
+            logbook=[
+                PoolLog(date="2024-01-01", pH_level=7.4, chlorine_level=2.0)
+                for _ in range(logs_per_pool)
+            ],
+        )
+        Mongo.create_pool(pool)
+
+
+async def main(args):
+    # Measure the database access, not the pool cache in front of it
+    pool_cache.max_size = 0
+    seed_pools(args.pools, args.logs)
+
+    blocking = await run_load(
+        build_app(Mongo.read_all_pools, blocking=True), args.requests, args.concurrency
+    )
+    non_blocking = await run_load(
+        build_app(AsyncMongo.read_all_pools, blocking=False),
+        args.requests,
+        args.concurrency,
+    )
+    await AsyncMongo.close_client()
+    Mongo.delete_all_pools()
+
+    print(f"Requests: {args.requests}, concurrency: {args.concurrency}")
+    print(f"Blocking pymongo : {blocking:8.1f} req/s")
+    print(f"Async driver     : {non_blocking:8.1f} req/s")
+    print(f"Speedup          : {non_blocking / blocking:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pools", type=int, default=20)
+    parser.add_argument("--logs", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,78 @@
+# Description: Benchmark of the log append latency against the logbook length.
+#
+# Compares the former read-modify-write append (read the pool, append in Python,
+# rewrite the whole document) with the single server-side $push.
+#
+# Usage: poetry run python -m benchmarks.log_append --appends 50
+
+import argparse
+import time
+
+from app import Mongo
+from app.Pools import Pool, PoolLog
+
+HISTORY_LENGTHS = [0, 100, 1_000, 10_000]
+
+
+def make_log() -> PoolLog:
+    return PoolLog(date="2024-01-01", pH_level=7.4, chlorine_level=2.0, notes="Bench")
+
+
+def create_pool_with_history(length: int) -> str:
+    """
+    Creates a pool whose logbook already holds `length` entries.
+    """
+    pool = Pool(owner_name="Bench", length=10, width=5, depth=2, type="chlorine")
+    pool_id = Mongo.create_pool(pool)
+    Mongo.pools_collection.update_one(
+        {"_id": Mongo.ObjectId(pool_id)},
+        {
+            "$push": {
+                "logbook": {
+                    "$each": [Mongo.log_to_bson(make_log()) for _ in range(length)]
+                }
+            }
+        },
+    )
+    return pool_id
+
+
+def read_modify_write_append(pool_id: str):
+    pool = Mongo.retrieve_pool(pool_id)
+    pool.log_maintenance(make_log())
+    Mongo.update_pool(pool_id, pool.dict())
+
+
+def push_append(pool_id: str):
+    Mongo.insert_pool_log(pool_id, Mongo.log_to_bson(make_log()))
+
+
+def mean_latency(operation, pool_id: str, calls: int) -> float:
+    """
+    Returns the mean latency of `calls` runs of `operation` on a pool, in
+    milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(calls):
+        operation(pool_id)
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def main(args):
+    Mongo.delete_all_pools()
+    print(f"{'history':>8} | {'read-modify-write':>18} | {'$push':>10}")
+    for length in HISTORY_LENGTHS:
+        legacy = mean_latency(
+            read_modify_write_append, create_pool_with_history(length), args.appends
+        )
+        atomic = mean_latency(
+            push_append, create_pool_with_history(length), args.appends
+        )
+        print(f"{length:>8} | {legacy:>15.2f} ms | {atomic:>7.2f} ms")
+    Mongo.delete_all_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log append latency benchmark.")
+    parser.add_argument("--appends", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,85 @@
+# Description: Benchmark of the log storage modes on synthetic high-frequency
+# readings.
+#
+# Writes the same readings to a pool in each storage mode, then reports the
+# stored bytes per reading and the latency of full and one-month log reads.
+#
+# Usage: poetry run python -m benchmarks.log_buckets --readings 20000 --reads 20
+
+import argparse
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app import Mongo
+from app.Pools import Pool, PoolLog
+from benchmarks.log_append import mean_latency
+
+STORAGE_MODES = ["embedded", "collection", "bucket"]
+
+# Synthetic readings are this many minutes apart
+READING_INTERVAL = 15
+
+
+def make_logs(count: int) -> list:
+    start = datetime(2024, 1, 1)
+    return [
+        Mongo.log_to_bson(
+            PoolLog(
+                date=(start + timedelta(minutes=READING_INTERVAL * index)).isoformat(),
+                pH_level=7.0 + (index % 10) / 10,
+                chlorine_level=1.5 + (index % 7) / 10,
+                notes="",
+            )
+        )
+        for index in range(count)
+    ]
+
+
+def stored_size() -> int:
+    """
+    Returns the uncompressed size of the pool and log collections, in bytes.
+    """
+    return sum(
+        Mongo.pools_collection.database.command("collStats", collection.name)["size"]
+        for collection in (
+            Mongo.pools_collection,
+            Mongo.logs_collection,
+            Mongo.buckets_collection,
+        )
+    )
+
+
+def main(args):
+    logs = make_logs(args.readings)
+    month_end = logs[-1]["date"][:7] + "-31T23:59:59"
+    month_start = logs[-1]["date"][:7] + "-01"
+    print(f"{args.readings} readings, every {READING_INTERVAL} minutes")
+    print(f"{'storage':>10} | {'bytes/reading':>13} | {'full read':>10} | {'month':>8}")
+    for mode in STORAGE_MODES:
+        with patch.object(Mongo, "MONGO_LOG_STORAGE", mode):
+            Mongo.delete_all_pools()
+            Mongo.ensure_indexes()
+            pool = Pool(owner_name="Bench", length=10, width=5, depth=2, type="salt")
+            pool_id = Mongo.create_pool(pool)
+            for start in range(0, len(logs), 1000):
+                Mongo.insert_pool_logs(
+                    [(pool_id, dict(log)) for log in logs[start : start + 1000]]
+                )
+            size = stored_size() / args.readings
+            full = mean_latency(Mongo.retrieve_pool_logs, pool_id, args.reads)
+            month = mean_latency(
+                lambda pool_id: Mongo.retrieve_pool_logs(
+                    pool_id, month_start, month_end
+                ),
+                pool_id,
+                args.reads,
+            )
+            print(f"{mode:>10} | {size:>13.1f} | {full:>7.2f} ms | {month:>5.2f} ms")
+            Mongo.delete_all_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log storage mode benchmark.")
+    parser.add_argument("--readings", type=int, default=20_000)
+    parser.add_argument("--reads", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,57 @@
+# Description: Benchmark of the log edit latency against the logbook length.
+#
+# Compares the former full-pool rewrite (read the pool, edit the entry in
+# Python, rewrite the whole document) with the single positional update.
+#
+# Usage: poetry run python -m benchmarks.log_update --updates 50
+
+import argparse
+
+from app import Mongo
+from benchmarks.log_append import create_pool_with_history, mean_latency
+
+HISTORY_LENGTHS = [1_000, 10_000, 50_000]
+
+
+def middle_log_id(pool_id: str) -> str:
+    """
+    Returns the ID of the entry in the middle of the pool's logbook.
+    """
+    logs = Mongo.retrieve_pool_logs(pool_id)
+    return str(logs[len(logs) // 2]["id"])
+
+
+def full_rewrite_update(pool_id: str, log_id: str):
+    pool = Mongo.retrieve_pool(pool_id)
+    for log in pool.logbook:
+        if str(log.id) == log_id:
+            log.pH_level = 7.1
+            break
+    Mongo.update_pool(pool_id, pool.dict())
+
+
+def positional_update(pool_id: str, log_id: str):
+    Mongo.update_pool_log_by_id(pool_id, log_id, {"pH_level": 7.1})
+
+
+def main(args):
+    Mongo.delete_all_pools()
+    print(f"{'history':>8} | {'full rewrite':>13} | {'positional':>10}")
+    for length in HISTORY_LENGTHS:
+        timings = []
+        for update in (full_rewrite_update, positional_update):
+            pool_id = create_pool_with_history(length)
+            log_id = middle_log_id(pool_id)
+            timings.append(
+                mean_latency(
+                    lambda pool_id: update(pool_id, log_id), pool_id, args.updates
+                )
+            )
+        print(f"{length:>8} | {timings[0]:>10.2f} ms | {timings[1]:>7.2f} ms")
+    Mongo.delete_all_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log edit latency benchmark.")
+    parser.add_argument("--updates", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,64 @@
+# Description: Microbenchmark of the CPU cost per listed log of the pool reads.
+#
+# Compares building the pool models from the decoded documents with mapping
+# the documents straight to the response form, both encoded by the response
+# class the routes use. Decodes BSON captured from stored pools, so it does not
+# need MongoDB.
+#
+# Usage: poetry run python -m benchmarks.raw_reads --pools 100 --logs 200
+
+import argparse
+import time
+
+import bson
+from bson.binary import UuidRepresentation
+from bson.codec_options import CodecOptions
+from bson.objectid import ObjectId
+
+from app.Mongo import parse_pool_data, pool_to_bson, raw_pool_data
+from app.Responses import FastJSONResponse
+from benchmarks.serialization import make_pools
+
+CODEC_OPTIONS = CodecOptions(uuid_representation=UuidRepresentation.STANDARD)
+
+
+def stored_pools(count: int, logs: int) -> bytes:
+    """
+    Returns the BSON of the pools as MongoDB would send them back.
+    """
+    documents = []
+    for pool in make_pools(count, logs):
+        document = pool_to_bson(pool)
+        document["_id"] = ObjectId()
+        documents.append(bson.encode(document, codec_options=CODEC_OPTIONS))
+    return b"".join(documents)
+
+
+def list_models(data: bytes):
+    pools = [parse_pool_data(pool) for pool in bson.decode_all(data, CODEC_OPTIONS)]
+    FastJSONResponse({"status": "ok", "pools": pools})
+
+
+def list_raw(data: bytes):
+    pools = [raw_pool_data(pool) for pool in bson.decode_all(data, CODEC_OPTIONS)]
+    FastJSONResponse({"status": "ok", "pools": pools})
+
+
+def main(args):
+    data = stored_pools(args.pools, args.logs)
+    total_logs = args.pools * args.logs
+    print(f"{args.pools} pools of {args.logs} logs")
+    for name, operation in (("models", list_models), ("raw", list_raw)):
+        start = time.process_time()
+        for _ in range(args.repeats):
+            operation(data)
+        elapsed = (time.process_time() - start) / args.repeats
+        print(f"{name:<7} | {elapsed * 1e6 / total_logs:>6.2f} µs CPU per log")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pool read CPU benchmark.")
+    parser.add_argument("--pools", type=int, default=100)
+    parser.add_argument("--logs", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=10)
+    main(parser.parse_args())
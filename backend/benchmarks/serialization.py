@@ -0,0 +1,84 @@
+# Description: Microbenchmark of the encoding cost of pool creation and listing.
+#
+# Compares the former JSON round trips (models dumped to JSON and parsed back
+# before the insert, route results run through `jsonable_encoder` then the
+# standard library encoder) with the direct model to BSON conversion and the
+# orjson response class. Does not need MongoDB.
+#
+# Usage: poetry run python -m benchmarks.serialization --pools 200 --logs 50
+
+import argparse
+import json
+import time
+
+import bson
+from fastapi.encoders import jsonable_encoder  # type: ignore
+from fastapi.responses import JSONResponse  # type: ignore
+
+from app.Mongo import pool_to_bson
+from app.Pools import Pool, PoolLog
+from app.Responses import FastJSONResponse
+
+
+def make_pools(count: int, logs: int) -> list:
+    return [
+        Pool(
+            owner_name=f"Owner {index}",
+            length=10,
+            width=5,
+            depth=2,
+            type="chlorine",
+            logbook=[
+                PoolLog(
+                    date=f"2024-01-{day % 28 + 1:02d}",
+                    pH_level=7.4,
+                    chlorine_level=2.0,
+                    notes="Weekly check",
+                )
+                for day in range(logs)
+            ],
+        )
+        for index in range(count)
+    ]
+
+
+def mean_time(operation, repeats: int) -> float:
+    """
+    Returns the mean duration of an operation in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        operation()
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+def main(args):
+    pools = make_pools(args.pools, args.logs)
+    content = {"status": "ok", "pools": pools}
+
+    timings = [
+        (
+            "create: JSON round trip",
+            lambda: [bson.encode(json.loads(pool.model_dump_json())) for pool in pools],
+        ),
+        (
+            "create: direct to BSON",
+            lambda: [bson.encode(pool_to_bson(pool)) for pool in pools],
+        ),
+        (
+            "list: jsonable_encoder",
+            lambda: JSONResponse(jsonable_encoder(content)),
+        ),
+        ("list: orjson response", lambda: FastJSONResponse(content)),
+    ]
+    print(f"{args.pools} pools of {args.logs} logs")
+    for name, operation in timings:
+        print(f"{name:<24} | {mean_time(operation, args.repeats):>8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pool serialization benchmark.")
+    parser.add_argument("--pools", type=int, default=200)
+    parser.add_argument("--logs", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,14 @@
+from uuid import uuid4
+
+
+def make_log(date: str, ph_level: float = 7.4, chlorine_level: float = 2.0) -> dict:
+    """
+    Builds a maintenance log entry, as the storage functions take it.
+    """
+    return {
+        "id": uuid4(),
+        "date": date,
+        "pH_level": ph_level,
+        "chlorine_level": chlorine_level,
+        "notes": "",
+    }
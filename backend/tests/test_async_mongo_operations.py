@@ -0,0 +1,152 @@
+import asyncio
+import unittest
+
+from uuid import uuid4
+from bson.objectid import ObjectId
+
+from app.Pools import Pool, PoolLog
+from app.Mongo import log_to_bson
+from app.Cache import pool_cache
+from app.AsyncMongo import (
+    close_client,
+    get_pools_collection,
+    create_pool,
+    read_all_pools,
+    retrieve_pool,
+    update_pool,
+    delete_pool,
+    insert_pool_log,
+    retrieve_pool_logs,
+    retrieve_pool_log_by_id,
+    delete_pool_log_by_id,
+    delete_all_pools,
+)
+
+
+class TestAsyncMongoDBOperations(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """
+        Set up a clean test environment before each test.
+        """
+        await get_pools_collection().delete_many({})
+        pool_cache.invalidate_all()
+
+    async def asyncTearDown(self):
+        """
+        Clean up after each test and release the loop-bound client.
+        """
+        await get_pools_collection().delete_many({})
+        await close_client()
+
+    async def test_create_and_retrieve_pool(self):
+        """
+        Test inserting a new pool and reading it back.
+        """
+        pool = Pool(owner_name="Alice", length=10, width=5, depth=2, type="chlorine")
+        pool_id = await create_pool(pool)
+        self.assertIsInstance(pool_id, str)
+
+        retrieved_pool = await retrieve_pool(pool_id)
+        self.assertIsNotNone(retrieved_pool)
+        self.assertEqual(retrieved_pool.owner_name, "Alice")
+
+    async def test_read_all_pools(self):
+        """
+        Test reading all pools from the database.
+        """
+        await create_pool(
+            Pool(owner_name="Bob", length=8, width=4, depth=1.5, type="salt")
+        )
+        await create_pool(
+            Pool(owner_name="Jane", length=12, width=6, depth=2, type="salt")
+        )
+
+        pools = await read_all_pools()
+        self.assertEqual([pool.owner_name for pool in pools], ["Bob", "Jane"])
+
+    async def test_update_and_delete_pool(self):
+        """
+        Test updating then deleting a pool.
+        """
+        pool = Pool(owner_name="John", length=10, width=4, depth=2, type="chlorine")
+        pool_id = await create_pool(pool)
+
+        self.assertTrue(await update_pool(pool_id, {"notes": "Updated notes"}))
+        updated_pool = await get_pools_collection().find_one({"_id": ObjectId(pool_id)})
+        self.assertEqual(updated_pool["notes"], "Updated notes")
+
+        self.assertTrue(await delete_pool(pool_id))
+        self.assertIsNone(await retrieve_pool(pool_id))
+
+    async def test_pool_logs(self):
+        """
+        Test adding, retrieving, and deleting a maintenance log.
+        """
+        pool = Pool(owner_name="Charlie", length=9, width=4, depth=1.5, type="chlorine")
+        pool_id = await create_pool(pool)
+        log_id = uuid4()
+
+        log_added = await insert_pool_log(
+            pool_id,
+            {
+                "id": log_id,
+                "date": "2024-01-01",
+                "pH_level": 7.5,
+                "chlorine_level": 2.0,
+                "notes": "Initial log",
+            },
+        )
+        self.assertTrue(log_added)
+
+        logs = await retrieve_pool_logs(pool_id)
+        self.assertEqual(len(logs), 1)
+
+        log = await retrieve_pool_log_by_id(pool_id, str(log_id))
+        self.assertEqual(log["date"], "2024-01-01")
+
+        self.assertTrue(await delete_pool_log_by_id(pool_id, str(log_id)))
+        self.assertEqual(await retrieve_pool_logs(pool_id), [])
+
+    async def test_delete_all_pools(self):
+        """
+        Test deleting all pools from the database.
+        """
+        await create_pool(
+            Pool(owner_name="Eve", length=6, width=3, depth=1.8, type="salt")
+        )
+        await create_pool(
+            Pool(owner_name="Max", length=12, width=6, depth=2.5, type="salt")
+        )
+
+        self.assertEqual(await delete_all_pools(), 2)
+        self.assertEqual(await read_all_pools(), [])
+
+    async def test_concurrent_log_appends(self):
+        """
+        Test that parallel appends to the same pool all land in its logbook.
+        """
+        pool = Pool(owner_name="Nina", length=10, width=5, depth=2, type="salt")
+        pool_id = await create_pool(pool)
+        appends = 50
+
+        results = await asyncio.gather(
+            *(
+                insert_pool_log(
+                    pool_id,
+                    log_to_bson(
+                        PoolLog(date="2024-01-01", pH_level=7.4, chlorine_level=2.0)
+                    ),
+                )
+                for _ in range(appends)
+            )
+        )
+
+        self.assertTrue(all(results))
+        self.assertEqual(len(await retrieve_pool_logs(pool_id)), appends)
+
+    async def test_log_append_to_missing_pool(self):
+        """
+        Test that appending to a missing pool reports it without writing.
+        """
+        log = PoolLog(date="2024-01-01", pH_level=7.4, chlorine_level=2.0)
+        self.assertFalse(await insert_pool_log(str(ObjectId()), log_to_bson(log)))
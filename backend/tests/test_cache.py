@@ -0,0 +1,94 @@
+import unittest
+
+from app.Cache import PoolCache, pool_key, ALL_POOLS_KEY, ALL_RAW_POOLS_KEY
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestPoolCache(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a small cache driven by a fake clock.
+        """
+        self.clock = FakeClock()
+        self.cache = PoolCache(max_size=2, ttl=10, clock=self.clock)
+
+    def fill(self, key, value):
+        found, _, generation = self.cache.get(key)
+        self.assertFalse(found)
+        self.cache.put(key, value, generation)
+
+    def test_hit_and_miss_counters(self):
+        """
+        Test that a value read after a miss is served from the cache.
+        """
+        self.fill(pool_key("a"), "pool a")
+        self.assertEqual(self.cache.get(pool_key("a"))[:2], (True, "pool a"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_ttl_expiry(self):
+        """
+        Test that entries expire after the TTL.
+        """
+        self.fill(pool_key("a"), "pool a")
+        self.clock.now = 10.5
+        self.assertFalse(self.cache.get(pool_key("a"))[0])
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used entry is evicted past the size.
+        """
+        self.fill(pool_key("a"), "pool a")
+        self.fill(pool_key("b"), "pool b")
+        self.cache.get(pool_key("a"))
+        self.fill(pool_key("c"), "pool c")
+
+        self.assertTrue(self.cache.get(pool_key("a"))[0])
+        self.assertFalse(self.cache.get(pool_key("b"))[0])
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_invalidate_pool(self):
+        """
+        Test that a write drops the pool and the listing, but not other pools.
+        """
+        self.cache.max_size = 10
+        self.fill(pool_key("a"), "pool a")
+        self.fill(pool_key("b"), "pool b")
+        self.fill(ALL_POOLS_KEY, ["pool a", "pool b"])
+        self.fill(pool_key("a", raw=True), {"id": "a"})
+        self.fill(ALL_RAW_POOLS_KEY, [{"id": "a"}, {"id": "b"}])
+
+        self.cache.invalidate_pool("a")
+
+        self.assertFalse(self.cache.get(pool_key("a"))[0])
+        self.assertFalse(self.cache.get(ALL_POOLS_KEY)[0])
+        self.assertFalse(self.cache.get(pool_key("a", raw=True))[0])
+        self.assertFalse(self.cache.get(ALL_RAW_POOLS_KEY)[0])
+        self.assertTrue(self.cache.get(pool_key("b"))[0])
+
+    def test_stale_read_is_not_stored(self):
+        """
+        Test that a read started before a write does not store its result.
+        """
+        _, _, generation = self.cache.get(pool_key("a"))
+        self.cache.invalidate_pool("a")
+        self.cache.put(pool_key("a"), "stale pool a", generation)
+        self.assertFalse(self.cache.get(pool_key("a"))[0])
+
+    def test_disabled_cache(self):
+        """
+        Test that a cache of size 0 never stores anything.
+        """
+        cache = PoolCache(max_size=0, ttl=10)
+        _, _, generation = cache.get(pool_key("a"))
+        cache.put(pool_key("a"), "pool a", generation)
+        self.assertFalse(cache.get(pool_key("a"))[0])
@@ -58,3 +58,14 @@ def test_endpoints_status(endpoint, expected_status, expected_key):
     data = response.json()
     assert data["status"] == expected_status
     assert expected_key in data
+
+
+def test_api_cache_stats():
+    """
+    Test the /cache endpoint to ensure it returns the pool cache counters.
+    """
+    response = client.get("/cache")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    assert {"size", "max_size", "ttl_seconds", "hits", "misses"} <= set(data["cache"])
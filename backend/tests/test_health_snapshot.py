@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+
+from app.Health import HealthHistory, MongoHealthSnapshot
+
+
+class FakeServer:
+    """
+    Counts the server commands run by a snapshot, and fails them on demand.
+    """
+
+    def __init__(self):
+        self.status_calls = 0
+        self.info_calls = 0
+        self.down = False
+
+    async def server_status(self) -> dict:
+        self.status_calls += 1
+        if self.down:
+            raise ConnectionError("server down")
+        await asyncio.sleep(0)
+        return {
+            "ok": 1,
+            "uptime": 120,
+            "storageEngine": {"name": "wiredTiger"},
+            "mem": {"resident": 80, "virtual": 1500},
+            "connections": {"current": 4, "available": 800, "totalCreated": 9},
+        }
+
+    async def server_info(self) -> dict:
+        self.info_calls += 1
+        if self.down:
+            raise ConnectionError("server down")
+        return {"ok": 1, "version": "8.0.0"}
+
+
+class TestMongoHealthSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.server = FakeServer()
+        self.snapshot = MongoHealthSnapshot(
+            10,
+            fetch_status=self.server.server_status,
+            fetch_info=self.server.server_info,
+            clock=lambda: self.now,
+        )
+
+    def test_reports_from_one_status_call(self):
+        """
+        Test that every report is built from a single serverStatus call.
+        """
+        asyncio.run(self.snapshot.current())
+        self.now = 3
+
+        self.assertEqual(self.snapshot.uptime()["uptime_seconds"], 120)
+        self.assertEqual(self.snapshot.info()["version"], "8.0.0")
+        self.assertEqual(self.snapshot.connection_stats()["connections"]["current"], 4)
+        full_health = self.snapshot.full_health()
+        self.assertEqual(full_health["overall_status"], "ok")
+        self.assertEqual(full_health["snapshot_age_seconds"], 3)
+        self.assertEqual(self.server.status_calls, 1)
+
+    def test_concurrent_requests_share_a_refresh(self):
+        """
+        Test that concurrent requests on a stale snapshot trigger one refresh,
+        and that a fresh snapshot is served without any.
+        """
+
+        async def requests():
+            await asyncio.gather(*(self.snapshot.current() for _ in range(20)))
+
+        asyncio.run(requests())
+        self.now = 15
+        asyncio.run(requests())
+        self.assertEqual(self.server.status_calls, 1)
+
+        self.now = 25
+        asyncio.run(requests())
+        self.assertEqual(self.server.status_calls, 2)
+        self.assertEqual(self.server.info_calls, 1)
+
+    def test_unreachable_server(self):
+        """
+        Test that a failed refresh is reported, then recovered from.
+        """
+        self.server.down = True
+        asyncio.run(self.snapshot.refresh())
+        self.assertEqual(self.snapshot.health()["status"], "error")
+        self.assertEqual(self.snapshot.full_health()["overall_status"], "error")
+        self.assertIn("server down", self.snapshot.info()["message"])
+
+        self.server.down = False
+        asyncio.run(self.snapshot.refresh())
+        self.assertEqual(self.snapshot.health()["status"], "ok")
+        self.assertEqual(self.server.info_calls, 2)
+
+
+def server_status(connections: int, inserts: int, bytes_in: int) -> dict:
+    return {
+        "connections": {"current": connections, "available": 800},
+        "mem": {"resident": 80, "virtual": 1500},
+        "opcounters": {"insert": inserts},
+        "network": {"bytesIn": bytes_in},
+    }
+
+
+class TestHealthHistory(unittest.TestCase):
+    def test_ring_buffer_and_rates(self):
+        """
+        Test that the oldest samples are dropped and counters become rates,
+        unknown for the first sample and across a server restart.
+        """
+        history = HealthHistory(size=3)
+        history.record(server_status(4, 100, 1000), timestamp=0)
+        history.record(server_status(5, 150, 3000), timestamp=10)
+        history.record(server_status(6, 10, 3500), timestamp=20)
+        history.record(server_status(7, 30, 4500), timestamp=30)
+
+        samples = list(history.samples)
+        self.assertEqual([sample["timestamp"] for sample in samples], [10, 20, 30])
+        self.assertEqual(samples[0]["inserts_per_second"], 5)
+        self.assertEqual(samples[0]["network_bytes_in_per_second"], 200)
+        self.assertIsNone(samples[1]["inserts_per_second"])
+        self.assertEqual(samples[2]["inserts_per_second"], 2)
+        self.assertIsNone(samples[2]["queries_per_second"])
+
+    def test_downsample(self):
+        """
+        Test that samples are averaged into the requested number of points.
+        """
+        history = HealthHistory(size=100)
+        for second in range(10):
+            history.record(server_status(second, 0, 0), timestamp=second)
+
+        points = history.downsample(2)
+        self.assertEqual([point["timestamp"] for point in points], [4, 9])
+        self.assertEqual([point["connections_current"] for point in points], [2, 7])
+        self.assertEqual(len(history.downsample(20)), 10)
+        self.assertEqual(len(history.downsample(20, since=7)), 3)
@@ -0,0 +1,321 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from bson.objectid import ObjectId
+
+from app.Pools import Pool, PoolLog
+from app.Mongo import (
+    LOG_BUCKET_SIZE,
+    pools_collection,
+    buckets_collection,
+    bucket_chunks,
+    bucket_logs,
+    select_logs,
+    create_pool,
+    retrieve_pool,
+    insert_pool_log,
+    insert_pool_logs,
+    retrieve_pool_logs,
+    retrieve_pool_log_series,
+    retrieve_pool_log_by_id,
+    update_pool_log_by_id,
+    delete_pool_log_by_id,
+    delete_pool,
+    count_all_logs,
+    retrieve_pool_revision,
+    read_pool_summaries,
+    rebuild_log_summaries,
+)
+from app.Migrations import migrate_logbooks_to_buckets, migrate_buckets_to_embedded
+from app.Cache import pool_cache
+from tests.helpers import make_log
+
+
+class TestLogBucketLayout(unittest.TestCase):
+    def test_bucket_chunks(self):
+        """
+        Test that entries are grouped per month, in chunks of the bucket size.
+        """
+        logs = [make_log("2024-01-01") for _ in range(LOG_BUCKET_SIZE + 1)]
+        logs.insert(1, make_log("2024-02-01"))
+        chunks = bucket_chunks(logs)
+        self.assertEqual([len(chunk) for chunk in chunks], [LOG_BUCKET_SIZE, 1, 1])
+        self.assertEqual(chunks[2], [1])
+
+    def test_bucket_logs_and_selection(self):
+        """
+        Test rebuilding entries from the parallel arrays and selecting a range.
+        """
+        bucket = {
+            "ids": ["a", "b", "c"],
+            "dates": [datetime(2024, 1, 3), datetime(2024, 1, 1), datetime(2024, 1, 2)],
+            "pH_levels": [7.0, 7.2, 7.4],
+            "chlorine_levels": [1.0, 2.0, 3.0],
+            "notes": ["", "Shock", ""],
+        }
+        logs = bucket_logs(bucket)
+        self.assertEqual(
+            logs[1],
+            {
+                "id": "b",
+                "date": datetime(2024, 1, 1),
+                "pH_level": 7.2,
+                "chlorine_level": 2.0,
+                "notes": "Shock",
+            },
+        )
+        self.assertEqual(
+            [log["id"] for log in select_logs(logs, start_date="2024-01-02")],
+            ["c", "a"],
+        )
+        self.assertEqual([log["id"] for log in select_logs(logs, limit=1)], ["a"])
+
+    def test_select_mixed_dates(self):
+        """
+        Test selecting logs whose dates were stored as strings by earlier
+        versions next to datetimes.
+        """
+        logs = [
+            {"id": "a", "date": datetime(2024, 2, 1)},
+            {"id": "b", "date": "Monday"},
+        ]
+        self.assertEqual([log["id"] for log in select_logs(logs)], ["b", "a"])
+        self.assertEqual(
+            [log["id"] for log in select_logs(logs, start_date="2024-01-01")], ["a"]
+        )
+
+
+@patch("app.Mongo.MONGO_LOG_STORAGE", "bucket")
+class TestLogBucketStorage(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a clean test environment before each test.
+        """
+        pools_collection.delete_many({})
+        buckets_collection.delete_many({})
+        pool_cache.invalidate_all()
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        pools_collection.delete_many({})
+        buckets_collection.delete_many({})
+
+    def test_create_pool_buckets_logbook(self):
+        """
+        Test that logs given at creation land in the buckets only.
+        """
+        pool = Pool(
+            owner_name="Alice",
+            length=10,
+            width=5,
+            depth=2,
+            type="chlorine",
+            logbook=[PoolLog(date="2024-01-01", pH_level=7.4, chlorine_level=2.0)],
+        )
+        pool_id = create_pool(pool)
+
+        stored_pool = pools_collection.find_one({"_id": ObjectId(pool_id)})
+        self.assertNotIn("logbook", stored_pool)
+        self.assertEqual(buckets_collection.count_documents({}), 1)
+        self.assertEqual(retrieve_pool(pool_id).logbook, [])
+        self.assertEqual(count_all_logs(), 1)
+
+    def test_bucket_summaries_and_reads(self):
+        """
+        Test that readings are bucketed per month with their summaries, and
+        read back transparently.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Bob", length=8, width=4, depth=1.5, type="salt")
+        )
+        for date, ph_level in [
+            ("2024-01-03", 7.6),
+            ("2024-01-01", 7.0),
+            ("2024-02-02", 7.2),
+            ("2024-01-04", 7.4),
+        ]:
+            self.assertTrue(insert_pool_log(pool_id, make_log(date, ph_level)))
+
+        january = buckets_collection.find_one({"window": "2024-01"})
+        self.assertEqual(january["count"], 3)
+        self.assertEqual(january["start_date"], datetime(2024, 1, 1))
+        self.assertEqual(january["end_date"], datetime(2024, 1, 4))
+        self.assertEqual((january["min_pH"], january["max_pH"]), (7.0, 7.6))
+        self.assertEqual(buckets_collection.count_documents({}), 2)
+
+        logs = retrieve_pool_logs(pool_id, start_date="2024-01-02")
+        self.assertEqual(
+            [log["date"] for log in logs], ["2024-01-03", "2024-01-04", "2024-02-02"]
+        )
+        logs = retrieve_pool_logs(pool_id, end_date="2024-01-04", limit=2)
+        self.assertEqual([log["date"] for log in logs], ["2024-01-03", "2024-01-04"])
+
+    def test_bucket_overflow(self):
+        """
+        Test that a batch that does not fit in the open bucket starts a new one.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Cleo", length=8, width=4, depth=1.5, type="salt")
+        )
+        for size in (LOG_BUCKET_SIZE - 1, 2):
+            logs = [(pool_id, make_log("2024-01-01")) for _ in range(size)]
+            self.assertEqual(insert_pool_logs(logs), [None] * size)
+
+        counts = [bucket["count"] for bucket in buckets_collection.find()]
+        self.assertEqual(sorted(counts), [2, LOG_BUCKET_SIZE - 1])
+
+    def test_log_series(self):
+        """
+        Test aggregating bucketed logs into weekly periods within a date range.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Liv", length=8, width=4, depth=1.5, type="salt")
+        )
+        for date, ph_level in [
+            ("2024-01-01", 7.0),
+            ("2024-01-03", 7.6),
+            ("2024-01-08", 7.2),
+            ("2024-02-05", 7.4),
+        ]:
+            insert_pool_log(pool_id, make_log(date, ph_level))
+
+        series = retrieve_pool_log_series(pool_id, "week", end_date="2024-01-31")
+        self.assertEqual(
+            [point["period"] for point in series], ["2024-01-01", "2024-01-08"]
+        )
+        self.assertEqual(series[0]["count"], 2)
+        self.assertEqual(series[0]["pH_level"]["min"], 7.0)
+        self.assertEqual(series[0]["pH_level"]["max"], 7.6)
+        self.assertAlmostEqual(series[0]["pH_level"]["mean"], 7.3)
+        self.assertEqual(series[1]["chlorine_level"]["mean"], 2.0)
+        self.assertIsNone(retrieve_pool_log_series(str(ObjectId()), "week"))
+
+    def test_bulk_logs(self):
+        """
+        Test that bulk appends fill the buckets and report missing pools.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Cleo", length=8, width=4, depth=1.5, type="salt")
+        )
+        entries = [(pool_id, make_log("2024-03-01")) for _ in range(5)]
+        entries.append((str(ObjectId()), make_log("2024-03-01")))
+
+        errors = insert_pool_logs(entries)
+        self.assertEqual(errors[:5], [None] * 5)
+        self.assertEqual(errors[5], "Pool not found.")
+        self.assertEqual(len(retrieve_pool_logs(pool_id)), 5)
+
+    def test_log_operations_by_id(self):
+        """
+        Test retrieving, updating and deleting a log by ID.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Eve", length=6, width=3, depth=1.8, type="salt")
+        )
+        log = make_log("2024-01-01")
+        log_id = str(log["id"])
+        insert_pool_log(pool_id, log)
+        insert_pool_log(pool_id, make_log("2024-01-02", 7.2))
+
+        self.assertEqual(retrieve_pool_log_by_id(pool_id, log_id)["pH_level"], 7.4)
+        self.assertTrue(
+            update_pool_log_by_id(pool_id, log_id, {"pH_level": 6.8, "notes": "Fix"})
+        )
+        self.assertEqual(retrieve_pool_log_by_id(pool_id, log_id)["notes"], "Fix")
+        self.assertEqual(buckets_collection.find_one()["min_pH"], 6.8)
+
+        self.assertTrue(delete_pool_log_by_id(pool_id, log_id))
+        self.assertFalse(delete_pool_log_by_id(pool_id, log_id))
+        self.assertIsNone(retrieve_pool_log_by_id(pool_id, log_id))
+        self.assertEqual(buckets_collection.find_one()["min_pH"], 7.2)
+        self.assertEqual(retrieve_pool_revision(pool_id), 5)
+
+    def test_log_summary(self):
+        """
+        Test that log writes keep the pool summary up to date, and that it can
+        be rebuilt from the logs.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Kai", length=6, width=3, depth=1.8, type="salt")
+        )
+        log = make_log("2024-01-03", 7.0)
+        insert_pool_log(pool_id, log)
+        insert_pool_logs(
+            [(pool_id, make_log("2024-01-01", 7.6)), (pool_id, make_log("2024-01-02"))]
+        )
+
+        summary = read_pool_summaries()[0]
+        self.assertEqual(summary.log_count, 3)
+        self.assertEqual(summary.first_log_date, "2024-01-01")
+        self.assertEqual(summary.last_log_date, "2024-01-03")
+        self.assertEqual(summary.last_pH_level, 7.0)
+        self.assertAlmostEqual(summary.average_pH_level, 7.333, places=3)
+
+        update_pool_log_by_id(pool_id, str(log["id"]), {"pH_level": 7.2})
+        self.assertEqual(read_pool_summaries()[0].last_pH_level, 7.2)
+        delete_pool_log_by_id(pool_id, str(log["id"]))
+        summary = read_pool_summaries()[0]
+        self.assertEqual(summary.log_count, 2)
+        self.assertEqual(summary.last_log_date, "2024-01-02")
+
+        pools_collection.update_many({}, {"$unset": {"summary": 1}})
+        self.assertEqual(rebuild_log_summaries(), 1)
+        summary = read_pool_summaries()[0]
+        self.assertEqual(summary.log_count, 2)
+        self.assertAlmostEqual(summary.average_pH_level, 7.5)
+
+    def test_missing_pool(self):
+        """
+        Test that logs cannot be added to, nor read from, a missing pool.
+        """
+        pool_id = str(ObjectId())
+        self.assertFalse(insert_pool_log(pool_id, make_log("2024-01-01")))
+        self.assertIsNone(retrieve_pool_logs(pool_id))
+        self.assertEqual(buckets_collection.count_documents({}), 0)
+
+    def test_delete_pool_removes_buckets(self):
+        """
+        Test that deleting a pool also deletes its buckets.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Max", length=12, width=6, depth=2.5, type="salt")
+        )
+        insert_pool_log(pool_id, make_log("2024-01-01"))
+
+        self.assertTrue(delete_pool(pool_id))
+        self.assertEqual(buckets_collection.count_documents({}), 0)
+
+    def test_migrate_embedded_logbooks(self):
+        """
+        Test moving embedded logbooks into buckets and back.
+        """
+        result = pools_collection.insert_one(
+            {
+                "owner_name": "Legacy",
+                "length": 10,
+                "width": 4,
+                "depth": 2,
+                "type": "salt",
+                "notes": None,
+                "water_volume": 80,
+                "logbook": [make_log("2024-01-02"), make_log("2024-01-01")],
+            }
+        )
+
+        self.assertEqual(migrate_logbooks_to_buckets(), 2)
+        # Re-running the migration is a no-op
+        self.assertEqual(migrate_logbooks_to_buckets(), 0)
+        pool_id = str(result.inserted_id)
+        self.assertEqual(
+            [log["date"] for log in retrieve_pool_logs(pool_id)],
+            ["2024-01-01", "2024-01-02"],
+        )
+
+        self.assertEqual(migrate_buckets_to_embedded(), 2)
+        self.assertEqual(buckets_collection.count_documents({}), 0)
+        self.assertEqual(
+            len(pools_collection.find_one({"_id": result.inserted_id})["logbook"]), 2
+        )
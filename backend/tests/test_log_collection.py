@@ -0,0 +1,219 @@
+import unittest
+from unittest.mock import patch
+
+from bson.objectid import ObjectId
+
+from app.Pools import Pool, PoolLog
+from app.Mongo import (
+    pools_collection,
+    logs_collection,
+    create_pool,
+    retrieve_pool,
+    insert_pool_log,
+    insert_pool_logs,
+    retrieve_pool_logs,
+    retrieve_pool_log_series,
+    retrieve_pool_log_by_id,
+    update_pool_log_by_id,
+    delete_pool_log_by_id,
+    delete_pool,
+    count_all_logs,
+    retrieve_pool_revision,
+    read_pool_summaries,
+    rebuild_log_summaries,
+)
+from app.Migrations import migrate_logbooks_to_collection
+from app.Cache import pool_cache
+from tests.helpers import make_log
+
+
+@patch("app.Mongo.MONGO_LOG_STORAGE", "collection")
+class TestLogCollectionStorage(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a clean test environment before each test.
+        """
+        pools_collection.delete_many({})
+        logs_collection.delete_many({})
+        pool_cache.invalidate_all()
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        pools_collection.delete_many({})
+        logs_collection.delete_many({})
+
+    def test_create_pool_splits_logbook(self):
+        """
+        Test that logs given at creation land in the log collection only.
+        """
+        pool = Pool(
+            owner_name="Alice",
+            length=10,
+            width=5,
+            depth=2,
+            type="chlorine",
+            logbook=[PoolLog(date="2024-01-01", pH_level=7.4, chlorine_level=2.0)],
+        )
+        pool_id = create_pool(pool)
+
+        stored_pool = pools_collection.find_one({"_id": ObjectId(pool_id)})
+        self.assertNotIn("logbook", stored_pool)
+        self.assertEqual(logs_collection.count_documents({}), 1)
+        self.assertEqual(retrieve_pool(pool_id).logbook, [])
+        self.assertEqual(count_all_logs(), 1)
+
+    def test_log_range_and_limit(self):
+        """
+        Test date range and limit reads on the log collection.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Bob", length=8, width=4, depth=1.5, type="salt")
+        )
+        for date in ["2024-01-03", "2024-01-01", "2024-01-02", "2024-01-04"]:
+            self.assertTrue(insert_pool_log(pool_id, make_log(date)))
+
+        logs = retrieve_pool_logs(pool_id, start_date="2024-01-02")
+        self.assertEqual(
+            [log["date"] for log in logs], ["2024-01-02", "2024-01-03", "2024-01-04"]
+        )
+        self.assertNotIn("pool_id", logs[0])
+
+        logs = retrieve_pool_logs(pool_id, end_date="2024-01-03", limit=2)
+        self.assertEqual([log["date"] for log in logs], ["2024-01-02", "2024-01-03"])
+
+    def test_log_series(self):
+        """
+        Test aggregating the log collection into monthly periods.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Ann", length=8, width=4, depth=1.5, type="salt")
+        )
+        for date, ph_level in [
+            ("2024-01-03", 7.0),
+            ("2024-01-20", 7.6),
+            ("2024-03-02", 7.2),
+        ]:
+            insert_pool_log(pool_id, make_log(date, ph_level))
+
+        series = retrieve_pool_log_series(pool_id, "month", start_date="2024-01-10")
+        self.assertEqual(
+            [(point["period"], point["count"]) for point in series],
+            [("2024-01-01", 1), ("2024-03-01", 1)],
+        )
+        self.assertEqual(series[0]["pH_level"], {"min": 7.6, "max": 7.6, "mean": 7.6})
+
+    def test_log_operations_by_id(self):
+        """
+        Test retrieving, updating and deleting a log by ID.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Eve", length=6, width=3, depth=1.8, type="salt")
+        )
+        log = make_log("2024-01-01")
+        log_id = str(log["id"])
+        insert_pool_log(pool_id, log)
+
+        self.assertEqual(retrieve_pool_log_by_id(pool_id, log_id)["pH_level"], 7.4)
+        self.assertTrue(
+            update_pool_log_by_id(pool_id, log_id, {"pH_level": 7.0, "notes": "Fix"})
+        )
+        self.assertEqual(retrieve_pool_log_by_id(pool_id, log_id)["pH_level"], 7.0)
+        self.assertTrue(delete_pool_log_by_id(pool_id, log_id))
+        self.assertEqual(retrieve_pool_logs(pool_id), [])
+
+    def test_log_writes_increment_pool_revision(self):
+        """
+        Test that log writes increment the revision of their pool.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Ivy", length=6, width=3, depth=1.8, type="salt")
+        )
+        log = make_log("2024-01-01")
+        insert_pool_log(pool_id, log)
+        update_pool_log_by_id(pool_id, str(log["id"]), {"notes": "Fix"})
+        delete_pool_log_by_id(pool_id, str(log["id"]))
+        self.assertEqual(retrieve_pool_revision(pool_id), 4)
+
+    def test_log_summary(self):
+        """
+        Test that log writes keep the pool summary up to date, and that it can
+        be rebuilt from the logs.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Jade", length=6, width=3, depth=1.8, type="salt")
+        )
+        log = make_log("2024-01-03", 7.0)
+        insert_pool_log(pool_id, log)
+        insert_pool_logs(
+            [(pool_id, make_log("2024-01-01", 7.6)), (pool_id, make_log("2024-01-02"))]
+        )
+
+        summary = read_pool_summaries()[0]
+        self.assertEqual(summary.log_count, 3)
+        self.assertEqual(summary.first_log_date, "2024-01-01")
+        self.assertEqual(summary.last_log_date, "2024-01-03")
+        self.assertEqual(summary.last_pH_level, 7.0)
+        self.assertAlmostEqual(summary.average_pH_level, 7.333, places=3)
+
+        update_pool_log_by_id(pool_id, str(log["id"]), {"pH_level": 7.2})
+        self.assertEqual(read_pool_summaries()[0].last_pH_level, 7.2)
+        delete_pool_log_by_id(pool_id, str(log["id"]))
+        summary = read_pool_summaries()[0]
+        self.assertEqual(summary.log_count, 2)
+        self.assertEqual(summary.last_log_date, "2024-01-02")
+
+        pools_collection.update_many({}, {"$unset": {"summary": 1}})
+        self.assertEqual(rebuild_log_summaries(), 1)
+        summary = read_pool_summaries()[0]
+        self.assertEqual(summary.log_count, 2)
+        self.assertAlmostEqual(summary.average_pH_level, 7.5)
+
+    def test_missing_pool(self):
+        """
+        Test that logs cannot be added to, nor read from, a missing pool.
+        """
+        pool_id = str(ObjectId())
+        self.assertFalse(insert_pool_log(pool_id, make_log("2024-01-01")))
+        self.assertIsNone(retrieve_pool_logs(pool_id))
+        self.assertEqual(logs_collection.count_documents({}), 0)
+
+    def test_delete_pool_removes_logs(self):
+        """
+        Test that deleting a pool also deletes its logs.
+        """
+        pool_id = create_pool(
+            Pool(owner_name="Max", length=12, width=6, depth=2.5, type="salt")
+        )
+        insert_pool_log(pool_id, make_log("2024-01-01"))
+
+        self.assertTrue(delete_pool(pool_id))
+        self.assertEqual(logs_collection.count_documents({}), 0)
+
+    def test_migrate_embedded_logbooks(self):
+        """
+        Test moving embedded logbooks into the log collection.
+        """
+        result = pools_collection.insert_one(
+            {
+                "owner_name": "Legacy",
+                "length": 10,
+                "width": 4,
+                "depth": 2,
+                "type": "salt",
+                "notes": None,
+                "water_volume": 80,
+                "logbook": [make_log("2024-01-01"), make_log("2024-01-02")],
+            }
+        )
+
+        self.assertEqual(migrate_logbooks_to_collection(), 2)
+        # Re-running the migration is a no-op
+        self.assertEqual(migrate_logbooks_to_collection(), 0)
+
+        pool_id = str(result.inserted_id)
+        self.assertEqual(
+            pools_collection.find_one({"_id": result.inserted_id})["logbook"], []
+        )
+        self.assertEqual(len(retrieve_pool_logs(pool_id)), 2)
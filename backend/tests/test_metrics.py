@@ -0,0 +1,119 @@
+import unittest
+from types import SimpleNamespace
+
+from fastapi import APIRouter, FastAPI  # type: ignore
+from fastapi.testclient import TestClient  # type: ignore
+
+from app.Metrics import (
+    Histogram,
+    MetricsMiddleware,
+    mongo_command_metrics,
+    http_requests_total,
+    http_request_duration_seconds,
+    mongodb_command_failures_total,
+    render_metrics,
+)
+
+router = APIRouter()
+
+
+@router.get("/pool/{pool_id}/log/{log_id}")
+async def get_log(pool_id: str, log_id: str):
+    return {"pool_id": pool_id, "log_id": log_id}
+
+
+app = FastAPI()
+app.include_router(router)
+app.add_middleware(MetricsMiddleware)
+
+client = TestClient(app)
+
+
+class TestHistogram(unittest.TestCase):
+    def test_cumulative_buckets(self):
+        """
+        Test that buckets are rendered cumulatively with their sum and count.
+        """
+        histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(("/a",), value)
+
+        self.assertEqual(
+            histogram.samples(),
+            [
+                'latency_seconds_bucket{route="/a",le="0.1"} 2',
+                'latency_seconds_bucket{route="/a",le="1.0"} 3',
+                'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+                'latency_seconds_sum{route="/a"} 3.65',
+                'latency_seconds_count{route="/a"} 4',
+            ],
+        )
+
+    def test_label_escaping(self):
+        """
+        Test that quotes and backslashes in label values are escaped.
+        """
+        histogram = Histogram("latency_seconds", "Latency.", ("route",), ())
+        histogram.observe(('a"b\\c',), 1.0)
+        self.assertIn('route="a\\"b\\\\c"', histogram.samples()[0])
+
+
+class TestMetricsMiddleware(unittest.TestCase):
+    def test_requests_labelled_by_route_template(self):
+        """
+        Test that requests are counted per route template rather than per URL.
+        """
+        key = ("GET", "/pool/{pool_id}/log/{log_id}", "200")
+        before = http_requests_total.values.get(key, 0)
+
+        client.get("/pool/a/log/1")
+        client.get("/pool/b/log/2")
+
+        self.assertEqual(http_requests_total.values[key], before + 2)
+        self.assertIn(
+            ("GET", "/pool/{pool_id}/log/{log_id}"),
+            http_request_duration_seconds.values,
+        )
+
+    def test_unmatched_requests_share_a_label(self):
+        """
+        Test that requests matching no route are not labelled by their URL.
+        """
+        key = ("GET", "unmatched", "404")
+        before = http_requests_total.values.get(key, 0)
+
+        client.get("/missing/1")
+        client.get("/missing/2")
+
+        self.assertEqual(http_requests_total.values[key], before + 2)
+
+    def test_render_metrics(self):
+        """
+        Test that the rendered metrics document every metric.
+        """
+        client.get("/pool/a/log/1")
+        text = render_metrics()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", text)
+        self.assertIn("# TYPE http_requests_in_progress gauge", text)
+        self.assertIn("http_requests_in_progress 0", text)
+
+
+class TestMongoCommandMetrics(unittest.TestCase):
+    def test_failed_commands(self):
+        """
+        Test that failed commands are timed and counted per command name.
+        """
+        before = mongodb_command_failures_total.values.get(("find",), 0)
+        event = SimpleNamespace(command_name="find", duration_micros=1500)
+
+        mongo_command_metrics.succeeded(event)
+        mongo_command_metrics.failed(event)
+
+        self.assertEqual(mongodb_command_failures_total.values[("find",)], before + 1)
+        self.assertIn(
+            'mongodb_command_duration_seconds_bucket{command="find"', render_metrics()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
+import json
 import pytest  # type: ignore
+from unittest.mock import patch
 from fastapi.testclient import TestClient  # type: ignore
 from app.routes.pool.router import pool_router
 
@@ -56,6 +58,68 @@ def test_get_all_pools():
     assert isinstance(data["pools"], list)
 
 
+def test_get_all_pools_summary(new_pool):
+    response = client.get("/all", params={"summary": True})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    summary = next(pool for pool in data["pools"] if pool["id"] == new_pool)
+    assert "logbook" not in summary
+    assert summary["owner_name"] == mock_pool_data["owner_name"]
+    assert summary["log_count"] == 2
+    assert summary["last_log_date"] == "2024-12-25"
+    assert summary["last_pH_level"] == 7.4
+    assert summary["last_chlorine_level"] == 2.0
+
+
+def test_get_all_pools_paginated(new_pool):
+    client.post("/", json=mock_pool_data)
+    all_ids = [pool["id"] for pool in client.get("/all").json()["pools"]]
+
+    paged_ids = []
+    cursor = None
+    while True:
+        params = {"limit": 1, "cursor": cursor} if cursor else {"limit": 1}
+        data = client.get("/all", params=params).json()
+        assert data["status"] == "ok"
+        assert len(data["pools"]) <= 1
+        paged_ids += [pool["id"] for pool in data["pools"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert paged_ids == sorted(all_ids)
+
+
+def test_stream_all_pools(new_pool):
+    all_pools = client.get("/all").json()["pools"]
+    response = client.get("/all/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert len(streamed) == len(all_pools)
+    assert new_pool in [pool["id"] for pool in streamed]
+
+
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+def test_export_import_pools(new_pool, export_format):
+    response = client.get("/export", params={"format": export_format})
+    assert response.status_code == 200
+    export = response.content
+
+    pool = client.get(f"/{new_pool}").json()["pool"]
+    client.delete("/all")
+
+    response = client.post("/import", params={"format": export_format}, content=export)
+    assert response.json()["status"] == "ok"
+    assert response.json()["imported"] >= 1
+    assert client.get(f"/{new_pool}").json()["pool"] == pool
+
+    # Re-importing the same export skips the existing pools
+    response = client.post("/import", params={"format": export_format}, content=export)
+    assert response.json()["imported"] == 0
+
+
 def test_get_pool_by_id(new_pool):
     response = client.get(f"/{new_pool}")
     assert response.status_code == 200
@@ -64,6 +128,80 @@ def test_get_pool_by_id(new_pool):
     assert data["pool"]["owner_name"] == mock_pool_data["owner_name"]
 
 
+def test_get_pool_conditional(new_pool):
+    response = client.get(f"/{new_pool}")
+    etag = response.headers["ETag"]
+
+    response = client.get(f"/{new_pool}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    client.put(f"/{new_pool}", json={"notes": "Pump replaced"})
+    response = client.get(f"/{new_pool}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["pool"]["notes"] == "Pump replaced"
+
+
+def test_get_logs_and_listing_conditional(new_pool):
+    for path in [f"/{new_pool}/log/all", "/all", "/all?summary=true"]:
+        etag = client.get(path).headers["ETag"]
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    log_etag = client.get(f"/{new_pool}/log/all").headers["ETag"]
+    listing_etag = client.get("/all").headers["ETag"]
+    client.post(
+        f"/{new_pool}/log",
+        json={"date": "2024-12-26", "pH_level": 7.2, "chlorine_level": 1.5},
+    )
+
+    response = client.get(f"/{new_pool}/log/all", headers={"If-None-Match": log_etag})
+    assert response.status_code == 200
+    assert len(response.json()["logs"]) == len(mock_pool_data["logbook"]) + 1
+    response = client.get("/all", headers={"If-None-Match": listing_etag})
+    assert response.status_code == 200
+
+
+def test_page_and_summary_etags(new_pool):
+    page_etag = client.get("/all", params={"limit": 1}).headers["ETag"]
+    summary_etag = client.get("/all", params={"summary": True}).headers["ETag"]
+    assert page_etag != summary_etag
+
+    response = client.get(
+        "/all", params={"limit": 1}, headers={"If-None-Match": page_etag}
+    )
+    assert response.status_code == 304
+
+    client.put(f"/{new_pool}", json={"notes": "Pump replaced"})
+    response = client.get(
+        "/all", params={"summary": True}, headers={"If-None-Match": summary_etag}
+    )
+    assert response.status_code == 200
+
+
+def test_summary_not_modified_skips_read(new_pool):
+    etag = client.get("/all", params={"summary": True}).headers["ETag"]
+
+    with patch("app.routes.pool.router.read_pool_summaries") as read_summaries:
+        response = client.get(
+            "/all", params={"summary": True}, headers={"If-None-Match": etag}
+        )
+    assert response.status_code == 304
+    read_summaries.assert_not_called()
+
+
+def test_get_due_pools(new_pool):
+    response = client.get("/due", params={"window": "overdue"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    pool = next(pool for pool in data["pools"] if pool["id"] == new_pool)
+    assert pool["next_maintenance"] == mock_pool_data["next_maintenance"]
+
+    response = client.get("/due", params={"window": "later"})
+    assert response.status_code == 422
+
+
 def test_update_pool_by_id(new_pool):
     updated_data = mock_pool_data.copy()
     updated_data["notes"] = "Updated pump filter"
@@ -1,4 +1,5 @@
 import pytest  # type: ignore
+from concurrent.futures import ThreadPoolExecutor
 from fastapi.testclient import TestClient  # type: ignore
 from app.routes.pool.router import pool_router  # Import your FastAPI app
 
@@ -189,6 +190,115 @@ def test_update_one_pool_log(new_pool):
             assert log["notes"] == updated_mock_log_data["notes"]
 
 
+# Test 6: Concurrent appends to the same pool are all kept
+def test_concurrent_log_maintenance(new_pool):
+    pool_id = new_pool
+    appends = 20
+
+    with ThreadPoolExecutor(max_workers=appends) as executor:
+        responses = list(
+            executor.map(
+                lambda _: client.post(f"/{pool_id}/log", json=mock_log_data),
+                range(appends),
+            )
+        )
+
+    assert all(response.json()["status"] == "ok" for response in responses)
+    logs = client.get(f"/{pool_id}/log/all").json()["logs"]
+    assert len(logs) == appends
+    assert len({log["id"] for log in logs}) == appends
+
+
+# Test 7: Partial log updates only change the given fields
+def test_partial_update_pool_log(new_pool):
+    pool_id = new_pool
+    client.post(f"/{pool_id}/log", json=mock_log_data)
+    log_id = client.get(f"/{pool_id}/log/all").json()["logs"][0]["id"]
+
+    response = client.put(f"/{pool_id}/log/{log_id}", json={"pH_level": 7.0})
+
+    assert response.json() == {
+        "status": "ok",
+        "message": "Maintenance updated successfully.",
+    }
+    log = client.get(f"/{pool_id}/log/{log_id}").json()["log"]
+    assert log["id"] == log_id
+    assert log["pH_level"] == 7.0
+    assert log["notes"] == mock_log_data["notes"]
+
+
+# Test 7b: Log updates cannot null out a reading
+def test_null_update_pool_log(new_pool):
+    pool_id = new_pool
+    client.post(f"/{pool_id}/log", json=mock_log_data)
+    log_id = client.get(f"/{pool_id}/log/all").json()["logs"][0]["id"]
+
+    for field in ("date", "pH_level", "chlorine_level"):
+        response = client.put(f"/{pool_id}/log/{log_id}", json={field: None})
+        assert response.status_code == 422
+
+    log = client.get(f"/{pool_id}/log/{log_id}").json()["log"]
+    assert log["date"] == mock_log_data["date"]
+    assert log["pH_level"] == mock_log_data["pH_level"]
+
+
+# Test 7c: Log dates must be ISO 8601 dates
+def test_invalid_log_date(new_pool):
+    pool_id = new_pool
+    response = client.post(f"/{pool_id}/log", json={**mock_log_data, "date": "Monday"})
+    assert response.json()["status"] == "error"
+
+    client.post(f"/{pool_id}/log", json=mock_log_data)
+    log_id = client.get(f"/{pool_id}/log/all").json()["logs"][0]["id"]
+    response = client.put(f"/{pool_id}/log/{log_id}", json={"date": "Monday"})
+    assert response.status_code == 422
+
+
+# Test 8: Updating a missing log is reported without touching the pool
+def test_update_missing_pool_log(new_pool):
+    pool_id = new_pool
+    response = client.put(
+        f"/{pool_id}/log/00000000-0000-0000-0000-000000000000", json=mock_log_data
+    )
+
+    assert response.json() == {"status": "error", "message": "Log not found."}
+
+
+# Test 9: Bulk logging reports a result per entry
+def test_bulk_log_maintenance(new_pool):
+    pool_id = new_pool
+    other_pool_id = client.post("/", json=mock_pool_data).json()["id"]
+    batch = [
+        {**mock_log_data, "pool_id": pool_id},
+        {**mock_log_data, "pool_id": other_pool_id},
+        {**mock_log_data, "pool_id": pool_id},
+        {**mock_log_data, "pool_id": "000000000000000000000000"},
+        {"pool_id": pool_id, "date": "2024-12-25"},
+    ]
+
+    response = client.post("/logs/bulk", json=batch)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["logged"] == 3
+    assert [result["status"] for result in body["results"]] == [
+        "ok",
+        "ok",
+        "ok",
+        "error",
+        "error",
+    ]
+    assert body["results"][3]["message"] == "Pool not found."
+
+    logs = client.get(f"/{pool_id}/log/all").json()["logs"]
+    assert {log["id"] for log in logs} == {
+        body["results"][0]["id"],
+        body["results"][2]["id"],
+    }
+    assert len(client.get(f"/{other_pool_id}/log/all").json()["logs"]) == 1
+
+
 # flush preprod db after running tests
 def test_flush_db():
     response = client.delete("/all")
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from app.Pools import PoolUtils
+
+
+class TestPoolUtilsBatch(unittest.TestCase):
+    def test_batch_matches_scalar_checks(self):
+        """
+        Test that the batch codes give the messages of the scalar checks,
+        bounds included.
+        """
+        ph_levels = [6.9, 7.2, 7.5, 7.8, 8.1]
+        chlorine_levels = [0.5, 1.0, 2.0, 3.0, 3.5]
+
+        ph_codes = PoolUtils.classify_ph_levels(ph_levels)
+        chlorine_codes = PoolUtils.classify_chlorine_levels(chlorine_levels)
+
+        self.assertEqual(ph_codes.tolist(), [0, 1, 1, 1, 2])
+        self.assertEqual(
+            PoolUtils.describe_levels(ph_codes, PoolUtils.PH_MESSAGES).tolist(),
+            [PoolUtils.check_ph_level(level) for level in ph_levels],
+        )
+        self.assertEqual(
+            PoolUtils.describe_levels(
+                chlorine_codes, PoolUtils.CHLORINE_MESSAGES
+            ).tolist(),
+            [PoolUtils.check_chlorine_level(level) for level in chlorine_levels],
+        )
+
+    def test_missing_readings(self):
+        """
+        Test that NaN readings get their own code, matching the scalar checks.
+        """
+        ph_codes, chlorine_codes, out_of_range = PoolUtils.classify_readings(
+            [np.nan, 7.4], [2.0, np.nan]
+        )
+        self.assertEqual(ph_codes.tolist(), [PoolUtils.MISSING, PoolUtils.IN_RANGE])
+        self.assertEqual(
+            chlorine_codes.tolist(), [PoolUtils.IN_RANGE, PoolUtils.MISSING]
+        )
+        self.assertEqual(out_of_range.tolist(), [True, True])
+        self.assertEqual(
+            PoolUtils.describe_levels(ph_codes, PoolUtils.PH_MESSAGES)[0],
+            PoolUtils.check_ph_level(float("nan")),
+        )
+        self.assertEqual(
+            PoolUtils.describe_levels(chlorine_codes, PoolUtils.CHLORINE_MESSAGES)[1],
+            PoolUtils.check_chlorine_level(float("nan")),
+        )
+
+    def test_classify_readings(self):
+        """
+        Test that readings with either level out of range are masked.
+        """
+        ph_codes, chlorine_codes, out_of_range = PoolUtils.classify_readings(
+            np.array([7.4, 7.0, 7.4, 7.9]), np.array([2.0, 2.0, 0.2, 2.0])
+        )
+        self.assertEqual(ph_codes.dtype, np.int8)
+        self.assertEqual(chlorine_codes.tolist(), [1, 1, 0, 1])
+        self.assertEqual(out_of_range.tolist(), [False, True, True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from types import SimpleNamespace
+
+from fastapi import FastAPI  # type: ignore
+from fastapi.testclient import TestClient  # type: ignore
+
+from app.Responses import FastJSONResponse
+from app.Timing import (
+    RequestTiming,
+    ServerTimingMiddleware,
+    mongo_command_timing,
+    timed_phase,
+)
+
+
+@timed_phase("build")
+def build_pool(document: dict) -> dict:
+    return {"id": str(document["_id"])}
+
+
+app = FastAPI()
+app.add_middleware(ServerTimingMiddleware)
+
+
+@app.get("/pool/{pool_id}")
+async def get_pool(pool_id: str):
+    # Two MongoDB round trips, as reported by the driver
+    for duration_micros in (2000, 3000):
+        mongo_command_timing.succeeded(
+            SimpleNamespace(command_name="find", duration_micros=duration_micros)
+        )
+    return FastJSONResponse({"status": "ok", "pool": build_pool({"_id": pool_id})})
+
+
+client = TestClient(app)
+
+
+def parse_server_timing(header: str) -> dict:
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+class TestServerTiming(unittest.TestCase):
+    def test_breakdown_on_request(self):
+        """
+        Test that requests sending the header get the time breakdown.
+        """
+        response = client.get("/pool/1", headers={"X-Server-Timing": "1"})
+        self.assertEqual(response.json()["pool"], {"id": "1"})
+
+        metrics = parse_server_timing(response.headers["Server-Timing"])
+        self.assertEqual(list(metrics), ["db", "build", "encode", "total"])
+        self.assertEqual(metrics["db"]["dur"], "5.00")
+        self.assertEqual(metrics["db"]["desc"], '"MongoDB (2 round trips)"')
+        self.assertGreater(float(metrics["total"]["dur"]), 0)
+
+    def test_no_breakdown_by_default(self):
+        """
+        Test that other requests are not timed.
+        """
+        response = client.get("/pool/1")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response.headers)
+
+    def test_request_timing_header(self):
+        """
+        Test the header of a request timing, durations in milliseconds.
+        """
+        now = [0.0]
+        timing = RequestTiming(clock=lambda: now[0])
+        timing.add("build", 0.0015)
+        timing.add_round_trip(0.004)
+        now[0] = 0.01
+        self.assertEqual(
+            timing.header(),
+            'db;dur=4.00;desc="MongoDB (1 round trips)", '
+            'build;dur=1.50;desc="Model build", '
+            'encode;dur=0.00;desc="Encode", '
+            'total;dur=10.00;desc="Total"',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
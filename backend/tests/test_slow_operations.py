@@ -0,0 +1,148 @@
+import unittest
+from types import SimpleNamespace
+
+from bson.objectid import ObjectId
+
+from app.SlowOperations import (
+    SlowOperationLog,
+    command_shape,
+    explain_command,
+    plan_summary,
+    query_shape,
+)
+
+
+def command_events(
+    request_id: int, command_name: str, command: dict, reply: dict, duration_ms: float
+):
+    started = SimpleNamespace(
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        database_name="plouf",
+        command_name=command_name,
+        command=command,
+    )
+    succeeded = SimpleNamespace(
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        command_name=command_name,
+        reply=reply,
+        duration_micros=int(duration_ms * 1000),
+    )
+    return started, succeeded
+
+
+class TestQueryShape(unittest.TestCase):
+    def test_values_replaced_by_types(self):
+        """
+        Test that filter values are replaced by their type name.
+        """
+        self.assertEqual(
+            query_shape({"_id": ObjectId(), "date": {"$gte": "2024-01-01"}}),
+            {"_id": "ObjectId", "date": {"$gte": "str"}},
+        )
+
+    def test_update_statements(self):
+        """
+        Test that update commands are described by the filter of each statement.
+        """
+        command = {
+            "update": "pools",
+            "updates": [{"q": {"_id": ObjectId()}, "u": {"$inc": {"revision": 1}}}],
+        }
+        self.assertEqual(command_shape("update", command), [{"_id": "ObjectId"}])
+
+    def test_explain_command_drops_driver_fields(self):
+        """
+        Test that explained commands do not carry the driver session fields.
+        """
+        command = {"find": "pools", "filter": {}, "lsid": {"id": 1}, "$db": "plouf"}
+        self.assertEqual(
+            explain_command(command),
+            {"explain": {"find": "pools", "filter": {}}, "verbosity": "queryPlanner"},
+        )
+
+
+class TestPlanSummary(unittest.TestCase):
+    def test_find_plan(self):
+        """
+        Test the summary of an index scan plan.
+        """
+        explain = {
+            "queryPlanner": {
+                "winningPlan": {
+                    "stage": "FETCH",
+                    "inputStage": {"stage": "IXSCAN", "indexName": "pool_id_1_date_1"},
+                }
+            }
+        }
+        self.assertEqual(plan_summary(explain), "FETCH > IXSCAN pool_id_1_date_1")
+
+    def test_aggregate_plan(self):
+        """
+        Test the summary of an aggregation plan nested in its $cursor stage.
+        """
+        explain = {
+            "stages": [
+                {"$cursor": {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}},
+                {"$group": {}},
+            ]
+        }
+        self.assertEqual(plan_summary(explain), "COLLSCAN")
+
+
+class TestSlowOperationLog(unittest.TestCase):
+    def test_only_slow_commands_logged(self):
+        """
+        Test that commands under the threshold are not logged.
+        """
+        log = SlowOperationLog(threshold_ms=100, size=10)
+        reply = {"cursor": {"firstBatch": [{"_id": 1}, {"_id": 2}]}, "ok": 1}
+        for request_id, duration_ms in ((1, 20), (2, 150)):
+            started, succeeded = command_events(
+                request_id,
+                "find",
+                {"find": "pools", "filter": {"type": "salt"}, "lsid": {}},
+                reply,
+                duration_ms,
+            )
+            log.started(started)
+            log.succeeded(succeeded)
+
+        self.assertEqual(log.running, {})
+        [operation] = log.recent(10)
+        report = operation.report()
+        self.assertEqual(report["command"], "find")
+        self.assertEqual(report["collection"], "pools")
+        self.assertEqual(report["shape"], {"type": "str"})
+        self.assertEqual(report["duration_ms"], 150)
+        self.assertEqual(report["documents"], 2)
+        self.assertGreater(report["reply_bytes"], 0)
+        self.assertEqual(
+            operation.command["explain"], {"find": "pools", "filter": {"type": "salt"}}
+        )
+
+    def test_ring_buffer(self):
+        """
+        Test that only the most recent operations are kept, most recent first.
+        """
+        log = SlowOperationLog(threshold_ms=1, size=2)
+        for request_id in range(3):
+            started, succeeded = command_events(
+                request_id,
+                "delete",
+                {"delete": f"c{request_id}", "deletes": []},
+                {"n": 0},
+                5,
+            )
+            log.started(started)
+            log.succeeded(succeeded)
+
+        self.assertEqual(
+            [operation.collection for operation in log.recent(10)], ["c2", "c1"]
+        )
+        self.assertIsNone(log.recent(1)[0].command)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -88,3 +88,80 @@ def test_total_logs():
     flush_db()
 
 
+# Test 3: Test the fleet stats endpoints
+def test_fleet_stats():
+    """
+    Test the /pools_per_type, /volume_distribution and /logs_per_month endpoints.
+    """
+
+    # initialize
+    flush_db()
+
+    create_pool()
+    create_pool()
+
+    response = client.get("/stats/pools_per_type")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pools_per_type"] == [{"type": "In-ground", "count": 2}]
+
+    response = client.get("/stats/volume_distribution")
+    assert response.status_code == 200
+    data = response.json()["volume_distribution"]
+    assert data["ranges"] == [{"range": "100-250", "count": 2}]
+    assert data["total"] == 200.0
+
+    response = client.get("/stats/logs_per_month")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["logs_per_month"] == [{"month": "2024-12", "count": 4}]
+
+    flush_db()
+
+
+# Test 4: Test the /compliance endpoint
+def test_compliance():
+    """
+    Test the /compliance endpoint counts readings per status and lists the
+    pools whose latest reading is out of range.
+    """
+
+    # initialize
+    flush_db()
+
+    create_pool()
+    acidic_pool = {
+        **mock_pool_data,
+        "type": "Above-ground",
+        "logbook": [
+            {"date": "2024-12-28", "pH_level": 6.8, "chlorine_level": 2.0, "notes": ""},
+        ],
+    }
+    response = client.post("/pool", json=acidic_pool)
+    assert response.status_code == 200
+
+    response = client.get("/stats/compliance")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["periods"] == [
+        {
+            "type": "Above-ground",
+            "period": "2024-12-01",
+            "count": 1,
+            "pH_level": {"too_low": 1, "in_range": 0, "too_high": 0},
+            "chlorine_level": {"too_low": 0, "in_range": 1, "too_high": 0},
+        },
+        {
+            "type": "In-ground",
+            "period": "2024-12-01",
+            "count": 2,
+            "pH_level": {"too_low": 0, "in_range": 2, "too_high": 0},
+            "chlorine_level": {"too_low": 0, "in_range": 2, "too_high": 0},
+        },
+    ]
+    [pool] = data["non_compliant_pools"]
+    assert pool["type"] == "Above-ground"
+    assert pool["pH_level"] == {"value": 6.8, "status": "too_low"}
+    assert pool["chlorine_level"]["status"] == "in_range"
+
+    flush_db()
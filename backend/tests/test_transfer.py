@@ -0,0 +1,91 @@
+import asyncio
+import io
+import unittest
+
+from app.Pools import Pool, PoolLog
+from app.Transfer import (
+    EXPORT_FORMATS,
+    export_header,
+    encode_pool,
+    iter_import_pools,
+    aiter_import_pools,
+)
+
+
+def make_pools() -> list:
+    return [
+        Pool(
+            id="6650f0c2a1b2c3d4e5f60718",
+            owner_name='Alice "Al", Jr',
+            length=10,
+            width=5,
+            depth=2,
+            type="chlorine",
+            notes="Pump replaced,\nfilter next",
+            water_volume=100,
+            logbook=[
+                PoolLog(date="2024-01-01", pH_level=7.4, chlorine_level=2.0),
+                PoolLog(
+                    date="2024-01-02", pH_level=7.2, chlorine_level=1.8, notes="a,b"
+                ),
+            ],
+        ),
+        Pool(
+            id="6650f0c2a1b2c3d4e5f60719",
+            owner_name="Bob",
+            length=8,
+            width=4,
+            depth=1.5,
+            type="salt",
+        ),
+    ]
+
+
+def export(pools: list, export_format: str) -> str:
+    return export_header(export_format) + "".join(
+        encode_pool(pool, export_format) for pool in pools
+    )
+
+
+class TestTransferFormats(unittest.TestCase):
+    def test_round_trip(self):
+        """
+        Test that exported pools and logbooks are imported back unchanged.
+        """
+        pools = make_pools()
+        for export_format in EXPORT_FORMATS:
+            with self.subTest(export_format=export_format):
+                text = export(pools, export_format)
+                imported = list(
+                    iter_import_pools(io.StringIO(text, newline=""), export_format)
+                )
+                self.assertEqual(imported, pools)
+
+    def test_round_trip_from_byte_chunks(self):
+        """
+        Test importing a body received in chunks that split lines and characters.
+        """
+        pools = make_pools()
+        pools[1].owner_name = "Bérénice"
+
+        async def chunks(data: bytes):
+            for start in range(0, len(data), 5):
+                yield data[start : start + 5]
+
+        async def import_all(data: bytes, export_format: str) -> list:
+            return [
+                pool async for pool in aiter_import_pools(chunks(data), export_format)
+            ]
+
+        for export_format in EXPORT_FORMATS:
+            with self.subTest(export_format=export_format):
+                data = export(pools, export_format).encode("utf-8")
+                self.assertEqual(asyncio.run(import_all(data, export_format)), pools)
+
+    def test_invalid_record(self):
+        """
+        Test that an invalid record is reported with its position.
+        """
+        text = '{"owner_name": "Alice"}\n'
+        with self.assertRaisesRegex(ValueError, "Invalid record 1"):
+            list(iter_import_pools([text], "ndjson"))
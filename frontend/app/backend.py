@@ -0,0 +1,28 @@
+import logging
+
+import requests
+
+from config import SLOW_REQUEST_MS
+
+logger = logging.getLogger(__name__)
+
+
+def log_slow_response(response, *args, **kwargs):
+    # Log where the backend spent its time on the requests slower than the threshold
+    elapsed_ms = response.elapsed.total_seconds() * 1000
+    if elapsed_ms >= SLOW_REQUEST_MS:
+        logger.warning(
+            "Slow backend request: %s %s took %.0f ms (Server-Timing: %s)",
+            response.request.method,
+            response.url,
+            elapsed_ms,
+            response.headers.get("Server-Timing", "unavailable"),
+        )
+
+
+# Shared session to the backend, asking it for a Server-Timing breakdown of
+# every request when slow requests are logged
+backend = requests.Session()
+if SLOW_REQUEST_MS > 0:
+    backend.headers["X-Server-Timing"] = "1"
+    backend.hooks["response"].append(log_slow_response)
@@ -7,3 +7,8 @@ load_dotenv()
 BACKEND_ADDRESS = os.getenv("BACKEND_ADDRESS")
 BACKEND_PORT = os.getenv("BACKEND_PORT")
 PLOUF_BACKEND_URL = f"http://{BACKEND_ADDRESS}:{BACKEND_PORT}"
+
+# Requests to the backend slower than this many milliseconds are logged with
+# their Server-Timing breakdown. Off (0) unless set, as the backend is then
+# asked to time every request.
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 0))
@@ -1,12 +1,42 @@
+from datetime import datetime
+
 import streamlit as st  # type: ignore
-import requests
+from backend import backend
+import plotly.graph_objs as go  # type: ignore
+
 from config import PLOUF_BACKEND_URL
 
+# Number of points plotted for each MongoDB health trend
+HISTORY_POINTS = 120
+
+
+def history_chart(samples, metrics, title, yaxis_title):
+    """
+    Plots the given metrics of the MongoDB health history over time.
+    """
+    times = [datetime.fromtimestamp(sample["timestamp"]) for sample in samples]
+    fig = go.Figure()
+    for metric, name in metrics.items():
+        fig.add_trace(
+            go.Scatter(
+                x=times,
+                y=[sample[metric] for sample in samples],
+                mode="lines",
+                name=name,
+            )
+        )
+    fig.update_layout(title=title, xaxis_title="Time", yaxis_title=yaxis_title)
+    st.plotly_chart(fig)
+
 
 def show():
     st.title("🩺 System Health")
-    api_response = requests.get(f"{PLOUF_BACKEND_URL}/health/api/uptime")
-    mongo_response = requests.get(f"{PLOUF_BACKEND_URL}/health/mongo/full_health")
+    api_response = backend.get(f"{PLOUF_BACKEND_URL}/health/api/uptime")
+    mongo_response = backend.get(f"{PLOUF_BACKEND_URL}/health/mongo/full_health")
+    history_response = backend.get(
+        f"{PLOUF_BACKEND_URL}/health/mongo/history",
+        params={"points": HISTORY_POINTS},
+    )
 
     if api_response.status_code == 200:
         st.subheader("API Health", divider="red")
@@ -20,4 +50,49 @@ def show():
     else:
         st.error("Failed to fetch MongoDB health.")
 
+    if history_response.status_code == 200:
+        st.subheader("MongoDB Trends", divider="red")
+        samples = history_response.json().get("samples", [])
+        if len(samples) < 2:
+            st.write("Not enough samples yet.")
+        else:
+            history_chart(
+                samples,
+                {
+                    "connections_current": "Current",
+                    "connections_available": "Available",
+                },
+                "Connections",
+                "Connections",
+            )
+            history_chart(
+                samples,
+                {"resident_MB": "Resident", "virtual_MB": "Virtual"},
+                "Memory",
+                "MB",
+            )
+            history_chart(
+                samples,
+                {
+                    "inserts_per_second": "Inserts",
+                    "queries_per_second": "Queries",
+                    "updates_per_second": "Updates",
+                    "deletes_per_second": "Deletes",
+                    "commands_per_second": "Commands",
+                },
+                "Operations",
+                "Operations per second",
+            )
+            history_chart(
+                samples,
+                {
+                    "network_bytes_in_per_second": "In",
+                    "network_bytes_out_per_second": "Out",
+                },
+                "Network",
+                "Bytes per second",
+            )
+    else:
+        st.error("Failed to fetch MongoDB health history.")
+
     st.markdown("---")
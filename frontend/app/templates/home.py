@@ -1,5 +1,5 @@
 import streamlit as st  # type: ignore
-import requests
+from backend import backend
 from config import PLOUF_BACKEND_URL
 
 
@@ -8,10 +8,10 @@ def show():
     st.write("Welcome to Plouf! Use the navigation on the left to explore.")
 
     # Fetch backend statistics
-    total_pools_response = requests.get(f"{PLOUF_BACKEND_URL}/stats/total_pools")
-    total_logs_response = requests.get(f"{PLOUF_BACKEND_URL}/stats/total_logs")
-    api_response = requests.get(f"{PLOUF_BACKEND_URL}/health/api/uptime")
-    mongo_response = requests.get(f"{PLOUF_BACKEND_URL}/health/mongo/full_health")
+    total_pools_response = backend.get(f"{PLOUF_BACKEND_URL}/stats/total_pools")
+    total_logs_response = backend.get(f"{PLOUF_BACKEND_URL}/stats/total_logs")
+    api_response = backend.get(f"{PLOUF_BACKEND_URL}/health/api/uptime")
+    mongo_response = backend.get(f"{PLOUF_BACKEND_URL}/health/mongo/full_health")
 
     # ------------------- DISPLAY BIG STATS -------------------
     st.subheader("📊 System Overview", divider="red")
@@ -1,18 +1,20 @@
 import streamlit as st  # type: ignore
-import requests
+from backend import backend
 
-import numpy as np
 import plotly.graph_objs as go  # type: ignore
 
 from config import PLOUF_BACKEND_URL
 
+# Number of most recent logs listed under the chart
+LOGS_SHOWN = 50
+
 
 def show():
     if "selected_pool" not in st.session_state:
         st.warning("No pool selected. Please go to 'Pools' and choose one.")
     else:
         pool_id = st.session_state["selected_pool"]
-        response = requests.get(f"{PLOUF_BACKEND_URL}/pool/{pool_id}")
+        response = backend.get(f"{PLOUF_BACKEND_URL}/pool/{pool_id}")
 
         if response.status_code == 200:
             pool_data = response.json()["pool"]
@@ -37,26 +39,52 @@ def show():
             st.markdown("---")
 
             # -------------------- SAMPLES GRAPH --------------------
-            logbook = sorted(pool_data["logbook"], key=lambda x: x["date"])
-            chlorine_data = [log["chlorine_level"] for log in logbook]
-            ph_data = [log["pH_level"] for log in logbook]
-            dates = [log["date"] for log in logbook]
             st.subheader("📊 Pool Logbook")
+            unit = st.selectbox(
+                "Period", ["day", "week", "month"], index=1, format_func=str.capitalize
+            )
+            # Aggregated by the backend, so the chart size does not grow with
+            # the history
+            series_response = backend.get(
+                f"{PLOUF_BACKEND_URL}/pool/{pool_id}/log/series", params={"unit": unit}
+            )
+            series = series_response.json().get("series", [])
+            periods = [point["period"] for point in series]
             fig = go.Figure()
-            fig.add_trace(
-                go.Scatter(
-                    x=np.arange(len(chlorine_data)),
-                    y=chlorine_data,
-                    mode="lines",
-                    name="Chlorine Level",
+            for field, name in [
+                ("chlorine_level", "Chlorine Level"),
+                ("pH_level", "pH Level"),
+            ]:
+                # Shaded band between the lowest and highest reading of each period
+                fig.add_trace(
+                    go.Scatter(
+                        x=periods,
+                        y=[point[field]["max"] for point in series],
+                        mode="lines",
+                        line={"width": 0},
+                        showlegend=False,
+                        hoverinfo="skip",
+                    )
                 )
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=np.arange(len(ph_data)), y=ph_data, mode="lines", name="pH Level"
+                fig.add_trace(
+                    go.Scatter(
+                        x=periods,
+                        y=[point[field]["min"] for point in series],
+                        mode="lines",
+                        line={"width": 0},
+                        fill="tonexty",
+                        name=f"{name} (min-max)",
+                        hoverinfo="skip",
+                    )
+                )
+                fig.add_trace(
+                    go.Scatter(
+                        x=periods,
+                        y=[point[field]["mean"] for point in series],
+                        mode="lines+markers",
+                        name=f"{name} (mean)",
+                    )
                 )
-            )
-            fig.update_xaxes(tickvals=np.arange(len(dates)), ticktext=dates)
             fig.update_layout(
                 title="Chlorine and pH Levels Over Time",
                 xaxis_title="Time",
@@ -64,12 +92,21 @@ def show():
             )
             st.plotly_chart(fig)
 
+            # The most recent logs, oldest first
+            logs_response = backend.get(
+                f"{PLOUF_BACKEND_URL}/pool/{pool_id}/log/all",
+                params={"limit": LOGS_SHOWN},
+            )
+            logbook = logs_response.json().get("logs", [])
+
             # -------------------- POOL LOGS SECTION --------------------
             st.markdown("---")
 
             if len(logbook) == 0:
                 st.write("No logs available.")
             else:
+                if len(logbook) == LOGS_SHOWN:
+                    st.caption(f"Showing the {LOGS_SHOWN} most recent logs.")
                 for log in logbook:
                     col1, col2, col3 = st.columns(3)
                     with col1:
@@ -132,7 +169,7 @@ def show():
                             }
 
                             # Send a POST request to add the new log entry
-                            log_response = requests.put(
+                            log_response = backend.put(
                                 f"{PLOUF_BACKEND_URL}/pool/{pool_data['id']}/log/{log['id']}",
                                 json=log_data,
                             )
@@ -166,7 +203,7 @@ def show():
                                     sender = True
 
                         if sender:
-                            delete_response = requests.delete(
+                            delete_response = backend.delete(
                                 f"{PLOUF_BACKEND_URL}/pool/{pool_data['id']}/log/{log['id']}"
                             )
                             if (
@@ -209,7 +246,7 @@ def show():
                     }
 
                     # Send a POST request to add the new log entry
-                    log_response = requests.post(
+                    log_response = backend.post(
                         f"{PLOUF_BACKEND_URL}/pool/{pool_id}/log", json=log_data
                     )
 
@@ -254,7 +291,7 @@ def show():
                         "next_maintenance": str(next_maintenance),
                     }
 
-                    update_response = requests.put(
+                    update_response = backend.put(
                         f"{PLOUF_BACKEND_URL}/pool/{pool_id}", json=updated_pool
                     )
 
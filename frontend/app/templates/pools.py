@@ -1,5 +1,5 @@
 import streamlit as st  # type: ignore
-import requests
+from backend import backend
 from config import PLOUF_BACKEND_URL
 
 
@@ -9,7 +9,7 @@ def show():
         "Here you can view all the pools in the system, and add new pools to Plouf."
     )
     st.markdown("---")
-    response = requests.get(f"{PLOUF_BACKEND_URL}/pool/all")
+    response = backend.get(f"{PLOUF_BACKEND_URL}/pool/all", params={"summary": True})
     if response.status_code == 200:
         data = response.json()
 
@@ -30,6 +30,10 @@ def show():
                 st.write(f"**Next Maintenance:** {pool['next_maintenance']}")
                 if pool["notes"]:
                     st.write(f"**Notes:** {pool['notes']}")
+                if pool["log_count"]:
+                    st.write(
+                        f"**Last Log:** {pool['last_log_date']} (pH {pool['last_pH_level']}, Chlorine {pool['last_chlorine_level']}) - {pool['log_count']} logs"
+                    )
 
             with col3:
                 if st.button("View Details ➡️", key=f"details_{pool['id']}"):
@@ -53,7 +57,7 @@ def show():
                         sender = True
 
                 if sender:
-                    delete_response = requests.delete(
+                    delete_response = backend.delete(
                         f"{PLOUF_BACKEND_URL}/pool/{pool['id']}"
                     )
                     if (
@@ -97,7 +101,7 @@ def show():
                 "next_maintenance": str(next_maintenance),
             }
 
-            add_response = requests.post(f"{PLOUF_BACKEND_URL}/pool", json=pool_data)
+            add_response = backend.post(f"{PLOUF_BACKEND_URL}/pool", json=pool_data)
 
             if (
                 add_response.status_code == 200